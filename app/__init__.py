@@ -1,61 +1,18 @@
 from flask import Flask
 from flask_login import LoginManager
 from config import Config
-import firebase_admin
-from firebase_admin import credentials, firestore
+from app.services.firebase_client import init_firebase
+from app.utils.structured_log import configure_logging
+from app.services import firestore_metrics
 import os
-import traceback
+import logging
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file in development
 load_dotenv()
 
-# Initialize Firebase Admin with robust error handling
-firebase_app = None
-db = None
-
-try:
-    # Check if Firebase is already initialized
-    if not firebase_admin._apps:
-        print("Initializing Firebase Admin SDK...")
-        
-        # Create credentials dictionary from environment variables
-        cred_dict = {
-            "type": "service_account",
-            "project_id": os.environ.get('FIREBASE_PROJECT_ID'),
-            "private_key_id": os.environ.get('FIREBASE_PRIVATE_KEY_ID'),
-            "private_key": os.environ.get('FIREBASE_PRIVATE_KEY', '').replace('\\n', '\n'),
-            "client_email": os.environ.get('FIREBASE_CLIENT_EMAIL'),
-            "client_id": os.environ.get('FIREBASE_CLIENT_ID'),
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-            "client_x509_cert_url": os.environ.get('FIREBASE_CLIENT_X509_CERT_URL')
-        }
-        
-        # Verify required credentials are present
-        required_fields = ['project_id', 'private_key', 'client_email']
-        missing_fields = [field for field in required_fields if not cred_dict.get(field)]
-        
-        if missing_fields:
-            raise ValueError(f"Missing required Firebase credentials: {', '.join(missing_fields)}")
-            
-        print("Initializing Firebase with credentials from environment variables...")
-        cred = credentials.Certificate(cred_dict)
-        firebase_app = firebase_admin.initialize_app(cred)
-        print("Firebase Admin SDK initialized successfully")
-    else:
-        firebase_app = firebase_admin.get_app()
-        print("Using existing Firebase app")
-        
-    # Initialize Firestore client
-    db = firestore.client()
-    print("Firestore client initialized successfully")
-except Exception as e:
-    print(f"CRITICAL ERROR initializing Firebase: {str(e)}")
-    print(f"Detailed error: {traceback.format_exc()}")
-    raise  # Re-raise the exception since Firebase is required
-
 # Initialize Flask-Login
 login_manager = LoginManager()
 login_manager.login_view = 'auth.sign_in'
@@ -63,19 +20,47 @@ login_manager.login_view = 'auth.sign_in'
 @login_manager.user_loader
 def load_user(user_id):
     from app.auth import User
+    from app.services.firebase_service import FirebaseService
+    
+    # Fresh claims in the signed session cookie need no lookup at all
+    user = User.from_session_claims(user_id)
+    if user is not None:
+        return user
+    
     try:
-        if db:
-            user_doc = db.collection('users').document(user_id).get()
-            if user_doc.exists:
-                return User(user_id, user_doc.to_dict())
+        firebase_service = FirebaseService()
+        session_version = firebase_service.session_version(user_id)
+        user_data = firebase_service.get_session_user(user_id)
+        if user_data is not None:
+            user = User(user_id, user_data)
+            user.store_session_claims(session_version)
+            return user
     except Exception as e:
-        print(f"Error loading user {user_id}: {str(e)}")
+        logger.error("Error loading user %s: %s", user_id, e)
     return None
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # Log records are written to stdout by a background thread
+    configure_logging(app.config)
+    
+    # Load Firebase credentials up front so a misconfigured deployment fails at boot.
+    # The Firestore client itself is created lazily in each process (see get_db), which
+    # lets gunicorn preload the app in its master and fork workers safely.
+    try:
+        init_firebase()
+    except Exception as e:
+        logger.critical("Error initializing Firebase: %s", e, exc_info=True)
+        raise  # Re-raise the exception since Firebase is required
+    
+    # Uploaded files must not land on a disk that is wiped on every deploy: the Firestore
+    # metadata and blob refcounts would outlive the bytes they point to
+    if app.config['BLOB_STORE_BACKEND'] == 'local' and not app.config['BLOB_STORE_PATH']:
+        raise RuntimeError("BLOB_STORE_PATH is not set: the local blob store needs a persistent "
+                           "directory (e.g. a mounted disk) in production")
+    
     # Override config with environment variables
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', app.config['SECRET_KEY'])
     
@@ -85,6 +70,9 @@ def create_app():
     
     login_manager.init_app(app)
     
+    # Count each request's Firestore reads, writes and queries for /metrics and the access log
+    firestore_metrics.init_app(app)
+    
     from .auth import auth_bp
     from .main import main_bp
     from .routes.admin.routes import admin_bp
@@ -99,4 +87,54 @@ def create_app():
     app.register_blueprint(tutor_bp, url_prefix='/tutor')
     app.register_blueprint(booking_bp, url_prefix='/student/booking')
     
+    from .cli import register_commands
+    register_commands(app)
+    
+    # Listener and sweeper threads don't survive fork(); under a preloading
+    # gunicorn master they are started in each worker by the post_fork hook
+    if not app.config.get('DEFER_BACKGROUND_SERVICES'):
+        start_background_services(app.config)
+    
     return app
+
+
+def start_background_services(config):
+    """
+    Start the per-process background services enabled in the configuration
+    
+    Args:
+        config (dict): The app's config (app.config)
+    """
+    # Keep the module catalog, assignments and session revocations in memory via snapshot listeners
+    if config.get('LIVE_REPLICA_ENABLED'):
+        from .services.firebase_service import FirebaseService
+        FirebaseService().start_live_replica()
+    elif config.get('SESSION_USER_CLAIMS'):
+        logger.warning("SESSION_USER_CLAIMS has no effect without LIVE_REPLICA_ENABLED: "
+                       "claims can't be checked for revocation")
+    
+    # Expire stale reservations in the background
+    if config.get('RESERVATION_SWEEPER_ENABLED'):
+        from .services.firebase_service import FirebaseService
+        FirebaseService().start_reservation_sweeper()
+    
+    # Build the content search index if it is missing, so no request has to
+    if config.get('CONTENT_SEARCH_INDEX_PATH'):
+        from .services.firebase_service import FirebaseService
+        FirebaseService().start_content_search_build()
+
+
+def preload(app):
+    """
+    Do in the gunicorn master whatever every worker would otherwise repeat:
+    load the lazily imported Firestore SDK and compile all templates. The
+    result is shared with the workers copy-on-write.
+    """
+    from .utils.lazy_import import load_now
+    load_now('firebase_admin.firestore', 'firebase_admin.auth', 'google.cloud.firestore')
+    
+    for name in app.jinja_env.list_templates():
+        try:
+            app.jinja_env.get_template(name)
+        except Exception as e:
+            logger.warning("Could not precompile template %s: %s", name, e)
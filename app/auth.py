@@ -1,21 +1,28 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, session, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from firebase_admin import auth, firestore
-import firebase_admin
 import os
+import time
 from werkzeug.utils import secure_filename
 from app.services.firebase_service import FirebaseService
-import traceback
+from app.services.firebase_client import get_db
+from app.utils.lazy_import import lazy_import
+import logging
+
+logger = logging.getLogger(__name__)
+
+firestore = lazy_import('firebase_admin.firestore')
+auth = lazy_import('firebase_admin.auth')
 
 auth_bp = Blueprint('auth', __name__)
 firebase_service = FirebaseService()
 
-# Initialize Firestore with error handling
-try:
-    db = firestore.client()
-except Exception as e:
-    print(f"Error initializing Firestore in auth.py: {str(e)}")
-    db = None
+def _get_db():
+    """Firestore client of this process, or None if it can't be created"""
+    try:
+        return get_db()
+    except Exception as e:
+        logger.error("Error initializing Firestore in auth.py: %s", e)
+        return None
 
 class User:
     def __init__(self, uid, data):
@@ -45,11 +52,51 @@ class User:
     def is_admin(self):
         return self.role == 'admin'
 
+    # Attributes carried in the signed session cookie when SESSION_USER_CLAIMS is on
+    CLAIM_FIELDS = ('name', 'email', 'role', 'is_verified', 'student_number', 'staff_number')
+    
+    @staticmethod
+    def from_session_claims(user_id):
+        """
+        The user described by fresh session claims for user_id, or None.
+        Claims are only trusted while their revocation version matches the
+        user's current one (see FirebaseService.revoke_user_sessions).
+        """
+        if not current_app.config.get('SESSION_USER_CLAIMS'):
+            return None
+        claims = session.get('user_claims')
+        if not claims or claims.get('uid') != str(user_id):
+            return None
+        if time.time() - claims.get('issued_at', 0) > current_app.config.get('SESSION_CLAIMS_MAX_AGE', 300):
+            return None
+        version = firebase_service.session_version(user_id)
+        if version is None or claims.get('session_version') != version:
+            session.pop('user_claims', None)
+            return None
+        return User(user_id, claims)
+    
+    def store_session_claims(self, version):
+        """
+        Put this user's attributes in the signed session cookie (if SESSION_USER_CLAIMS
+        is on and the session_revocations replica is running to check them against).
+        `version` is the user's session_version read *before* their fields were, so
+        a revocation that lands in between invalidates the new claims.
+        """
+        if not current_app.config.get('SESSION_USER_CLAIMS'):
+            return
+        if version is None:
+            session.pop('user_claims', None)
+            return
+        claims = {field: getattr(self, field) for field in self.CLAIM_FIELDS}
+        claims.update(uid=str(self.id), issued_at=int(time.time()), session_version=version)
+        session['user_claims'] = claims
+    
     @staticmethod
     def get_by_email(email):
         try:
+            db = _get_db()
             if not db:
-                print("WARNING: Firestore not available in get_by_email")
+                logger.warning("Firestore not available in get_by_email")
                 return None
                 
             user = auth.get_user_by_email(email)
@@ -57,7 +104,7 @@ class User:
             if user_doc.exists:
                 return User(user.uid, user_doc.to_dict())
         except Exception as e:
-            print(f"Error in get_by_email: {str(e)}")
+            logger.error("Error in get_by_email: %s", e)
             return None
 
 @auth_bp.route('/sign-in', methods=['GET', 'POST'])
@@ -95,10 +142,12 @@ def sign_in():
             # Normal Firebase authentication
             user = auth.get_user_by_email(email)
             
+            db = _get_db()
             if not db:
                 flash('Database service is temporarily unavailable.', 'error')
                 return render_template('auth/sign-in.html')
                 
+            session_version = firebase_service.session_version(user.uid)
             user_doc = db.collection('users').document(user.uid).get()
             if user_doc.exists:
                 user_data = user_doc.to_dict()
@@ -115,6 +164,7 @@ def sign_in():
                 
                 user_obj = User(user.uid, user_data)
                 login_user(user_obj)
+                user_obj.store_session_claims(session_version)
                 
                 # Redirect to appropriate dashboard
                 if user_obj.is_student:
@@ -127,9 +177,8 @@ def sign_in():
                     return redirect(url_for('main.dashboard'))
             else:
                 flash('User data not found.', 'error')
-        except Exception as e:
-            print(f"Error during sign-in: {str(e)}")
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error during sign-in")
             flash('Invalid email or password.', 'error')
     
     return render_template('auth/sign-in.html')
@@ -145,6 +194,7 @@ def sign_up():
         email = request.form.get('email')
         password = request.form.get('password')
         role = request.form.get('role')
+        db = _get_db()
         
         # Basic validation
         if not name or not email or not password or not role:
@@ -190,56 +240,28 @@ def sign_up():
                 if 'academic_record' in request.files:
                     academic_record = request.files['academic_record']
                     if academic_record.filename:
-                        # Secure the filename and save to temp location
+                        # Stream the upload straight into the blob store
                         academic_filename = secure_filename(academic_record.filename)
-                        academic_path = os.path.join(current_app.config['UPLOAD_FOLDER'], academic_filename)
-                        academic_record.save(academic_path)
-                        
-                        # Get file size
-                        file_size = os.path.getsize(academic_path)
-                        
-                        # Encode file to base64
-                        file_content = firebase_service.encode_file_to_base64(academic_path)
-                        
-                        # Store document reference with encoded content
-                        academic_record_id = firebase_service.store_document_reference(
+                        academic_record_id = firebase_service.store_document(
                             user_id=user.uid,
                             doc_type='academic_record',
-                            file_content=file_content,
+                            stream=academic_record.stream,
                             file_name=academic_filename,
-                            file_size=file_size
+                            content_type=academic_record.mimetype
                         )
-                        
-                        # Remove the temp file
-                        if os.path.exists(academic_path):
-                            os.remove(academic_path)
                 
                 if 'cv' in request.files:
                     cv = request.files['cv']
                     if cv.filename:
-                        # Secure the filename and save to temp location
+                        # Stream the upload straight into the blob store
                         cv_filename = secure_filename(cv.filename)
-                        cv_path = os.path.join(current_app.config['UPLOAD_FOLDER'], cv_filename)
-                        cv.save(cv_path)
-                        
-                        # Get file size
-                        file_size = os.path.getsize(cv_path)
-                        
-                        # Encode file to base64
-                        file_content = firebase_service.encode_file_to_base64(cv_path)
-                        
-                        # Store document reference with encoded content
-                        cv_id = firebase_service.store_document_reference(
+                        cv_id = firebase_service.store_document(
                             user_id=user.uid,
                             doc_type='cv',
-                            file_content=file_content,
+                            stream=cv.stream,
                             file_name=cv_filename,
-                            file_size=file_size
+                            content_type=cv.mimetype
                         )
-                        
-                        # Remove the temp file
-                        if os.path.exists(cv_path):
-                            os.remove(cv_path)
                 
                 # Create tutor application
                 application_data = {
@@ -261,6 +283,7 @@ def sign_up():
             
             # Store user data in Firestore
             db.collection('users').document(user.uid).set(user_data)
+            firebase_service.invalidate_user(user.uid)
             
             # Redirect based on role with appropriate message
             if role == 'student':
@@ -271,8 +294,7 @@ def sign_up():
             return redirect(url_for('auth.sign_in'))
             
         except Exception as e:
-            print(f"Error in sign_up: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error in sign_up")
             flash(f'Error creating account: {str(e)}', 'error')
     
     # If GET request or error, show the sign-up form
@@ -287,6 +309,7 @@ def sign_up_underscore():
 @login_required
 def sign_out():
     logout_user()
+    session.pop('user_claims', None)
     return redirect(url_for('main.index'))
 
 @auth_bp.route('/process-signup', methods=['POST'])
@@ -302,6 +325,7 @@ def process_signup():
     email = request.form.get('email')
     password = request.form.get('password')
     role = request.form.get('role')
+    db = _get_db()
     
     # Validate required fields
     if not all([name, email, password, role]):
@@ -351,56 +375,28 @@ def process_signup():
             if 'academic_record' in request.files:
                 academic_record = request.files['academic_record']
                 if academic_record.filename:
-                    # Secure the filename and save to temp location
+                    # Stream the upload straight into the blob store
                     academic_filename = secure_filename(academic_record.filename)
-                    academic_path = os.path.join(current_app.config['UPLOAD_FOLDER'], academic_filename)
-                    academic_record.save(academic_path)
-                    
-                    # Get file size
-                    file_size = os.path.getsize(academic_path)
-                    
-                    # Encode file to base64
-                    file_content = firebase_service.encode_file_to_base64(academic_path)
-                    
-                    # Store document reference with encoded content
-                    academic_record_id = firebase_service.store_document_reference(
+                    academic_record_id = firebase_service.store_document(
                         user_id=user.uid,
                         doc_type='academic_record',
-                        file_content=file_content,
+                        stream=academic_record.stream,
                         file_name=academic_filename,
-                        file_size=file_size
+                        content_type=academic_record.mimetype
                     )
-                    
-                    # Remove the temp file
-                    if os.path.exists(academic_path):
-                        os.remove(academic_path)
             
             if 'cv' in request.files:
                 cv = request.files['cv']
                 if cv.filename:
-                    # Secure the filename and save to temp location
+                    # Stream the upload straight into the blob store
                     cv_filename = secure_filename(cv.filename)
-                    cv_path = os.path.join(current_app.config['UPLOAD_FOLDER'], cv_filename)
-                    cv.save(cv_path)
-                    
-                    # Get file size
-                    file_size = os.path.getsize(cv_path)
-                    
-                    # Encode file to base64
-                    file_content = firebase_service.encode_file_to_base64(cv_path)
-                    
-                    # Store document reference with encoded content
-                    cv_id = firebase_service.store_document_reference(
+                    cv_id = firebase_service.store_document(
                         user_id=user.uid,
                         doc_type='cv',
-                        file_content=file_content,
+                        stream=cv.stream,
                         file_name=cv_filename,
-                        file_size=file_size
+                        content_type=cv.mimetype
                     )
-                    
-                    # Remove the temp file
-                    if os.path.exists(cv_path):
-                        os.remove(cv_path)
             
             # Create a tutor application record
             application_data = {
@@ -422,6 +418,7 @@ def process_signup():
         
         # Store user data in Firestore
         db.collection('users').document(user.uid).set(user_data)
+        firebase_service.invalidate_user(user.uid)
         
         if role == 'student':
             flash('Your student account has been created and is pending admin approval. You will be notified once your account is approved.', 'info')
@@ -431,7 +428,6 @@ def process_signup():
         return redirect(url_for('auth.sign_in'))
         
     except Exception as e:
-        print(f"Error creating account: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error creating account")
         flash(f'Error creating account: {str(e)}', 'error')
         return redirect(url_for('auth.sign_up')) 
\ No newline at end of file
@@ -0,0 +1,163 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import click
+from flask.cli import AppGroup
+
+sessions_cli = AppGroup('sessions', help='Maintenance commands for tutoring sessions.')
+reservations_cli = AppGroup('reservations', help='Maintenance commands for booking reservations.')
+users_cli = AppGroup('users', help='Maintenance commands for user accounts.')
+content_cli = AppGroup('content', help='Maintenance commands for learning content.')
+occupancy_cli = AppGroup('occupancy', help='Maintenance commands for the tutor slot occupancy index.')
+
+
+def register_commands(app):
+    """Attach the maintenance command groups to the app's `flask` CLI"""
+    app.cli.add_command(sessions_cli)
+    app.cli.add_command(reservations_cli)
+    app.cli.add_command(occupancy_cli)
+    app.cli.add_command(content_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(startup_profile)
+
+
+@sessions_cli.command('backfill-durations')
+def backfill_durations():
+    """Store duration_hours on sessions created before the field existed."""
+    from app.services.firebase_service import FirebaseService
+    updated = FirebaseService().backfill_session_durations()
+    click.echo(f'Updated {updated} sessions')
+
+
+@reservations_cli.command('sweep')
+@click.option('--page-size', default=400, show_default=True, help='Reservations updated per batch.')
+def sweep_reservations(page_size):
+    """Expire pending reservations that are past their expiry time."""
+    from app.services.firebase_service import FirebaseService
+    report = FirebaseService().expire_reservations(page_size=page_size)
+    click.echo(f"Expired {report['expired']} reservations in {report['duration_ms']}ms")
+
+
+@occupancy_cli.command('rebuild')
+def rebuild_occupancy():
+    """Recompute every tutor's slot occupancy from the sessions collection."""
+    from app.services.firebase_service import FirebaseService
+    report = FirebaseService().rebuild_slot_occupancy()
+    click.echo(f"Checked {report['checked']} entries, fixed {report['fixed']}")
+
+
+@occupancy_cli.command('verify')
+def verify_occupancy():
+    """Report occupancy entries that disagree with the sessions collection."""
+    from app.services.firebase_service import FirebaseService
+    report = FirebaseService().rebuild_slot_occupancy(dry_run=True)
+    click.echo(f"Checked {report['checked']} entries, {report['mismatched']} mismatched")
+    if report['mismatched']:
+        raise SystemExit(1)
+
+
+@content_cli.command('reindex')
+def reindex_content():
+    """Rebuild the full-text search index from the content collection."""
+    from app.services.firebase_service import FirebaseService
+    count = FirebaseService().rebuild_content_search_index()
+    click.echo(f'Indexed {count} content items')
+
+
+@users_cli.command('revoke-sessions')
+@click.argument('user_id')
+def revoke_sessions(user_id):
+    """Drop a user's session claims in every worker, e.g. after deleting their account."""
+    from app.services.firebase_service import FirebaseService
+    if not FirebaseService().revoke_user_sessions(user_id):
+        raise SystemExit(1)
+    click.echo(f'Revoked sessions of {user_id}')
+
+
+@users_cli.command('backfill-created-at')
+def backfill_created_at():
+    """Set created_at on users missing it so they show in the user directory."""
+    from app.services.firebase_service import FirebaseService
+    updated = FirebaseService().backfill_user_created_at()
+    click.echo(f'Updated {updated} users')
+
+
+# Run in a fresh interpreter by startup-profile: builds the app and serves one request
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get(sys.argv[1]).status_code
+served = time.perf_counter()
+print('STARTUP-PROFILE ' + json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+    'served_at': time.time(),
+    'status': status
+}))
+"""
+
+
+def _import_tree(lines):
+    """Build the module tree from `python -X importtime` output (children are listed before parents)"""
+    pending = {}
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        node = {
+            'name': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'children': pending.pop(depth + 1, [])
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def _print_tree(nodes, min_ms, max_depth, depth=0):
+    for node in nodes:
+        if node['cumulative_ms'] < min_ms:
+            continue
+        click.echo(f"{node['cumulative_ms']:9.1f} {node['self_ms']:8.1f}  {'  ' * depth}{node['name']}")
+        if depth + 1 < max_depth:
+            _print_tree(node['children'], min_ms, max_depth, depth + 1)
+
+
+@click.command('startup-profile')
+@click.option('--path', default='/', show_default=True, help='Path requested as the first request.')
+@click.option('--min-ms', default=5.0, show_default=True, help='Hide imports faster than this (cumulative).')
+@click.option('--depth', default=3, show_default=True, help='Levels of the import tree to show.')
+def startup_profile(path, min_ms, depth):
+    """Report import times and time-to-first-request of a fresh app process."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # Start-up as a gunicorn worker sees it: background threads are started after the fork
+    env = dict(os.environ, DEFER_BACKGROUND_SERVICES='true', PYTHONUNBUFFERED='1')
+
+    spawned = time.time()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_PROBE, path],
+                            cwd=root, env=env, capture_output=True, text=True)
+    stderr = result.stderr.splitlines()
+    report = next((json.loads(line.split(' ', 1)[1]) for line in result.stdout.splitlines()
+                   if line.startswith('STARTUP-PROFILE ')), None)
+    if result.returncode != 0 or report is None:
+        click.echo('\n'.join(line for line in stderr if not line.startswith('import time:')), err=True)
+        raise SystemExit(result.returncode or 1)
+
+    click.echo(f"{'cum ms':>9} {'self ms':>8}  module")
+    _print_tree(_import_tree(stderr), min_ms, depth)
+    click.echo('')
+    click.echo(f"import app          {report['import_ms']:8.1f} ms")
+    click.echo(f"create_app()        {report['create_app_ms']:8.1f} ms")
+    click.echo(f"first request {path:<5} {report['first_request_ms']:8.1f} ms (HTTP {report['status']})")
+    click.echo(f"time to first request {(report['served_at'] - spawned) * 1000:6.1f} ms from process spawn")
+    click.echo('(import times are inflated slightly by -X importtime)')
@@ -1,9 +1,9 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, abort, Response
 from flask_login import login_required, current_user
-from firebase_admin import firestore
+from app.services.firestore_metrics import render_metrics
+import hmac
 
 main_bp = Blueprint('main', __name__)
-db = firestore.client()
 
 @main_bp.route('/')
 def index():
@@ -26,3 +26,15 @@ def dashboard():
     elif current_user.role == 'admin':
         return redirect(url_for('admin.dashboard'))
     return redirect(url_for('main.index'))
+
+@main_bp.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (Firestore usage per endpoint, request latency)"""
+    token = current_app.config.get('METRICS_TOKEN')
+    # Without a configured token the endpoint does not exist
+    if not token:
+        abort(404)
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(403)
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
@@ -1,11 +1,17 @@
 from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify
 from flask_login import login_required, current_user
-from app.models import User
 from app.services.firebase_service import FirebaseService
-from firebase_admin import auth, firestore
+from app.utils.file_serving import serve_blob
+from app.utils.lazy_import import lazy_import
 from functools import wraps
+import logging
 from datetime import datetime, timezone
 
+logger = logging.getLogger(__name__)
+
+firestore = lazy_import('firebase_admin.firestore')
+auth = lazy_import('firebase_admin.auth')
+
 admin_bp = Blueprint('admin', __name__)
 firebase_service = FirebaseService()
 
@@ -26,14 +32,20 @@ def dashboard():
         flash('Access denied. You must be an administrator to view this page.', 'error')
         return redirect(url_for('main.index'))
     
-    # Get system statistics
-    stats = firebase_service.get_system_statistics()
+    # Statistics, tutor applications and modules are independent, so fetch them at once
+    results = firebase_service.run_parallel({
+        'stats': firebase_service.get_system_statistics,
+        'applications': firebase_service.get_tutor_applications,
+        'modules': firebase_service.get_all_modules
+    }, defaults={'stats': {}, 'applications': [], 'modules': []})
+    
+    stats = results['stats']
     
     # Get recent tutor applications
-    recent_applications = firebase_service.get_tutor_applications()[:5] if firebase_service.get_tutor_applications() else []
+    recent_applications = (results['applications'] or [])[:5]
     
     # Get all modules
-    modules = firebase_service.get_all_modules()
+    modules = results['modules']
     
     return render_template('admin/dashboard.html',
                          stats=stats,
@@ -51,11 +63,11 @@ def modules():
     # Get all modules
     modules_list = firebase_service.get_all_modules()
     
-    # Add tutor count to each module
+    # Add tutor count to each module (one grouped count for all modules)
+    tutor_counts = firebase_service.get_module_tutor_counts()
     for module in modules_list:
         module_code = module.get('module_code') or module.get('id')
-        tutors = firebase_service.get_module_tutors(module_code)
-        module['tutor_count'] = len(tutors) if tutors else 0
+        module['tutor_count'] = tutor_counts.get(str(module_code), 0)
     
     return render_template('admin/modules.html', modules=modules_list)
 
@@ -125,22 +137,32 @@ def reject_tutor(application_id):
 @login_required
 @admin_required
 def users():
-    """Display all users in the system"""
+    """Display the user directory, one page at a time"""
+    role_filter = request.args.get('role', '')
+    verified_filter = request.args.get('verified', '')
+    verified = {'yes': True, 'no': False}.get(verified_filter)
+    
     try:
-        print("Fetching users for admin dashboard...")
-        users_data = firebase_service.get_all_users()
-        print(f"Retrieved {len(users_data)} users from Firebase")
+        users_page = firebase_service.get_users_page(
+            role=role_filter or None,
+            verified=verified,
+            cursor=request.args.get('cursor'),
+            per_page=25
+        )
         
-        if not users_data:
+        if not users_page['items']:
             flash('No users found.', 'warning')
-            return render_template('admin/users.html', users=[])
             
-        return render_template('admin/users.html', users=users_data)
+        return render_template('admin/users.html',
+                               users=users_page['items'],
+                               next_cursor=users_page['next_cursor'],
+                               prev_cursor=users_page['prev_cursor'],
+                               total_users=users_page['total'],
+                               role_filter=role_filter,
+                               verified_filter=verified_filter)
         
-    except Exception as e:
-        print(f"Error in users route: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+    except Exception:
+        logger.exception("Error in users route")
         flash('Error loading users. Please try again.', 'error')
         return render_template('admin/users.html', users=[])
 
@@ -156,7 +178,7 @@ def view_user(user_id):
             return redirect(url_for('admin.users'))
         return render_template('admin/view_user.html', user=user)
     except Exception as e:
-        print(f"Error viewing user: {str(e)}")
+        logger.error("Error viewing user: %s", e)
         flash('Error loading user details.', 'error')
         return redirect(url_for('admin.users'))
 
@@ -175,7 +197,7 @@ def edit_user(user_id):
         # Handle POST request here when implementing edit functionality
         return redirect(url_for('admin.users'))
     except Exception as e:
-        print(f"Error editing user: {str(e)}")
+        logger.error("Error editing user: %s", e)
         flash('Error loading user details.', 'error')
         return redirect(url_for('admin.users'))
 
@@ -250,8 +272,9 @@ def create_user():
             }
             
             # Store user in Firestore
-            db = firestore.client()
+            db = firebase_service.db
             db.collection('users').document(user.uid).set(user_data)
+            firebase_service.invalidate_user(user.uid)
             
             flash('User created successfully.', 'success')
             return redirect(url_for('admin.users'))
@@ -270,17 +293,12 @@ def module_tutors(module_code):
         return redirect(url_for('main.index'))
     
     # Get module details
-    db = firestore.client()
-    module_ref = db.collection('modules').document(module_code)
-    module = module_ref.get()
+    module_data = firebase_service.get_module(module_code)
     
-    if not module.exists:
+    if not module_data:
         flash('Module not found.', 'error')
         return redirect(url_for('admin.modules'))
     
-    module_data = module.to_dict()
-    module_data['module_code'] = module_code  # Ensure module_code is in the data
-    
     # Get tutors assigned to this module
     assigned_tutors = firebase_service.get_module_tutors(module_code)
     
@@ -325,7 +343,7 @@ def remove_tutor_assignment(assignment_id):
         return redirect(url_for('main.index'))
     
     # Get module code for redirect
-    db = firestore.client()
+    db = firebase_service.db
     assignment_ref = db.collection('module_tutors').document(assignment_id)
     assignment = assignment_ref.get()
     
@@ -360,12 +378,8 @@ def tutor_modules(tutor_id):
     # Get modules assigned to this tutor
     assigned_modules = firebase_service.get_tutor_modules(tutor_id)
     
-    # Get all modules for assignment
-    all_modules = firebase_service.get_all_modules()
-    
-    # Filter out already assigned modules
-    assigned_module_codes = [m['module_code'] for m in assigned_modules]
-    available_modules = [m for m in all_modules if m['id'] not in assigned_module_codes]
+    # Get the modules this tutor can still be assigned to
+    available_modules = firebase_service.get_assignable_modules(tutor_id)
     
     return render_template('admin/tutor_modules.html',
                          tutor=tutor,
@@ -423,18 +437,31 @@ def view_document(doc_id):
         flash('Document not found.', 'error')
         return redirect(url_for('admin.tutor_applications'))
     
-    # Create response with PDF content
     from flask import Response
     import base64
     
     try:
-        # Decode the base64 content
+        file_name = document.get('file_name', 'document.pdf')
+        
+        if document.get('blob_key'):
+            # Always PDF: the stored content type is whatever the applicant's browser sent,
+            # and serving it inline would let an uploaded HTML/SVG file run in the admin's session
+            return serve_blob(
+                firebase_service.blob_store(),
+                document['blob_key'],
+                mimetype='application/pdf',
+                download_name=file_name,
+                etag=document.get('sha256')
+            )
+        
+        # Documents uploaded before the blob store keep their bytes inline as base64
         pdf_content = base64.b64decode(document.get('file_content', ''))
         
         # Create a response with the PDF content
         response = Response(pdf_content)
         response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'inline; filename={document.get("file_name", "document.pdf")}'
+        response.headers['Content-Disposition'] = f'inline; filename={file_name}'
+        response.headers['X-Content-Type-Options'] = 'nosniff'
         
         return response
     except Exception as e:
@@ -2,7 +2,9 @@ from flask import Blueprint, render_template, redirect, url_for, request, flash,
 from flask_login import login_required, current_user
 from app.services.firebase_service import FirebaseService
 from datetime import datetime, timedelta
-import traceback
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Create a booking blueprint without a prefix (prefix is applied in app/__init__.py)
 booking_bp = Blueprint('booking', __name__)
@@ -48,9 +50,8 @@ def quick():
                     module['name'] = module['module_name']
                 elif 'module_name' not in module and 'name' in module:
                     module['module_name'] = module['name']
-        except Exception as e:
-            current_app.logger.error(f"Error retrieving modules: {str(e)}")
-            current_app.logger.error(traceback.format_exc())
+        except Exception:
+            logger.exception("Error retrieving modules")
             error_occurred = True
             error_message = "Failed to retrieve modules. Using demo data."
             modules = firebase_service._get_demo_modules()
@@ -63,11 +64,11 @@ def quick():
         
         # Handle form submission
         if request.method == 'POST':
-            current_app.logger.info("Processing POST request for quick booking")
+            logger.debug("Processing POST request for quick booking")
             
             # Get form data
             form_data = request.form.to_dict()
-            current_app.logger.info(f"Received form data: {form_data}")
+            logger.debug("Received form data: %s", form_data)
             
             module_code = form_data.get('module_code')
             tutor_id = form_data.get('tutor_id')
@@ -84,25 +85,24 @@ def quick():
                 if not time_slot: missing.append("time slot")
                 
                 error_msg = f'Please select a {" and ".join(missing)}.'
-                current_app.logger.warning(f"Missing required fields: {error_msg}")
+                logger.warning("Missing required fields: %s", error_msg)
                 flash(error_msg, 'danger')
                 return redirect(url_for('booking.quick'))
             
             # Parse the time slot
             try:
                 start_time, end_time = time_slot.split(' - ')
-                current_app.logger.info(f"Parsed time slot: start={start_time}, end={end_time}")
+                logger.debug("Parsed time slot: start=%s, end=%s", start_time, end_time)
             except ValueError as e:
-                current_app.logger.error(f"Invalid time slot format: {time_slot}, error: {str(e)}")
+                logger.error("Invalid time slot format: %s, error: %s", time_slot, e)
                 flash('Invalid time slot format.', 'danger')
                 return redirect(url_for('booking.quick'))
             
-            # Create a reservation and confirm it immediately
+            # Book the slot in a single atomic step
             try:
-                current_app.logger.info("Attempting direct booking")
+                logger.debug("Attempting direct booking")
                 
-                # Create reservation first
-                reservation_id = firebase_service.create_reservation(
+                result = firebase_service.book_session(
                     student_id=current_user.id,
                     tutor_id=tutor_id,
                     module_code=module_code,
@@ -112,26 +112,18 @@ def quick():
                     notes=notes
                 )
                 
-                if not reservation_id:
-                    flash('Unable to book this session. The time slot may no longer be available.', 'danger')
-                    return redirect(url_for('booking.quick'))
-                
-                # Confirm the reservation to create final booking
-                booking_id = firebase_service.confirm_reservation(reservation_id)
-                
-                if booking_id:
-                    if booking_id.startswith(('demo-', 'fallback-', 'emergency-')):
-                        flash('Your session has been booked (demo mode).', 'info')
-                    else:
-                        flash('Your tutoring session has been booked successfully!', 'success')
+                if result.get('success'):
+                    flash('Your tutoring session has been booked successfully!', 'success')
                     return redirect(url_for('student.home'))
+                elif result.get('conflict'):
+                    flash('Unable to book this session. The time slot is no longer available.', 'danger')
+                    return redirect(url_for('booking.quick'))
                 else:
                     flash('Unable to confirm the booking. Please try again.', 'danger')
                     return redirect(url_for('booking.quick'))
                     
-            except Exception as booking_error:
-                current_app.logger.error(f"Error creating booking: {str(booking_error)}")
-                current_app.logger.error(traceback.format_exc())
+            except Exception:
+                logger.exception("Error creating booking")
                 flash('An error occurred while booking your session. Please try again.', 'danger')
                 return redirect(url_for('booking.quick'))
         
@@ -146,9 +138,8 @@ def quick():
                              error_occurred=error_occurred,
                              error_message=error_message)
     
-    except Exception as e:
-        current_app.logger.error(f"Unhandled error in booking.quick view: {str(e)}")
-        current_app.logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Unhandled error in booking.quick view")
         flash('An unexpected error occurred. Please try again later.', 'danger')
         return redirect(url_for('student.home'))
 
@@ -166,8 +157,7 @@ def api_tutors_by_module(module_code):
             'tutors': tutors
         })
     except Exception as e:
-        current_app.logger.error(f"Error getting tutors for module {module_code}: {str(e)}")
-        current_app.logger.error(traceback.format_exc())
+        logger.exception("Error getting tutors for module %s", module_code)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -192,7 +182,7 @@ def get_time_slots():
         
         # If no slots available in real data, return demo slots
         if not schedule or len(schedule) == 0:
-            current_app.logger.info(f"No real slots available, using demo data for tutor {tutor_id} on {date}")
+            logger.debug("No real slots available, using demo data for tutor %s on %s", tutor_id, date)
             # Generate demo time slots
             demo_slots = [
                 "09:00 - 10:00",
@@ -210,8 +200,7 @@ def get_time_slots():
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error getting time slots: {str(e)}")
-        current_app.logger.error(traceback.format_exc())
+        logger.exception("Error getting time slots")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -1,15 +1,15 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app, send_file, jsonify, abort, session
+from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app, send_file, jsonify, abort, session, Response
 from flask_login import login_required, current_user
-from app.models import User
 from app.services.firebase_service import FirebaseService
-from app import db
+from app.utils.file_serving import serve_blob
 import os
 from datetime import datetime, timedelta
 import io
-import pytz
 from werkzeug.utils import secure_filename
 import uuid
-import traceback
+import logging
+
+logger = logging.getLogger(__name__)
 
 student_bp = Blueprint('student', __name__, url_prefix='/student')
 firebase_service = FirebaseService()
@@ -27,8 +27,7 @@ def check_student():
 # Global error handler for uncaught exceptions in the student blueprint
 @student_bp.errorhandler(Exception)
 def handle_unexpected_error(e):
-    current_app.logger.error(f"Unexpected error in student routes: {str(e)}")
-    current_app.logger.error(traceback.format_exc())
+    logger.exception("Unexpected error in student routes")
     
     # Check if this is an AJAX request
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -49,24 +48,36 @@ def home():
     # Get today's date
     today_date = datetime.now()
     
-    # Get student bookings
-    bookings = firebase_service.get_student_bookings(current_user.id)
-    
-    # Get upcoming sessions
-    upcoming_sessions = firebase_service.get_student_upcoming_sessions(current_user.id)
-    
-    # Get recent content
-    recent_content = firebase_service.get_recent_content(limit=5)
-    
-    # Get available modules
-    modules = firebase_service.get_all_modules()
+    # Bookings, upcoming sessions, recent content, modules and statistics are
+    # independent, so fetch them all at once
+    student_id = current_user.id
+    results = firebase_service.run_parallel({
+        'bookings': lambda: firebase_service.get_student_bookings(student_id),
+        'upcoming_sessions': lambda: firebase_service.get_student_upcoming_sessions(student_id),
+        'recent_content': lambda: firebase_service.get_recent_content(limit=5),
+        'modules': firebase_service.get_all_modules,
+        'learning_materials': firebase_service.count_learning_materials,
+        'total_hours': lambda: firebase_service.get_student_total_hours(student_id)
+    }, defaults={
+        'bookings': [],
+        'upcoming_sessions': [],
+        'recent_content': [],
+        'modules': [],
+        'learning_materials': 0,
+        'total_hours': 0
+    })
+    
+    bookings = results['bookings']
+    upcoming_sessions = results['upcoming_sessions']
+    recent_content = results['recent_content']
+    modules = results['modules']
     
     # Get statistics
     stats = {
         'upcoming_sessions': len(upcoming_sessions),
         'total_modules': len(modules),
-        'learning_materials': firebase_service.count_learning_materials(),
-        'total_hours': firebase_service.get_student_total_hours(current_user.id)
+        'learning_materials': results['learning_materials'],
+        'total_hours': results['total_hours']
     }
     
     return render_template('student/dashboard.html', 
@@ -84,11 +95,11 @@ def home():
 def book_wizard():
     """Multi-step booking wizard for scheduling tutor sessions"""
     try:
-        current_app.logger.info("Starting book_wizard route handler")
+        logger.debug("Starting book_wizard route handler")
         
         # Get current step from session
         current_step = session.get('booking_step', 1)
-        current_app.logger.info(f"Current booking step: {current_step}")
+        logger.debug("Current booking step: %s", current_step)
         
         # Get saved booking data from session
         booking_data = session.get('booking_data', {})
@@ -104,12 +115,12 @@ def book_wizard():
         
         # Handle form submission for each step
         if request.method == 'POST':
-            current_app.logger.info(f"Processing POST request for step {current_step}")
+            logger.debug("Processing POST request for step %s", current_step)
             
             # Step 1: Module selection
             if current_step == 1:
                 module_code = request.form.get('module_code')
-                current_app.logger.info(f"Selected module: {module_code}")
+                logger.debug("Selected module: %s", module_code)
                 
                 if not module_code:
                     flash('Please select a module.', 'danger')
@@ -124,7 +135,7 @@ def book_wizard():
             # Step 2: Tutor selection
             elif current_step == 2:
                 tutor_id = request.form.get('tutor_id')
-                current_app.logger.info(f"Selected tutor: {tutor_id}")
+                logger.debug("Selected tutor: %s", tutor_id)
                 
                 if not tutor_id:
                     flash('Please select a tutor.', 'danger')
@@ -139,7 +150,7 @@ def book_wizard():
             # Step 3: Date selection
             elif current_step == 3:
                 session_date = request.form.get('session_date')
-                current_app.logger.info(f"Selected date: {session_date}")
+                logger.debug("Selected date: %s", session_date)
                 
                 if not session_date:
                     flash('Please select a date.', 'danger')
@@ -154,7 +165,7 @@ def book_wizard():
             # Step 4: Time slot selection
             elif current_step == 4:
                 time_slot = request.form.get('time_slot')
-                current_app.logger.info(f"Selected time slot: {time_slot}")
+                logger.debug("Selected time slot: %s", time_slot)
                 
                 if not time_slot:
                     flash('Please select a time slot.', 'danger')
@@ -176,7 +187,7 @@ def book_wizard():
             
             # Step 5: Confirmation and booking creation
             elif current_step == 5:
-                current_app.logger.info("Processing booking confirmation")
+                logger.debug("Processing booking confirmation")
                 
                 # Get all booking data
                 module_code = booking_data.get('module_code')
@@ -195,10 +206,9 @@ def book_wizard():
                 
                 # Create the booking
                 try:
-                    current_app.logger.info("Attempting to create booking")
+                    logger.debug("Attempting to create booking")
                     
-                    # Create reservation first
-                    reservation_id = firebase_service.create_reservation(
+                    result = firebase_service.book_session(
                         student_id=current_user.id,
                         tutor_id=tutor_id,
                         module_code=module_code,
@@ -207,30 +217,22 @@ def book_wizard():
                         end_time=end_time
                     )
                     
-                    if not reservation_id:
-                        flash('Unable to reserve this session. The time slot may no longer be available.', 'danger')
-                        return redirect(url_for('student.book_wizard'))
-                    
-                    # Confirm the reservation to create final booking
-                    booking_id = firebase_service.confirm_reservation(reservation_id)
-                    
-                    if booking_id:
+                    if result.get('success'):
                         # Clear booking wizard data
                         session.pop('booking_step', None)
                         session.pop('booking_data', None)
                         
-                        if booking_id.startswith(('demo-', 'fallback-', 'emergency-')):
-                            flash('Your session has been booked (demo mode).', 'info')
-                        else:
-                            flash('Your tutoring session has been booked successfully!', 'success')
+                        flash('Your tutoring session has been booked successfully!', 'success')
                         return redirect(url_for('student.home'))
+                    elif result.get('conflict'):
+                        flash('Unable to reserve this session. The time slot is no longer available.', 'danger')
+                        return redirect(url_for('student.book_wizard'))
                     else:
                         flash('Unable to confirm the booking. Please try again.', 'danger')
                         return redirect(url_for('student.book_wizard'))
                         
-                except Exception as booking_error:
-                    current_app.logger.error(f"Error creating booking: {str(booking_error)}")
-                    current_app.logger.error(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error creating booking")
                     flash('An error occurred while booking your session. Please try again.', 'danger')
                     return redirect(url_for('student.book_wizard'))
         
@@ -238,7 +240,7 @@ def book_wizard():
         try:
             # Step 1: Module selection
             if current_step == 1:
-                current_app.logger.info("Loading modules for step 1")
+                logger.debug("Loading modules for step 1")
                 
                 # Get all modules
                 try:
@@ -255,16 +257,15 @@ def book_wizard():
                             module['name'] = module['module_name']
                         elif 'module_name' not in module and 'name' in module:
                             module['module_name'] = module['name']
-                except Exception as e:
-                    current_app.logger.error(f"Error retrieving modules: {str(e)}")
-                    current_app.logger.error(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error retrieving modules")
                     error_occurred = True
                     error_message = "Failed to retrieve modules. Please try again."
             
             # Step 2: Tutor selection
             elif current_step == 2:
                 module_code = booking_data.get('module_code')
-                current_app.logger.info(f"Loading tutors for module {module_code}")
+                logger.debug("Loading tutors for module %s", module_code)
                 
                 if not module_code:
                     flash('Missing module selection. Please start again.', 'danger')
@@ -292,9 +293,8 @@ def book_wizard():
                         error_message = "No tutors found for this module. Please select a different module."
                         session['booking_step'] = 1
                         return redirect(url_for('student.book_wizard'))
-                except Exception as e:
-                    current_app.logger.error(f"Error loading tutors: {str(e)}")
-                    current_app.logger.error(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error loading tutors")
                     error_occurred = True
                     error_message = "Error retrieving tutors. Please try again."
                     session['booking_step'] = 1
@@ -304,7 +304,7 @@ def book_wizard():
             elif current_step == 3:
                 tutor_id = booking_data.get('tutor_id')
                 module_code = booking_data.get('module_code')
-                current_app.logger.info(f"Loading available dates for tutor {tutor_id}")
+                logger.debug("Loading available dates for tutor %s", tutor_id)
                 
                 if not tutor_id or not module_code:
                     flash('Missing required information. Please start again.', 'danger')
@@ -339,9 +339,8 @@ def book_wizard():
                     booking_data['module_name'] = selected_module.get('name', selected_module.get('module_name', f"Module {module_code}"))
                     session['booking_data'] = booking_data
                     
-                except Exception as e:
-                    current_app.logger.error(f"Error loading dates: {str(e)}")
-                    current_app.logger.error(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error loading dates")
                     error_occurred = True
                     error_message = "Error retrieving available dates. Please try again."
                     return redirect(url_for('student.book_wizard'))
@@ -350,7 +349,7 @@ def book_wizard():
             elif current_step == 4:
                 tutor_id = booking_data.get('tutor_id')
                 session_date = booking_data.get('session_date')
-                current_app.logger.info(f"Loading time slots for tutor {tutor_id} on date {session_date}")
+                logger.debug("Loading time slots for tutor %s on date %s", tutor_id, session_date)
                 
                 if not tutor_id or not session_date:
                     flash('Missing required information. Please start again.', 'danger')
@@ -370,9 +369,8 @@ def book_wizard():
                         session['booking_step'] = 3
                         return redirect(url_for('student.book_wizard'))
                         
-                except Exception as e:
-                    current_app.logger.error(f"Error loading time slots: {str(e)}")
-                    current_app.logger.error(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error loading time slots")
                     error_occurred = True
                     error_message = "Error retrieving available time slots. Please try again."
                     return redirect(url_for('student.book_wizard'))
@@ -380,7 +378,7 @@ def book_wizard():
             # Step 5: Confirmation
             elif current_step == 5:
                 # All data is already in booking_data, just need to prepare for display
-                current_app.logger.info("Preparing confirmation page")
+                logger.debug("Preparing confirmation page")
                 
                 # Ensure all required data is present
                 required_fields = ['module_code', 'module_name', 'tutor_id', 'tutor_name', 
@@ -399,9 +397,8 @@ def book_wizard():
                 session['booking_data'] = {}
                 return redirect(url_for('student.book_wizard'))
                 
-        except Exception as step_error:
-            current_app.logger.error(f"Error processing step {current_step}: {str(step_error)}")
-            current_app.logger.error(traceback.format_exc())
+        except Exception:
+            logger.exception("Error processing step %s", current_step)
             flash('An error occurred. Please try again.', 'danger')
             session.pop('booking_step', None)
             session.pop('booking_data', None)
@@ -420,9 +417,8 @@ def book_wizard():
                              error_occurred=error_occurred,
                              error_message=error_message)
                              
-    except Exception as e:
-        current_app.logger.error(f"Unhandled error in book_wizard view: {str(e)}")
-        current_app.logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Unhandled error in book_wizard view")
         flash('An unexpected error occurred. Please try again later.', 'danger')
         # Reset booking wizard
         session.pop('booking_step', None)
@@ -474,29 +470,27 @@ def view_content():
     module_filter = request.args.get('module', '')
     content_type_filter = request.args.get('content_type', '')
     search_query = request.args.get('search', '')
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 12
     
     # Get modules for filter dropdown
     modules = firebase_service.get_all_modules()
     
-    # Get filtered content
-    content_items, total_items = firebase_service.get_filtered_content(
+    # Get one page of filtered content
+    content_page = firebase_service.get_filtered_content(
         module_code=module_filter,
         content_type=content_type_filter,
         search_query=search_query,
-        page=page,
+        cursor=cursor,
         per_page=per_page
     )
     
-    # Calculate pagination
-    total_pages = (total_items + per_page - 1) // per_page
-    
     return render_template('student/view_content.html',
                           modules=modules,
-                          content_items=content_items,
-                          current_page=page,
-                          total_pages=total_pages)
+                          content_items=content_page['items'],
+                          next_cursor=content_page['next_cursor'],
+                          prev_cursor=content_page['prev_cursor'],
+                          total_items=content_page['total'])
 
 @student_bp.route('/download-content/<content_id>')
 @login_required
@@ -508,9 +502,30 @@ def download_content(content_id):
         flash('Content not found.', 'danger')
         return redirect(url_for('student.view_content'))
     
+    if content.get('blob_key'):
+        # Serve the file from the content blob store
+        response = serve_blob(
+            firebase_service.blob_store(),
+            content['blob_key'],
+            mimetype=content.get('content_type'),
+            download_name=content.get('file_name') or f"{content.get('title', 'content')}.{content.get('file_type', 'bin')}",
+            as_attachment=True,
+            etag=content.get('sha256')
+        )
+        # Log full downloads only: Range chunks of a resumed download (206) and
+        # cache revalidations (304) are not new downloads
+        if response.status_code == 200 and 'Range' not in request.headers:
+            firebase_service.log_content_download(current_user.id, content_id)
+        return response
+    
     # Log download for analytics
     firebase_service.log_content_download(current_user.id, content_id)
     
+    if content.get('content_text') is not None:
+        return Response(content['content_text'], mimetype='text/plain; charset=utf-8', headers={
+            'Content-Disposition': f"attachment; filename={secure_filename(content.get('title') or 'content')}.txt"
+        })
+    
     # Redirect to download URL
     return redirect(content.get('download_url', url_for('student.view_content')))
 
@@ -657,27 +672,27 @@ def get_tutor_schedule():
     date_str = request.args.get('date')
     
     if not tutor_id or not date_str:
-        current_app.logger.error(f"Missing parameters: tutor_id={tutor_id}, date={date_str}")
+        logger.error("Missing parameters: tutor_id=%s, date=%s", tutor_id, date_str)
         return jsonify({'error': 'Missing required parameters', 'success': False}), 400
     
     try:
         # Parse the date from string
         date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-        current_app.logger.info(f"Parsed date: {date_obj} for tutor: {tutor_id}")
+        logger.debug("Parsed date: %s for tutor: %s", date_obj, tutor_id)
         
         # Get the tutor's schedule
         available_slots = firebase_service.get_tutor_schedule(tutor_id, date_obj)
-        current_app.logger.info(f"Retrieved {len(available_slots)} slots for tutor {tutor_id}")
+        logger.debug("Retrieved %s slots for tutor %s", len(available_slots), tutor_id)
         
         return jsonify({
             'success': True,
             'schedule': available_slots
         })
     except ValueError as ve:
-        current_app.logger.error(f"Invalid date format: {date_str}, error: {str(ve)}")
+        logger.error("Invalid date format: %s, error: %s", date_str, ve)
         return jsonify({'error': 'Invalid date format', 'success': False}), 400
     except Exception as e:
-        current_app.logger.error(f"Error fetching tutor schedule: {str(e)}")
+        logger.error("Error fetching tutor schedule: %s", e)
         return jsonify({'error': 'Failed to retrieve schedule', 'success': False}), 500
 
 @student_bp.route('/quickbook', methods=['GET', 'POST'])
@@ -701,7 +716,7 @@ def quick_book():
         # Check if we're coming from a specific module
         module_code = request.args.get('module_code')
         if module_code:
-            print(f"Module code from query params: {module_code}")
+            logger.debug("Module code from query params: %s", module_code)
         
         # For POST method (form submission)
         if request.method == 'POST':
@@ -740,7 +755,7 @@ def quick_book():
                 else:
                     flash(f"Failed to book session: {booking_result.get('error', 'Unknown error')}", "danger")
             except Exception as e:
-                print(f"Error creating booking: {str(e)}")
+                logger.error("Error creating booking: %s", e)
                 flash("An error occurred while booking your session. Please try again.", "danger")
         
         # For GET method (displaying form)
@@ -759,7 +774,7 @@ def quick_book():
                 if selected_module:
                     module_tutors = firebase_service.get_module_tutors(module_code) or []
         except Exception as e:
-            print(f"Error loading modules or tutors: {str(e)}")
+            logger.error("Error loading modules or tutors: %s", e)
             flash("Error loading modules. Using demo data instead.", "warning")
             
             # Use demo data if real data can't be loaded
@@ -783,8 +798,8 @@ def quick_book():
             module_tutors=module_tutors,
             today_date=today_date
         )
-    except Exception as e:
-        print(f"Unhandled error in quick_book route: {str(e)}")
+    except Exception:
+        logger.exception("Unhandled error in quick_book route")
         flash("An unexpected error occurred. Please try again later.", "danger")
         return redirect(url_for('student.home'))
 
@@ -808,8 +823,7 @@ def api_tutors_by_module(module_code):
             'tutors': tutors
         })
     except Exception as e:
-        current_app.logger.error(f"Error getting tutors for module {module_code}: {str(e)}")
-        current_app.logger.error(traceback.format_exc())
+        logger.exception("Error getting tutors for module %s", module_code)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -820,7 +834,7 @@ def api_tutors_by_module(module_code):
 def quick_book_redirect():
     """Redirect to the new booking.quick route"""
     from flask import current_app
-    current_app.logger.info("Redirecting from /student/quick-book-redirect to /student/booking/quick")
+    logger.debug("Redirecting from /student/quick-book-redirect to /student/booking/quick")
     return redirect(url_for('booking.quick'))
 
 @student_bp.route('/view-bookings')
@@ -833,7 +847,7 @@ def view_bookings():
         
         # If no bookings found, possibly provide demo data in development
         if not bookings:
-            print(f"No bookings found for student {current_user.id}")
+            logger.debug("No bookings found for student %s", current_user.id)
             # If in development, we might want to show demo bookings
             # This is handled by the get_student_bookings method
 
@@ -852,7 +866,7 @@ def view_bookings():
                               debug_mode=True)
     
     except Exception as e:
-        print(f"Error in view_bookings: {str(e)}")
+        logger.error("Error in view_bookings: %s", e)
         flash("An error occurred while retrieving your bookings.", "danger")
         return redirect(url_for('student.home'))
 
@@ -886,6 +900,6 @@ def cancel_booking(booking_id):
         return redirect(url_for('student.view_bookings'))
     
     except Exception as e:
-        print(f"Error in cancel_booking: {str(e)}")
+        logger.error("Error in cancel_booking: %s", e)
         flash("An error occurred while cancelling your booking.", "danger")
         return redirect(url_for('student.view_bookings')) 
\ No newline at end of file
@@ -1,12 +1,13 @@
 from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app, jsonify
 from flask_login import login_required, current_user
-from app.models import User
 from app.services.firebase_service import FirebaseService
-from app import db
 from werkzeug.utils import secure_filename
+import logging
 import os
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 tutor_bp = Blueprint('tutor', __name__)
 firebase_service = FirebaseService()
 
@@ -17,27 +18,25 @@ def dashboard():
         flash('Access denied. You must be a tutor to view this page.', 'error')
         return redirect(url_for('main.index'))
     
-    # Get modules assigned to this tutor
-    try:
-        # Try to get assigned modules from firebase_service
-        assigned_modules = firebase_service.get_tutor_modules(current_user.id)
-    except Exception as e:
-        print(f"ERROR: Unable to get assigned modules: {str(e)}")
-        assigned_modules = []
-    
-    # Get all tutor's bookings
-    all_bookings = firebase_service.get_tutor_bookings(current_user.id)
+    # Get the modules assigned to this tutor and all the tutor's bookings at once
+    tutor_id = current_user.id
+    results = firebase_service.run_parallel({
+        'assigned_modules': lambda: firebase_service.get_tutor_modules(tutor_id),
+        'bookings': lambda: firebase_service.get_tutor_bookings(tutor_id)
+    }, defaults={'assigned_modules': [], 'bookings': []})
+    assigned_modules = results['assigned_modules'] or []
+    all_bookings = results['bookings']
     
     # If there are no bookings at all, don't bother with module filtering
     if not all_bookings:
-        print(f"DEBUG: No bookings found for dashboard")
+        logger.debug("No bookings found for dashboard")
         bookings = []
     else:
         # Extract module codes from assigned modules - normalize to lowercase for case-insensitive matching
         assigned_module_codes = []
         if assigned_modules:
             assigned_module_codes = [module['module_code'].lower() for module in assigned_modules]
-            print(f"DEBUG: Tutor is assigned to modules: {assigned_module_codes}")
+            logger.debug("Tutor is assigned to modules: %s", assigned_module_codes)
         
         # If we have assigned modules, filter bookings; otherwise show all
         if assigned_module_codes:
@@ -46,15 +45,15 @@ def dashboard():
                 booking for booking in all_bookings 
                 if booking.get('module_code') and booking.get('module_code').lower() in assigned_module_codes
             ]
-            print(f"DEBUG: Dashboard filtered to {len(bookings)} bookings for assigned modules")
+            logger.debug("Dashboard filtered to %s bookings for assigned modules", len(bookings))
             
             # If filtering resulted in no bookings, show all bookings instead
             if not bookings:
-                print(f"DEBUG: Dashboard filtering removed all bookings, showing all instead")
+                logger.debug("Dashboard filtering removed all bookings, showing all instead")
                 bookings = all_bookings
         else:
             # If no assigned modules found or error occurred, show all bookings
-            print(f"DEBUG: No assigned modules found for dashboard, showing all bookings")
+            logger.debug("No assigned modules found for dashboard, showing all bookings")
             bookings = all_bookings
     
     # Get tutor's availability
@@ -149,13 +148,13 @@ def manage_bookings():
         return redirect(url_for('tutor.dashboard'))
     
     # Get all tutor's bookings
-    print(f"DEBUG: Getting bookings for tutor {current_user.id}")
+    logger.debug("Getting bookings for tutor %s", current_user.id)
     all_bookings = firebase_service.get_tutor_bookings(current_user.id)
-    print(f"DEBUG: Retrieved {len(all_bookings)} bookings for tutor {current_user.id}")
+    logger.debug("Retrieved %s bookings for tutor %s", len(all_bookings), current_user.id)
     
     # If there are no bookings at all, don't bother with module filtering
     if not all_bookings:
-        print(f"DEBUG: No bookings found, will add demo data later")
+        logger.debug("No bookings found, will add demo data later")
         bookings = []
     else:
         # Get modules assigned to this tutor
@@ -164,14 +163,14 @@ def manage_bookings():
             # Try to get assigned modules from firebase_service
             assigned_modules = firebase_service.get_tutor_modules(current_user.id)
         except Exception as e:
-            print(f"ERROR: Unable to get assigned modules: {str(e)}")
+            logger.error("Unable to get assigned modules: %s", e)
             assigned_modules = []
             
         # Extract module codes from assigned modules - normalize to lowercase for case-insensitive matching
         assigned_module_codes = []
         if assigned_modules:
             assigned_module_codes = [module['module_code'].lower() for module in assigned_modules]
-            print(f"DEBUG: Tutor is assigned to modules: {assigned_module_codes}")
+            logger.debug("Tutor is assigned to modules: %s", assigned_module_codes)
         
         # If we have assigned modules, filter bookings; otherwise show all
         if assigned_module_codes:
@@ -180,20 +179,20 @@ def manage_bookings():
                 booking for booking in all_bookings 
                 if booking.get('module_code') and booking.get('module_code').lower() in assigned_module_codes
             ]
-            print(f"DEBUG: Filtered to {len(bookings)} bookings for assigned modules")
+            logger.debug("Filtered to %s bookings for assigned modules", len(bookings))
             
             # If filtering resulted in no bookings, show all bookings instead
             if not bookings:
-                print(f"DEBUG: Filtering removed all bookings, showing all instead")
+                logger.debug("Filtering removed all bookings, showing all instead")
                 bookings = all_bookings
         else:
             # If no assigned modules found or error occurred, show all bookings
-            print(f"DEBUG: No assigned modules found, showing all bookings")
+            logger.debug("No assigned modules found, showing all bookings")
             bookings = all_bookings
     
     # Add some demo bookings if none exist (fallback protection)
     if not bookings:
-        print(f"DEBUG: No bookings found, adding demo data as fallback")
+        logger.debug("No bookings found, adding demo data as fallback")
         today = datetime.now()
         bookings = [
             {
@@ -305,23 +304,22 @@ def upload_content():
         if 'file' in request.files:
             file = request.files['file']
             if file.filename:
-                # Save file to disk
                 filename = secure_filename(file.filename)
-                file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
                 
                 # Get file type from extension
                 file_type = os.path.splitext(filename)[1][1:].lower()
                 
                 try:
-                    # Upload file reference to Firestore
+                    # Stream the file into the content blob store
                     firebase_service.upload_content(
-                        content_data=file_path,  # Store the file path
+                        content_data=file.stream,
                         module_code=module_code,
                         title=title,
                         description=description,
                         tutor_id=current_user.id,
-                        file_type=file_type
+                        file_type=file_type,
+                        file_name=filename,
+                        content_type=file.mimetype
                     )
                     flash('Content uploaded successfully', 'success')
                 except Exception as e:
@@ -391,24 +389,12 @@ def my_modules():
     # Get modules assigned to this tutor
     assigned_modules = firebase_service.get_tutor_modules(current_user.id)
     
-    # Get all students assigned to each module for quick reference
+    # Get the students of every module for quick reference (one sessions query)
+    students_by_module = firebase_service.get_tutor_module_students(current_user.id)
     module_students = {}
     for module in assigned_modules:
         module_code = module['module_code']
-        # Get bookings for this module and tutor to find unique students
-        bookings = firebase_service.get_tutor_bookings(current_user.id)
-        students = []
-        student_ids = set()
-        
-        for booking in bookings:
-            if booking.get('module_code') == module_code and booking.get('student_id') not in student_ids:
-                student_ids.add(booking.get('student_id'))
-                students.append({
-                    'id': booking.get('student_id'),
-                    'name': booking.get('student_name')
-                })
-        
-        module_students[module_code] = students
+        module_students[module_code] = students_by_module.get(str(module_code), [])
     
     return render_template('tutor/my_modules.html', 
                           assigned_modules=assigned_modules,
@@ -0,0 +1,174 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: blob locks only cover threads of one process (fine for the dev server)
+    fcntl = None
+
+
+class BlobStore:
+    """
+    Content-addressed storage for uploaded files.
+
+    Blobs are keyed by the SHA-256 of their bytes, so storing the same file
+    twice keeps a single copy. Backends implement stage/commit/discard (an
+    upload is hashed first and put in place later) plus open/exists/delete;
+    `local_path` lets a backend hand out a filesystem path so the web layer
+    can serve the file directly (Range requests, sendfile).
+
+    `lock(key)` serialises whoever adds or drops references to one blob, so
+    a blob can't be deleted between another upload counting it and putting
+    it in place.
+    """
+
+    # Bytes read from an upload stream per step
+    CHUNK_SIZE = 64 * 1024
+
+    def stage(self, stream):
+        """Read and hash an upload; returns {'key', 'sha256', 'size'} to commit() or discard()"""
+        raise NotImplementedError
+
+    def commit(self, staged):
+        """Put a staged upload in place, unless the same bytes are already stored"""
+        raise NotImplementedError
+
+    def discard(self, staged):
+        """Drop whatever is left of a staged upload (safe after commit)"""
+
+    def put(self, stream):
+        """Store the bytes read from a file-like object; returns {'key', 'sha256', 'size'}"""
+        staged = self.stage(stream)
+        try:
+            self.commit(staged)
+        finally:
+            self.discard(staged)
+        return {'key': staged['key'], 'sha256': staged['sha256'], 'size': staged['size']}
+
+    def lock(self, key):
+        """Context manager holding the blob's reference lock"""
+        return contextlib.nullcontext()
+
+    def open(self, key):
+        """Open a stored blob for binary reading"""
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def local_path(self, key):
+        """Filesystem path of a blob, or None if the backend has no local files"""
+        return None
+
+    def relative_path(self, key):
+        """Path of a blob relative to the store root (for a front proxy), or None"""
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blob store on the local filesystem.
+
+    Blobs live under `root/ab/cd/<sha256>`, sharded on the first hash bytes
+    so no directory grows too large. Uploads are streamed to a temporary file
+    in `root/tmp` while being hashed, then moved into place atomically.
+    Blob locks are flock()s on one of 256 files in `root/locks`, picked by
+    the key's first byte, so they hold across worker processes.
+    """
+
+    # Thread locks backing the file locks where fcntl is unavailable
+    _thread_locks = {}
+    _thread_locks_guard = threading.Lock()
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(self.root, 'tmp'), exist_ok=True)
+        os.makedirs(os.path.join(self.root, 'locks'), exist_ok=True)
+
+    def _path(self, key):
+        if len(key) != 64 or any(c not in '0123456789abcdef' for c in key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def stage(self, stream):
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, 'tmp'))
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                while True:
+                    chunk = stream.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        key = digest.hexdigest()
+        return {'key': key, 'sha256': key, 'size': size, 'tmp_path': tmp_path}
+
+    def commit(self, staged):
+        path = self._path(staged['key'])
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(staged['tmp_path'], path)
+
+    def discard(self, staged):
+        try:
+            os.remove(staged['tmp_path'])
+        except FileNotFoundError:
+            pass
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        self._path(key)  # validates the key
+        stripe = key[:2]
+        if fcntl is None:
+            with LocalBlobStore._thread_locks_guard:
+                thread_lock = LocalBlobStore._thread_locks.setdefault(stripe, threading.Lock())
+            with thread_lock:
+                yield
+            return
+        with open(os.path.join(self.root, 'locks', f'{stripe}.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def local_path(self, key):
+        return self._path(key)
+
+    def relative_path(self, key):
+        return os.path.relpath(self._path(key), self.root).replace(os.sep, '/')
+
+
+def create_blob_store(backend, root):
+    """Build the blob store configured by BLOB_STORE_BACKEND"""
+    if backend == 'local':
+        if not root:
+            raise ValueError("BLOB_STORE_PATH must be set to persistent storage for the local blob store")
+        return LocalBlobStore(root)
+    raise ValueError(f"Unknown blob store backend: {backend}")
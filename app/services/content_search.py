@@ -0,0 +1,213 @@
+import contextlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process build lock (the dev server runs a single process anyway)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ContentSearchIndex:
+    """
+    Full-text index over learning content, stored in a local SQLite FTS5
+    database.
+
+    Titles, descriptions and module names are tokenised into an inverted
+    index; queries match every word as a prefix and are ranked with BM25
+    (title hits weigh most). Firestore stays the source of truth: the index
+    only maps search terms to content IDs and can be rebuilt at any time.
+
+    Full builds hold an exclusive lock on `<path>.lock`, so when several
+    worker processes start with a missing index only one of them builds it.
+    """
+
+    # BM25 column weights for (title, description, module_name)
+    WEIGHTS = (10.0, 4.0, 2.0)
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self.available = True
+
+    def _connection(self):
+        # One connection per process; a forked worker must not reuse its parent's
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            try:
+                conn.executescript('''
+                    CREATE TABLE IF NOT EXISTS content_docs (
+                        rowid INTEGER PRIMARY KEY,
+                        content_id TEXT NOT NULL UNIQUE,
+                        module_code TEXT,
+                        type TEXT
+                    );
+                    CREATE INDEX IF NOT EXISTS content_docs_filters ON content_docs (module_code, type);
+                    CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+                        title, description, module_name,
+                        tokenize = "unicode61 remove_diacritics 2",
+                        prefix = "2 3"
+                    );
+                    CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT);
+                ''')
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5
+                logger.warning("Content search index unavailable: %s", e)
+                self.available = False
+                conn.close()
+                raise
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def build_match(query):
+        """Turn free text into an FTS5 query that prefix-matches every word; None if no words"""
+        terms = re.findall(r'\w+', (query or '').lower())
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def is_built(self):
+        """Whether the index has been fully built at least once"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM index_meta WHERE key = 'built'").fetchone()
+        return row is not None
+
+    @contextlib.contextmanager
+    def _build_lock(self):
+        """Exclusive lock across processes sharing the index file"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def build_if_missing(self, load_items):
+        """
+        Build the index unless it has been built already (by this or another process)
+
+        Args:
+            load_items (callable): Returns the (content_id, data, module_name) tuples to index
+
+        Returns:
+            int or None: Number of items indexed, or None if the index was already built
+        """
+        with self._build_lock():
+            if self.is_built():
+                return None
+            return self._rebuild(load_items())
+
+    def upsert(self, content_id, data, module_name=''):
+        """Add or replace a content item in the index"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                self._upsert(conn, str(content_id), data, module_name)
+
+    def _upsert(self, conn, content_id, data, module_name):
+        row = conn.execute('SELECT rowid FROM content_docs WHERE content_id = ?', (content_id,)).fetchone()
+        if row:
+            conn.execute('DELETE FROM content_fts WHERE rowid = ?', (row[0],))
+            conn.execute('UPDATE content_docs SET module_code = ?, type = ? WHERE rowid = ?',
+                         (data.get('module_code', ''), data.get('type', ''), row[0]))
+            rowid = row[0]
+        else:
+            rowid = conn.execute('INSERT INTO content_docs (content_id, module_code, type) VALUES (?, ?, ?)',
+                                 (content_id, data.get('module_code', ''), data.get('type', ''))).lastrowid
+        conn.execute('INSERT INTO content_fts (rowid, title, description, module_name) VALUES (?, ?, ?, ?)',
+                     (rowid, data.get('title', ''), data.get('description', ''), module_name or ''))
+
+    def delete(self, content_id):
+        """Remove a content item from the index"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                row = conn.execute('SELECT rowid FROM content_docs WHERE content_id = ?',
+                                   (str(content_id),)).fetchone()
+                if row:
+                    conn.execute('DELETE FROM content_fts WHERE rowid = ?', (row[0],))
+                    conn.execute('DELETE FROM content_docs WHERE rowid = ?', (row[0],))
+
+    def rebuild(self, items):
+        """
+        Replace the whole index
+
+        Args:
+            items (iterable): (content_id, data, module_name) tuples
+
+        Returns:
+            int: Number of items indexed
+        """
+        with self._build_lock():
+            return self._rebuild(items)
+
+    def _rebuild(self, items):
+        # Read everything first, so searches in this process aren't blocked while Firestore streams
+        items = list(items)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute('DELETE FROM content_fts')
+                conn.execute('DELETE FROM content_docs')
+                count = 0
+                for content_id, data, module_name in items:
+                    self._upsert(conn, str(content_id), data, module_name)
+                    count += 1
+                conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('built', datetime('now'))")
+            conn.execute("INSERT INTO content_fts (content_fts) VALUES ('optimize')")
+            conn.commit()
+        return count
+
+    def search(self, query, module_code=None, content_type=None, limit=12, offset=0):
+        """
+        Ranked search
+
+        Returns:
+            tuple: (list of content IDs, best match first; total number of matches)
+        """
+        match = self.build_match(query)
+        if match is None:
+            return [], 0
+
+        where = 'content_fts MATCH ?'
+        params = [match]
+        if module_code:
+            where += ' AND d.module_code = ?'
+            params.append(str(module_code))
+        if content_type:
+            where += ' AND d.type = ?'
+            params.append(content_type)
+
+        # CROSS JOIN keeps SQLite driving the query from the FTS match rather
+        # than from the module/type index, which is far slower for broad filters
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                f'SELECT d.content_id FROM content_fts CROSS JOIN content_docs d ON d.rowid = content_fts.rowid '
+                f'WHERE {where} ORDER BY bm25(content_fts, ?, ?, ?) LIMIT ? OFFSET ?',
+                params + list(self.WEIGHTS) + [limit, offset]).fetchall()
+            total = conn.execute(
+                f'SELECT COUNT(*) FROM content_fts CROSS JOIN content_docs d ON d.rowid = content_fts.rowid '
+                f'WHERE {where}', params).fetchone()[0]
+        return [row[0] for row in rows], total
@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def init_firebase():
+    """
+    Initialize the Firebase Admin app from environment variables (once per process tree).
+
+    This only loads credentials; no network connection is opened, so it is
+    safe to call in the gunicorn master before workers are forked.
+
+    Returns:
+        firebase_admin.App: The default Firebase app
+    """
+    import firebase_admin
+    from firebase_admin import credentials
+
+    try:
+        return firebase_admin.get_app()
+    except ValueError:
+        pass
+
+    logger.info("Initializing Firebase Admin SDK...")
+
+    # Create credentials dictionary from environment variables
+    cred_dict = {
+        "type": "service_account",
+        "project_id": os.environ.get('FIREBASE_PROJECT_ID'),
+        "private_key_id": os.environ.get('FIREBASE_PRIVATE_KEY_ID'),
+        "private_key": os.environ.get('FIREBASE_PRIVATE_KEY', '').replace('\\n', '\n'),
+        "client_email": os.environ.get('FIREBASE_CLIENT_EMAIL'),
+        "client_id": os.environ.get('FIREBASE_CLIENT_ID'),
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+        "client_x509_cert_url": os.environ.get('FIREBASE_CLIENT_X509_CERT_URL') or os.environ.get('FIREBASE_CLIENT_CERT_URL')
+    }
+
+    # Verify required credentials are present
+    required_fields = ['project_id', 'private_key', 'client_email']
+    missing_fields = [field for field in required_fields if not cred_dict.get(field)]
+    if missing_fields:
+        raise ValueError(f"Missing required Firebase credentials: {', '.join(missing_fields)}")
+
+    logger.info("Initializing Firebase with credentials from environment variables...")
+    app = firebase_admin.initialize_app(credentials.Certificate(cred_dict))
+    logger.info("Firebase Admin SDK initialized successfully")
+    return app
+
+
+def get_db():
+    """
+    The Firestore client of the current process, created on first use.
+
+    gRPC channels do not survive fork(), so a client is never shared between
+    processes: a forked worker that inherits its parent's client gets a new
+    one the first time it asks.
+
+    Returns:
+        google.cloud.firestore.Client: Firestore client
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _lock:
+            if _client is None or _client_pid != os.getpid():
+                from google.cloud.firestore import Client as FirestoreClient
+                from app.services.firestore_metrics import instrument_client
+
+                app = init_firebase()
+                _client = instrument_client(FirestoreClient(credentials=app.credential.get_credential(),
+                                                            project=app.project_id))
+                _client_pid = os.getpid()
+                logger.info("Firestore client initialized successfully in process %s", _client_pid)
+    return _client
+
+
+def client_created():
+    """Whether this process already holds a Firestore client"""
+    return _client is not None and _client_pid == os.getpid()
@@ -1,19 +1,69 @@
 import os
 from datetime import datetime, timezone
-import firebase_admin
-from firebase_admin import credentials, firestore, auth, initialize_app
-from google.cloud.firestore import Client as FirestoreClient
 from datetime import datetime, timedelta, timezone
 import uuid
 import base64
+import copy
+import logging
+import threading
+import time
+from config import Config
+from app.utils.lazy_import import lazy_import
+from app.utils.cache import TTLCache, request_memoized, invalidates_request_memo
 from app.utils.date_utils import parse_date
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services.reference_loader import ReferenceLoader
+from app.services.live_replica import CollectionReplica
+from app.services.notification_outbox import NotificationOutbox
+from app.services.reservation_sweeper import ReservationSweeper
+from app.services.content_search import ContentSearchIndex
+from app.services.blob_store import create_blob_store
+from app.services.query_pool import QueryPool
+from app.services.firebase_client import init_firebase, get_db
+from app.services import slot_occupancy
 from typing import Dict, List, Optional, Tuple, Any
-import pytz
+
+logger = logging.getLogger(__name__)
+
+# The Firestore SDK (gRPC, protobuf) and the auth client load on first use rather than at start-up
+firestore = lazy_import('firebase_admin.firestore')
+auth = lazy_import('firebase_admin.auth')
 
 class FirebaseService:
     _instance = None
     _initialized = False
     
+    # Process-wide cache of the module catalog and per-module lookups
+    _module_cache = TTLCache(Config.MODULE_CACHE_TTL, Config.MODULE_CACHE_MAX_ENTRIES)
+    
+    # Short-lived cache for dashboard statistics built from aggregation queries
+    _stats_cache = TTLCache(Config.STATS_CACHE_TTL, max_entries=64)
+    
+    # Tutor directory and per-module/per-tutor assignment sets for the admin assignment pages
+    _eligibility_cache = TTLCache(Config.ELIGIBILITY_CACHE_TTL, max_entries=512)
+    
+    # Logged-in users, looked up on every authenticated request (see get_session_user)
+    _user_cache = TTLCache(Config.USER_CACHE_TTL, max_entries=Config.USER_CACHE_MAX_ENTRIES)
+    
+    # Listener-backed replicas of small, hot collections (see start_live_replica)
+    _replicas = {}
+    REPLICATED_COLLECTIONS = ('modules', 'module_tutors', 'session_revocations')
+    
+    # Background writer for notifications (see _notification_outbox)
+    _outbox = None
+    
+    # Background expiry of stale reservations (see start_reservation_sweeper)
+    _sweeper = None
+    
+    # Full-text index for content search (see _content_search)
+    _search_index = None
+    
+    # Storage for uploaded file bytes (see blob_store)
+    _blob_store = None
+    
+    # Shared pool for independent reads issued together (see run_parallel)
+    _query_pool = QueryPool(Config.QUERY_POOL_WORKERS, Config.QUERY_TIMEOUT)
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(FirebaseService, cls).__new__(cls)
@@ -21,150 +71,493 @@ class FirebaseService:
     
     def __init__(self):
         if not FirebaseService._initialized:
-            print("Initializing Firebase Admin SDK...")
-            try:
-                # Try to get existing app
-                self.app = firebase_admin.get_app()
-                print("Firebase already initialized, reusing existing app")
-            except ValueError:
-                print("Initializing Firebase with credentials from environment variables...")
-                # Initialize new app
-                cred = credentials.Certificate({
-                    "type": "service_account",
-                    "project_id": os.getenv('FIREBASE_PROJECT_ID'),
-                    "private_key_id": os.getenv('FIREBASE_PRIVATE_KEY_ID'),
-                    "private_key": os.getenv('FIREBASE_PRIVATE_KEY').replace('\\n', '\n'),
-                    "client_email": os.getenv('FIREBASE_CLIENT_EMAIL'),
-                    "client_id": os.getenv('FIREBASE_CLIENT_ID'),
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-                    "client_x509_cert_url": os.getenv('FIREBASE_CLIENT_CERT_URL')
-                })
-                self.app = initialize_app(cred)
-            
-            self.db = firestore.client()
-            print("Firestore client initialized successfully")
+            # Credentials only; the Firestore client is created per process on first use
+            self.app = init_firebase()
             FirebaseService._initialized = True
+    
+    @property
+    def db(self):
+        """Firestore client of the current process (see app.services.firebase_client)"""
+        return get_db()
 
     def _ensure_db(self):
         """Ensure database connection is available"""
         return True  # Always return True since we require Firebase
 
+    def _load_references(self, records, references):
+        """
+        Resolve the users/modules referenced by a result set in batches
+        
+        Args:
+            records (list): Result dicts holding the reference fields
+            references (dict): Maps a record field to the collection it references,
+                e.g. {'student_id': 'users', 'module_code': 'modules'}
+                
+        Returns:
+            ReferenceLoader: Loader holding the resolved documents (empty on failure)
+        """
+        loader = ReferenceLoader(self.db)
+        try:
+            primed_modules = set()
+            for field, collection in references.items():
+                if collection == 'modules':
+                    # Modules already in the catalog cache don't need a read
+                    for record in records:
+                        module_code = record.get(field)
+                        cached = self._get_cached_module(str(module_code)) if module_code else TTLCache.MISS
+                        if cached is not TTLCache.MISS:
+                            loader.prime('modules', module_code, cached)
+                            primed_modules.add(str(module_code))
+                loader.add_many(records, field, collection)
+            loader.load()
+            
+            # Cache only what was just read; re-storing cached entries would keep extending their TTL
+            for module_code, module_data in loader.loaded('modules').items():
+                if module_data is not None and module_code not in primed_modules:
+                    self._cache_module(module_code, module_data)
+        except Exception as e:
+            logger.error("Failed to load referenced documents: %s", e)
+        return loader
+    
+    def _count(self, query):
+        """Count matching documents with a server-side aggregation (no documents are transferred)"""
+        result = query.count(alias='count').get()
+        return int(result[0][0].value)
+    
+    def _sum(self, query, field):
+        """Sum a numeric field over matching documents with a server-side aggregation"""
+        result = query.sum(field, alias='total').get()
+        return result[0][0].value or 0
+    
+    @staticmethod
+    def _slot_duration_hours(start_time, end_time, default=0):
+        """Length of a session in hours, from HH:MM start and end times; `default` if they don't parse"""
+        try:
+            start = datetime.strptime(start_time, '%H:%M')
+            end = datetime.strptime(end_time, '%H:%M')
+            return max((end - start).total_seconds() / 3600, 0)
+        except (TypeError, ValueError):
+            return default
+    
+    def _read_occupancy(self, transaction, tutor_id, date_str):
+        """Read a tutor's occupancy entry for a date inside a transaction; returns (ref, slots_mask)"""
+        occupancy_ref = self.db.collection(slot_occupancy.OCCUPANCY_COLLECTION) \
+                            .document(slot_occupancy.occupancy_doc_id(tutor_id, date_str))
+        snapshot = occupancy_ref.get(transaction=transaction)
+        slots_mask = (snapshot.to_dict() or {}).get('slots_mask', 0) if snapshot.exists else 0
+        return occupancy_ref, slots_mask
+    
+    def _write_occupancy(self, transaction, occupancy_ref, tutor_id, date_str, slots_mask):
+        """Write a tutor's occupancy entry for a date inside a transaction"""
+        transaction.set(occupancy_ref, {
+            'tutor_id': str(tutor_id),
+            'date': date_str,
+            'slots_mask': slots_mask,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        })
+    
+    def _lock_ref(self, session_data):
+        """Reference to the slot lock a session holds"""
+        return self.db.collection(slot_occupancy.LOCK_COLLECTION).document(slot_occupancy.slot_lock_id(
+            session_data.get('tutor_id'), session_data.get('date'), session_data.get('start_time')))
+    
+    def _create_session(self, session_ref, session_data):
+        """
+        Claim the session's slot lock, write the session and mark its slot as
+        occupied, all in a single transaction
+        
+        Args:
+            session_ref: Reference of the new session document
+            session_data (dict): Session fields
+            
+        Returns:
+            bool: True if the session was written, False if the slot is already taken
+        """
+        bit = slot_occupancy.session_bit(session_data)
+        tutor_id = session_data.get('tutor_id')
+        date_str = session_data.get('date')
+        lock_ref = self._lock_ref(session_data)
+        
+        @firestore.transactional
+        def apply(transaction):
+            lock = lock_ref.get(transaction=transaction)
+            occupancy_ref, slots_mask = self._read_occupancy(transaction, tutor_id, date_str)
+            
+            # Occupancy also covers sessions booked before slot locks existed
+            if lock.exists or slots_mask & bit:
+                return False
+            
+            transaction.set(lock_ref, {
+                'session_id': session_ref.id,
+                'tutor_id': str(tutor_id),
+                'date': date_str,
+                'start_time': session_data.get('start_time'),
+                'created_at': firestore.SERVER_TIMESTAMP
+            })
+            transaction.set(session_ref, session_data)
+            if bit:
+                self._write_occupancy(transaction, occupancy_ref, tutor_id, date_str, slots_mask | bit)
+            return True
+        
+        return apply(self.db.transaction())
+    
+    def _set_session_status(self, session_id, new_status, updates=None):
+        """
+        Change a session's status and keep the slot occupancy index in step,
+        in a single transaction
+        
+        Args:
+            session_id (str): The session ID
+            new_status (str): Status to store
+            updates (dict, optional): Extra fields to write with the status
+            
+        Returns:
+            dict: Session data as it was before the update, or None if the session doesn't exist
+        """
+        session_ref = self.db.collection('sessions').document(str(session_id))
+        
+        @firestore.transactional
+        def apply(transaction):
+            snapshot = session_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            session_data = snapshot.to_dict() or {}
+            
+            # Only touch the index when the session gains or releases its slot
+            old_bit = slot_occupancy.session_bit(session_data)
+            new_bit = slot_occupancy.session_bit({**session_data, 'status': new_status})
+            tutor_id = session_data.get('tutor_id')
+            date_str = session_data.get('date')
+            if old_bit != new_bit:
+                occupancy_ref, slots_mask = self._read_occupancy(transaction, tutor_id, date_str)
+            
+            # A session that stops occupying its slot hands the lock back
+            releases = slot_occupancy.occupies_slot(session_data.get('status')) \
+                and not slot_occupancy.occupies_slot(new_status)
+            if releases:
+                lock_ref = self._lock_ref(session_data)
+                lock = lock_ref.get(transaction=transaction)
+                releases = lock.exists and (lock.to_dict() or {}).get('session_id') == snapshot.id
+            
+            transaction.update(session_ref, {'status': new_status, **(updates or {})})
+            if old_bit != new_bit:
+                self._write_occupancy(transaction, occupancy_ref, tutor_id, date_str,
+                                      (slots_mask & ~old_bit) | new_bit)
+            if releases:
+                transaction.delete(lock_ref)
+            return session_data
+        
+        return apply(self.db.transaction())
+    
+    @invalidates_request_memo
+    def rebuild_slot_occupancy(self, dry_run=False):
+        """
+        Recompute the slot occupancy index from the sessions collection
+        
+        Args:
+            dry_run (bool): Only report mismatches without writing fixes (verify mode)
+            
+        Returns:
+            dict: Counts of entries checked, mismatched and fixed
+        """
+        expected = {}
+        query = self.db.collection('sessions').select(['tutor_id', 'date', 'start_time', 'end_time', 'status'])
+        for doc in query.stream():
+            session_data = doc.to_dict() or {}
+            if not session_data.get('tutor_id') or not session_data.get('date'):
+                continue
+            key = (str(session_data['tutor_id']), session_data['date'])
+            expected[key] = expected.get(key, 0) | slot_occupancy.session_bit(session_data)
+        
+        actual = {}
+        for doc in self.db.collection(slot_occupancy.OCCUPANCY_COLLECTION).stream():
+            data = doc.to_dict() or {}
+            actual[(str(data.get('tutor_id')), data.get('date'))] = (doc.reference, data.get('slots_mask', 0))
+        
+        mismatched = []
+        for key in set(expected) | set(actual):
+            if expected.get(key, 0) != actual.get(key, (None, 0))[1]:
+                mismatched.append(key)
+        
+        fixed = 0
+        if not dry_run and mismatched:
+            batch = self.db.batch()
+            for i, (tutor_id, date_str) in enumerate(mismatched, 1):
+                occupancy_ref = self.db.collection(slot_occupancy.OCCUPANCY_COLLECTION) \
+                                    .document(slot_occupancy.occupancy_doc_id(tutor_id, date_str))
+                batch.set(occupancy_ref, {
+                    'tutor_id': tutor_id,
+                    'date': date_str,
+                    'slots_mask': expected.get((tutor_id, date_str), 0),
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                })
+                if i % 400 == 0:
+                    batch.commit()
+                    batch = self.db.batch()
+            batch.commit()
+            fixed = len(mismatched)
+        
+        checked = len(set(expected) | set(actual))
+        logger.debug("Occupancy index checked %s entries, %s mismatched, %s fixed", checked, len(mismatched), fixed)
+        return {
+            'checked': checked,
+            'mismatched': len(mismatched),
+            'fixed': fixed
+        }
+    
+    def start_live_replica(self, sources=None):
+        """
+        Keep in-memory replicas of the modules, module_tutors and
+        session_revocations collections current with Firestore snapshot listeners
+        
+        Args:
+            sources (dict, optional): Collection name -> listener source. Defaults to the
+                Firestore collection references; tests can pass FakeListenerSource objects.
+        """
+        sources = sources or {name: self.db.collection(name) for name in self.REPLICATED_COLLECTIONS}
+        for name, source in sources.items():
+            if name in FirebaseService._replicas:
+                continue
+            try:
+                FirebaseService._replicas[name] = CollectionReplica(name, source).start()
+            except Exception as e:
+                logger.error("Failed to start live replica for %s: %s", name, e)
+    
+    def stop_live_replica(self):
+        """Stop every replica listener; reads go back to direct queries"""
+        for replica in FirebaseService._replicas.values():
+            replica.stop()
+        FirebaseService._replicas = {}
+    
+    def _replica(self, name):
+        """Return the replica for a collection if it is running and warmed up, else None"""
+        replica = self._replicas.get(name)
+        if replica is not None and replica.ready:
+            return replica
+        return None
+    
+    def _query_module_tutors(self, field, value):
+        """Module-tutor assignments where field == value, from the live replica when ready"""
+        replica = self._replica('module_tutors')
+        if replica is not None:
+            return replica.where(field, str(value))
+        return list(self.db.collection('module_tutors').where(field, '==', str(value)).stream())
+    
+    def _get_cached_module(self, module_code):
+        """
+        Look up a module in the live replica or the module cache
+        
+        Returns:
+            dict, None or TTLCache.MISS: Module data, None for a known-missing code,
+            or TTLCache.MISS when neither can answer
+        """
+        replica = self._replica('modules')
+        if replica is not None:
+            module = replica.get(module_code)
+            if module is None:
+                return None
+            return self._with_module_code(module_code, module.to_dict())
+        
+        cached = self._module_cache.get(('module', module_code))
+        if cached is not TTLCache.MISS:
+            return cached
+        
+        # A cached catalog is authoritative for every code. The entry is not copied
+        # into the per-module cache, where it would outlive the catalog's TTL.
+        catalog = self._module_cache.get('catalog')
+        if catalog is not TTLCache.MISS:
+            for doc_id, module_data in catalog:
+                if doc_id == module_code:
+                    return self._with_module_code(doc_id, copy.deepcopy(module_data))
+            return None
+        
+        return TTLCache.MISS
+    
+    @staticmethod
+    def _with_module_code(module_code, module_data):
+        """Add the code fields every module dict carries and return it"""
+        module_data['code'] = module_code
+        module_data['module_code'] = module_code
+        return module_data
+    
+    def _cache_module(self, module_code, module_data):
+        """Store a module read from Firestore in the cache (None caches a missing code) and return it"""
+        if module_data is None:
+            self._module_cache.set(('module', module_code), None, ttl=Config.MODULE_CACHE_NEGATIVE_TTL)
+            return None
+        module_data = self._with_module_code(module_code, module_data)
+        self._module_cache.set(('module', module_code), module_data)
+        return module_data
+    
+    def _invalidate_module_cache(self):
+        """Drop the cached catalog and every cached module after a module write"""
+        self._module_cache.clear()
+
     # Booking related operations
-    def create_booking(self, student_id, tutor_id, module_code, session_date, time_slot, notes=''):
+    @invalidates_request_memo
+    def book_session(self, student_id, tutor_id, module_code, date, start_time, end_time, notes=''):
         """
-        Create a new tutoring session booking
+        Book a tutoring session in one step. The slot lock, the session and the
+        tutor's occupancy entry are written in a single transaction, so a slot
+        can only ever be booked once.
         
         Args:
             student_id (str): The student's user ID
             tutor_id (str): The tutor's user ID
             module_code (str): The module code
-            session_date (str): Session date in YYYY-MM-DD format
-            time_slot (str): Time slot in format "HH:MM - HH:MM"
+            date (datetime.date or str): Session date
+            start_time (str): Start time (HH:MM)
+            end_time (str): End time (HH:MM)
             notes (str, optional): Additional notes for the session
             
         Returns:
-            dict: Result with success status and booking ID or error message
+            dict: {'success': True, 'booking_id': ...} on success, otherwise
+                {'success': False, 'error': ...} with 'conflict': True when the slot is taken
         """
         try:
-            print(f"DEBUG: create_booking called with: student_id={student_id}, tutor_id={tutor_id}, module_code={module_code}")
-            print(f"DEBUG: session_date={session_date}, time_slot={time_slot}")
+            logger.debug("book_session called with: student_id=%s, tutor_id=%s, module_code=%s",
+                         student_id, tutor_id, module_code)
+            logger.debug("date=%s, time=%s - %s", date, start_time, end_time)
             
             # Validate required fields
-            if not all([student_id, tutor_id, module_code, session_date, time_slot]):
+            if not all([student_id, tutor_id, module_code, date, start_time, end_time]):
                 return {
                     'success': False,
                     'error': 'Missing required fields for booking'
                 }
-                
-            # Parse the time slot to get start and end times
+            
+            student_id = str(student_id)
+            tutor_id = str(tutor_id)
+            module_code = str(module_code)
+            
+            # Validate the date and times
             try:
-                start_time, end_time = time_slot.split(' - ')
-            except ValueError:
+                if isinstance(date, str):
+                    date_obj = datetime.strptime(date, '%Y-%m-%d').date()
+                else:
+                    date_obj = date
+                date_str = date_obj.strftime('%Y-%m-%d')
+                datetime.strptime(start_time, '%H:%M')
+                datetime.strptime(end_time, '%H:%M')
+            except (TypeError, ValueError, AttributeError) as e:
+                logger.error("Invalid booking date or time: %s", e)
                 return {
                     'success': False,
-                    'error': 'Invalid time slot format'
+                    'error': 'Invalid date or time slot format'
                 }
             
-            # Create the session document
-            session_ref = self.db.collection('sessions').document()
+            if date_obj < datetime.now().date():
+                return {
+                    'success': False,
+                    'error': 'Sessions cannot be booked in the past'
+                }
             
-            # Get student and tutor data for reference
-            try:
-                student = self.db.collection('users').document(student_id).get().to_dict() or {}
-                tutor = self.db.collection('users').document(tutor_id).get().to_dict() or {}
-                module = self.db.collection('modules').document(module_code).get().to_dict() or {}
-                
-                student_name = student.get('name', 'Unknown Student')
-                tutor_name = tutor.get('name', 'Unknown Tutor')
-                module_name = module.get('name', f"Module {module_code}")
-            except Exception as e:
-                print(f"WARNING: Error retrieving related data: {e}")
-                student_name = 'Unknown Student'
-                tutor_name = 'Unknown Tutor'
-                module_name = f"Module {module_code}"
+            # Names are denormalised onto the session; fetch them in one batch
+            refs = self._load_references(
+                [{'student_id': student_id, 'tutor_id': tutor_id, 'module_code': module_code}],
+                {'student_id': 'users', 'tutor_id': 'users', 'module_code': 'modules'}
+            )
+            student = refs.get('users', student_id, {})
+            tutor = refs.get('users', tutor_id, {})
+            module = refs.get('modules', module_code, {})
             
+            session_ref = self.db.collection('sessions').document()
             session_data = {
                 'id': session_ref.id,  # Store ID in the document itself for easier reference
                 'student_id': student_id,
                 'tutor_id': tutor_id,
                 'module_code': module_code,
-                'date': session_date,
+                'date': date_str,
                 'start_time': start_time,
                 'end_time': end_time,
-                'time_slot': time_slot,
+                'time_slot': f"{start_time} - {end_time}",
                 'status': 'pending',  # Start as pending for tutor to confirm
                 'created_at': firestore.SERVER_TIMESTAMP,
                 'location': 'Online',  # Default location
                 'notes': notes,
                 'has_feedback': False,
-                'student_name': student_name,
-                'tutor_name': tutor_name,
-                'module_name': module_name
+                'duration_hours': self._slot_duration_hours(start_time, end_time),
+                'student_name': student.get('name', 'Unknown Student'),
+                'tutor_name': tutor.get('name', 'Unknown Tutor'),
+                'module_name': module.get('name') or module.get('module_name') or f"Module {module_code}"
             }
             
-            print(f"DEBUG: Creating session with data: {session_data}")
-            session_ref.set(session_data)
+            logger.debug("Creating session with data: %s", session_data)
+            if not self._create_session(session_ref, session_data):
+                logger.debug("Slot %s %s for tutor %s is already booked", date_str, start_time, tutor_id)
+                return {
+                    'success': False,
+                    'conflict': True,
+                    'error': 'This time slot has already been booked'
+                }
             
-            # Create notifications
-            try:
-                # Notification for tutor
-                self._create_notification(
-                    user_id=tutor_id,
-                    title="New Session Booking Request",
-                    message=f"A student has requested a tutoring session with you on {session_date} at {start_time}. Please confirm or reject this request.",
-                    type="booking",
-                    reference_id=session_ref.id
-                )
-                
-                # Notification for student
-                self._create_notification(
-                    user_id=student_id,
-                    title="Session Booking Submitted",
-                    message=f"Your tutoring session request has been submitted for {session_date} at {start_time}. Waiting for tutor confirmation.",
-                    type="booking",
-                    reference_id=session_ref.id
-                )
-            except Exception as notif_error:
-                print(f"WARNING: Failed to create notifications: {notif_error}")
-                # Continue even if notifications fail
+            self._notify_session_requested(session_ref.id, session_data)
             
-            print(f"DEBUG: Booking created successfully with ID: {session_ref.id}")
+            logger.debug("Booking created successfully with ID: %s", session_ref.id)
             return {
                 'success': True,
                 'booking_id': session_ref.id
             }
             
         except Exception as e:
-            print(f"ERROR: Failed to create booking: {str(e)}")
-            import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+            logger.exception("Failed to book session")
             return {
                 'success': False,
                 'error': str(e)
             }
+    
+    def _notify_session_requested(self, session_id, session_data):
+        """Tell the tutor and the student that a session request was submitted"""
+        try:
+            # Notification for tutor
+            self._create_notification(
+                user_id=session_data.get('tutor_id'),
+                title="New Session Booking Request",
+                message=f"A student has requested a tutoring session with you on {session_data.get('date')} at {session_data.get('start_time')}. Please confirm or reject this request.",
+                type="booking",
+                reference_id=session_id
+            )
+            
+            # Notification for student
+            self._create_notification(
+                user_id=session_data.get('student_id'),
+                title="Session Booking Submitted",
+                message=f"Your tutoring session request has been submitted for {session_data.get('date')} at {session_data.get('start_time')}. Waiting for tutor confirmation.",
+                type="booking",
+                reference_id=session_id
+            )
+        except Exception as notif_error:
+            logger.warning("Failed to create notifications: %s", notif_error)
+            # Continue even if notifications fail
+    
+    @invalidates_request_memo
+    def create_booking(self, student_id, tutor_id, module_code, session_date, time_slot, notes=''):
+        """
+        Create a new tutoring session booking
+        
+        Args:
+            student_id (str): The student's user ID
+            tutor_id (str): The tutor's user ID
+            module_code (str): The module code
+            session_date (str): Session date in YYYY-MM-DD format
+            time_slot (str): Time slot in format "HH:MM - HH:MM"
+            notes (str, optional): Additional notes for the session
+            
+        Returns:
+            dict: Result with success status and booking ID or error message
+        """
+        # Parse the time slot to get start and end times
+        try:
+            start_time, end_time = time_slot.split(' - ')
+        except (AttributeError, ValueError):
+            return {
+                'success': False,
+                'error': 'Invalid time slot format'
+            }
+        
+        return self.book_session(student_id, tutor_id, module_code, session_date, start_time, end_time, notes)
 
+    @request_memoized
     def get_tutor_bookings(self, tutor_id):
         """
         Get all bookings for a tutor
@@ -179,7 +572,7 @@ class FirebaseService:
             # Query sessions collection for bookings with this tutor
             bookings = []
             
-            print(f"DEBUG: Querying for bookings with tutor_id={tutor_id}")
+            logger.debug("Querying for bookings with tutor_id=%s", tutor_id)
             
             try:
                 # Ensure the tutor_id is a string
@@ -189,31 +582,32 @@ class FirebaseService:
                 sessions_ref = self.db.collection('sessions')
                 query = sessions_ref.where('tutor_id', '==', tutor_id_str)
                 docs = list(query.stream())
-                print(f"DEBUG: Query returned {len(docs)} results")
+                logger.debug("Query returned %s results", len(docs))
                 
+                rows = []
                 for doc in docs:
                     booking_data = doc.to_dict()
                     booking_data['id'] = doc.id  # Ensure ID is set
-                    
+                    rows.append(booking_data)
+                
+                # Resolve missing student and module names in one batch per collection
+                refs = self._load_references(
+                    [b for b in rows if not b.get('student_name') or not b.get('module_name')],
+                    {'student_id': 'users', 'module_code': 'modules'}
+                )
+                
+                for booking_data in rows:
                     # Get student name if not present
                     if not booking_data.get('student_name'):
-                        try:
-                            student = self.db.collection('users').document(booking_data.get('student_id')).get().to_dict() or {}
-                            booking_data['student_name'] = student.get('name', 'Unknown Student')
-                            booking_data['student_email'] = student.get('email', '')
-                            booking_data['student_number'] = student.get('student_number', '')
-                        except Exception as e:
-                            print(f"ERROR: Failed to get student data: {e}")
-                            booking_data['student_name'] = 'Unknown Student'
+                        student = refs.get('users', booking_data.get('student_id'), {})
+                        booking_data['student_name'] = student.get('name', 'Unknown Student')
+                        booking_data['student_email'] = student.get('email', '')
+                        booking_data['student_number'] = student.get('student_number', '')
                     
                     # Get module name if not present
                     if not booking_data.get('module_name') and booking_data.get('module_code'):
-                        try:
-                            module = self.db.collection('modules').document(booking_data.get('module_code')).get().to_dict() or {}
-                            booking_data['module_name'] = module.get('name', f"Module {booking_data.get('module_code')}")
-                        except Exception as e:
-                            print(f"ERROR: Failed to get module data: {e}")
-                            booking_data['module_name'] = f"Module {booking_data.get('module_code')}"
+                        module = refs.get('modules', booking_data.get('module_code'), {})
+                        booking_data['module_name'] = module.get('name', f"Module {booking_data.get('module_code')}")
                     
                     # Ensure time_slot is set
                     if not booking_data.get('time_slot') and booking_data.get('start_time') and booking_data.get('end_time'):
@@ -230,21 +624,70 @@ class FirebaseService:
                 # Sort bookings by date and time
                 bookings.sort(key=lambda x: (x.get('date', ''), x.get('start_time', '')))
                 
-                print(f"DEBUG: Found {len(bookings)} valid bookings for tutor {tutor_id}")
+                logger.debug("Found %s valid bookings for tutor %s", len(bookings), tutor_id)
                 return bookings
                 
-            except Exception as db_error:
-                print(f"ERROR: Database query failed: {str(db_error)}")
-                import traceback
-                print(f"DEBUG: Traceback: {traceback.format_exc()}")
+            except Exception:
+                logger.exception("Database query failed")
                 return []
             
-        except Exception as e:
-            print(f"ERROR: Failed to get tutor bookings: {str(e)}")
-            import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Failed to get tutor bookings")
             return []
     
+    @request_memoized
+    def get_tutor_module_students(self, tutor_id):
+        """
+        Distinct students who have booked a tutor, grouped by module
+        
+        Reads the tutor's sessions once, projected to the fields needed for
+        grouping; student names missing from a session are resolved in one batch.
+        
+        Args:
+            tutor_id (str): The tutor's ID
+        
+        Returns:
+            dict: Module code -> list of {'id', 'name'} dicts, sorted by name
+        """
+        try:
+            query = self.db.collection('sessions') \
+                .where('tutor_id', '==', str(tutor_id)) \
+                .select(['module_code', 'student_id', 'student_name'])
+            
+            students_by_module = {}
+            for doc in query.stream():
+                session = doc.to_dict() or {}
+                module_code = session.get('module_code')
+                student_id = session.get('student_id')
+                if not module_code or not student_id:
+                    continue
+                
+                students = students_by_module.setdefault(str(module_code), {})
+                if not students.get(student_id):
+                    students[student_id] = session.get('student_name')
+            
+            # Look up names the sessions didn't carry, one batch for all modules
+            unnamed = [{'student_id': student_id}
+                       for students in students_by_module.values()
+                       for student_id, name in students.items() if not name]
+            refs = self._load_references(unnamed, {'student_id': 'users'})
+            
+            module_students = {}
+            for module_code, students in students_by_module.items():
+                module_students[module_code] = sorted(
+                    ({'id': student_id,
+                      'name': name or refs.get('users', student_id, {}).get('name', 'Unknown Student')}
+                     for student_id, name in students.items()),
+                    key=lambda student: student['name'].lower()
+                )
+            
+            logger.debug("Found students in %s modules for tutor %s", len(module_students), tutor_id)
+            return module_students
+        
+        except Exception as e:
+            logger.error("Failed to get tutor module students: %s", e)
+            return {}
+    
     def _get_demo_tutor_bookings(self, tutor_id):
         """Generate demo bookings for a tutor"""
         today = datetime.now()
@@ -333,6 +776,7 @@ class FirebaseService:
             }
         ]
     
+    @invalidates_request_memo
     def update_booking_status(self, booking_id, action):
         """
         Update the status of a booking
@@ -353,22 +797,18 @@ class FirebaseService:
             }
             
             if action not in status_map:
-                print(f"ERROR: Invalid action '{action}'")
+                logger.error("Invalid action '%s'", action)
                 return False
             
             new_status = status_map[action]
             
-            # Update booking status
-            booking_ref = self.db.collection('sessions').document(booking_id)
-            booking_data = booking_ref.get().to_dict()
+            # Update booking status (and the tutor's slot occupancy)
+            booking_data = self._set_session_status(booking_id, new_status)
             
             if not booking_data:
-                print(f"ERROR: Booking {booking_id} not found")
+                logger.error("Booking %s not found", booking_id)
                 return False
             
-            # Update status
-            booking_ref.update({'status': new_status})
-            
             # Create notification for student
             try:
                 student_id = booking_data.get('student_id')
@@ -385,51 +825,56 @@ class FirebaseService:
                         reference_id=booking_id
                     )
             except Exception as notif_error:
-                print(f"WARNING: Failed to create notification: {notif_error}")
+                logger.warning("Failed to create notification: %s", notif_error)
                 # Continue even if notification fails
             
-            print(f"DEBUG: Successfully updated booking {booking_id} status to {new_status}")
+            logger.debug("Successfully updated booking %s status to %s", booking_id, new_status)
             return True
             
-        except Exception as e:
-            print(f"ERROR: Failed to update booking status: {str(e)}")
-            import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Failed to update booking status")
             return False
 
+    @request_memoized
     def get_module(self, module_code):
-        """Get module data by code"""
+        """Get module data by code (served from the module cache when possible)"""
         try:
-            print(f"Getting module data for code: {module_code}")
+            cached = self._get_cached_module(str(module_code))
+            if cached is not TTLCache.MISS:
+                return copy.deepcopy(cached)
+            
+            logger.debug("Getting module data for code: %s", module_code)
             # Get module document
             module_doc = self.db.collection('modules').document(str(module_code)).get()
             
             if not module_doc.exists:
-                print(f"Module {module_code} not found")
+                logger.debug("Module %s not found", module_code)
+                self._cache_module(str(module_code), None)
                 return None
                 
             module_data = module_doc.to_dict()
             if module_data:
-                module_data['code'] = module_code  # Ensure code is included in the data
-                module_data['module_code'] = module_code  # Add for consistency
-                print(f"Successfully retrieved module: {module_code}")
-                return module_data
+                # Ensure code is included in the data (module_code added for consistency)
+                module_data = self._cache_module(str(module_code), module_data)
+                logger.debug("Successfully retrieved module: %s", module_code)
+                return copy.deepcopy(module_data)
             else:
-                print(f"Module {module_code} exists but has no data")
+                logger.debug("Module %s exists but has no data", module_code)
+                self._cache_module(str(module_code), None)
                 return None
             
-        except Exception as e:
-            print(f"Error getting module {module_code}: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error getting module %s", module_code)
             return None
 
+    @request_memoized
     def get_module_by_code(self, module_code):
         """
         Get a module by its code (alias for get_module for backwards compatibility)
         """
         return self.get_module(module_code)
 
+    @request_memoized
     def get_tutor_schedule(self, tutor_id, date):
         """
         Get available time slots for a tutor on a specific date
@@ -442,85 +887,69 @@ class FirebaseService:
             list: List of available time slots (e.g. ["09:00 - 10:00", "10:00 - 11:00"])
         """
         try:
-            print(f"DEBUG: get_tutor_schedule called with tutor_id={tutor_id}, date={date}")
+            logger.debug("get_tutor_schedule called with tutor_id=%s, date=%s", tutor_id, date)
             
             # Check if the date is in the past
             if isinstance(date, str):
                 try:
                     date = datetime.strptime(date, '%Y-%m-%d').date()
                 except ValueError as e:
-                    print(f"ERROR: Invalid date format: {e}")
+                    logger.error("Invalid date format: %s", e)
                     return []
             
             if date < datetime.now().date():
-                print(f"DEBUG: Date {date} is in the past")
+                logger.debug("Date %s is in the past", date)
                 return []
             
             # Convert date to string for Firestore query
             date_str = date.strftime('%Y-%m-%d')
-            print(f"DEBUG: Converted date to string: {date_str}")
-            
-            # Define all possible time slots
-            all_time_slots = [
-                "09:00 - 10:00", 
-                "10:00 - 11:00", 
-                "11:00 - 12:00", 
-                "12:00 - 13:00", 
-                "13:00 - 14:00", 
-                "14:00 - 15:00", 
-                "15:00 - 16:00"
-            ]
+            logger.debug("Converted date to string: %s", date_str)
             
             try:
-                # Get tutor's existing bookings for this date
-                booked_slots = []
-                sessions_ref = self.db.collection('sessions')
-                query = sessions_ref.where('tutor_id', '==', str(tutor_id)) \
-                                 .where('date', '==', date_str) \
-                                 .where('status', '==', 'Scheduled')
-                
-                print(f"DEBUG: Querying for booked slots with tutor_id={tutor_id}, date={date_str}")
-                
-                for doc in query.stream():
-                    session_data = doc.to_dict()
-                    start_time = session_data.get('start_time')
-                    end_time = session_data.get('end_time')
-                    if start_time and end_time:
-                        time_slot = f"{start_time} - {end_time}"
-                        booked_slots.append(time_slot)
-                        print(f"DEBUG: Found booked slot: {time_slot}")
+                # One read of the tutor's occupancy entry for this date
+                occupancy_doc = self.db.collection(slot_occupancy.OCCUPANCY_COLLECTION) \
+                                    .document(slot_occupancy.occupancy_doc_id(tutor_id, date_str)).get()
+                slots_mask = (occupancy_doc.to_dict() or {}).get('slots_mask', 0) if occupancy_doc.exists else 0
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Booked slots for tutor %s on %s: %s", tutor_id, date_str,
+                                 slot_occupancy.booked_slots(slots_mask))
                 
                 # Filter out booked slots
-                available_slots = [slot for slot in all_time_slots if slot not in booked_slots]
-                print(f"DEBUG: Available slots after filtering: {available_slots}")
+                available_slots = slot_occupancy.available_slots(slots_mask)
+                logger.debug("Available slots after filtering: %s", available_slots)
                 
                 return available_slots
                 
-            except Exception as db_error:
-                print(f"ERROR: Database query failed: {str(db_error)}")
-                import traceback
-                print(f"DEBUG: Traceback: {traceback.format_exc()}")
+            except Exception:
+                logger.exception("Database query failed")
                 return []
             
-        except Exception as e:
-            print(f"ERROR: Unexpected error in get_tutor_schedule: {str(e)}")
-            import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Unexpected error in get_tutor_schedule")
             return []
 
     # Module management operations
+    @request_memoized
     def get_all_modules(self):
-        """Get all available modules with error handling"""
+        """Get all available modules with error handling (served from the module cache when possible)"""
         try:
-            # Try to fetch modules from Firestore
+            replica = self._replica('modules')
+            if replica is not None:
+                catalog = [(module.id, module.to_dict()) for module in replica.documents()]
+            else:
+                catalog = self._module_cache.get('catalog')
+            if catalog is TTLCache.MISS:
+                # Try to fetch modules from Firestore
+                catalog = [(module.id, module.to_dict() or {}) for module in self.db.collection('modules').stream()]
+                self._module_cache.set('catalog', catalog)
+            
             modules = []
-            modules_ref = self.db.collection('modules').stream()
-            for module in modules_ref:
-                module_data = module.to_dict()
+            for module_id, module_data in catalog:
+                module_data = copy.deepcopy(module_data)
                 modules.append({
-                    'id': module.id, 
-                    'code': module.id,
-                    'module_code': module.id,
+                    'id': module_id, 
+                    'code': module_id,
+                    'module_code': module_id,
                     'name': module_data.get('module_name', 'Unknown Module'),
                     'module_name': module_data.get('module_name', 'Unknown Module'),
                     'description': module_data.get('description', ''),
@@ -529,43 +958,46 @@ class FirebaseService:
             
             return modules
             
-        except Exception as e:
-            print(f"Error getting all modules: {e}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error getting all modules")
             return []
 
+    @request_memoized
     def get_module_tutors(self, module_code):
         """Get all tutors assigned to a specific module"""
         try:
-            print(f"DEBUG: Getting tutors for module {module_code}")
+            logger.debug("Getting tutors for module %s", module_code)
             
             # Validate module exists first
             module = self.get_module(module_code)
             if not module:
-                print(f"WARNING: Module {module_code} not found")
+                logger.warning("Module %s not found", module_code)
                 return []
             
             # Query for module-tutor assignments
-            print(f"DEBUG: Querying module_tutors collection for module {module_code}")
-            module_tutors_ref = self.db.collection('module_tutors')
-            query = module_tutors_ref.where('module_code', '==', str(module_code))
-            assignments = list(query.stream())  # Convert to list to check length
-            print(f"DEBUG: Found {len(assignments)} assignments for module {module_code}")
+            logger.debug("Querying module_tutors collection for module %s", module_code)
+            assignments = self._query_module_tutors('module_code', module_code)
+            logger.debug("Found %s assignments for module %s", len(assignments), module_code)
+            
+            # Resolve all assigned tutors in one batch
+            refs = self._load_references(
+                [assignment.to_dict() for assignment in assignments],
+                {'tutor_id': 'users'}
+            )
             
             tutors = []
             for assignment in assignments:
                 try:
                     assignment_data = assignment.to_dict()
                     tutor_id = assignment_data.get('tutor_id')
-                    print(f"DEBUG: Processing assignment {assignment.id} for tutor_id: {tutor_id}")
+                    logger.debug("Processing assignment %s for tutor_id: %s", assignment.id, tutor_id)
                     
                     if not tutor_id:
-                        print(f"WARNING: Missing tutor_id in assignment {assignment.id}")
+                        logger.warning("Missing tutor_id in assignment %s", assignment.id)
                         continue
                     
                     # Get tutor details
-                    tutor = self.get_user_by_id(tutor_id)
+                    tutor = refs.get('users', tutor_id)
                     if tutor:
                         # Get assignment timestamp
                         assigned_at = assignment_data.get('assigned_at')
@@ -589,14 +1021,12 @@ class FirebaseService:
                             'experience': tutor.get('experience', '')
                         }
                         tutors.append(tutor_info)
-                        print(f"DEBUG: Added tutor {tutor_info['name']} to results with assignment date {assigned_at}")
+                        logger.debug("Added tutor %s to results with assignment date %s", tutor_info['name'], assigned_at)
                     else:
-                        print(f"WARNING: Could not find tutor with ID {tutor_id}")
+                        logger.warning("Could not find tutor with ID %s", tutor_id)
                         
-                except Exception as assignment_error:
-                    print(f"ERROR processing assignment {assignment.id}: {str(assignment_error)}")
-                    import traceback
-                    print(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error processing module assignment %s", assignment.id)
                     continue
             
             # Sort tutors by assignment date, newest first
@@ -605,15 +1035,31 @@ class FirebaseService:
                 reverse=True
             )
             
-            print(f"DEBUG: Returning {len(tutors)} tutors found for module {module_code}")
+            logger.debug("Returning %s tutors found for module %s", len(tutors), module_code)
             return tutors
             
-        except Exception as e:
-            print(f"ERROR in get_module_tutors: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error getting module tutors")
             return []
 
+    def _content_item(self, content_id, item_data):
+        """Listing fields of a content document"""
+        return {
+            'id': content_id,
+            'title': item_data.get('title', 'Untitled Content'),
+            'description': item_data.get('description', ''),
+            'type': item_data.get('type', 'Document'),
+            'file_type': item_data.get('file_type') or item_data.get('type', ''),
+            'file_name': item_data.get('file_name'),
+            'file_size': item_data.get('file_size'),
+            'content_type': item_data.get('content_type'),
+            'module_code': item_data.get('module_code', ''),
+            'uploaded_by': item_data.get('uploaded_by'),
+            'uploaded_at': item_data.get('uploaded_at'),
+            'download_url': item_data.get('download_url', '#')
+        }
+    
+    @request_memoized
     def get_module_content(self, module_code):
         """Get learning content for a specific module"""
         try:
@@ -625,25 +1071,15 @@ class FirebaseService:
             
             for item in content_ref:
                 item_data = item.to_dict()
-                content_items.append({
-                    'id': item.id,
-                    'title': item_data.get('title', 'Untitled Content'),
-                    'description': item_data.get('description', ''),
-                    'type': item_data.get('type', 'Document'),
-                    'module_code': module_code,
-                    'uploaded_by': item_data.get('uploaded_by'),
-                    'uploaded_at': item_data.get('uploaded_at'),
-                    'download_url': item_data.get('download_url', '')
-                })
+                content_items.append(self._content_item(item.id, item_data))
                 
             return content_items
             
-        except Exception as e:
-            print(f"Error in get_module_content: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error in get_module_content")
             return []
             
+    @request_memoized
     def get_tutor_modules(self, tutor_id):
         """
         Get all modules assigned to a specific tutor
@@ -655,28 +1091,32 @@ class FirebaseService:
             list: List of module objects with assignment details
         """
         try:
-            print(f"DEBUG: Getting modules for tutor {tutor_id}")
+            logger.debug("Getting modules for tutor %s", tutor_id)
             
             # Query for module-tutor assignments
-            print(f"DEBUG: Querying module_tutors collection for tutor {tutor_id}")
-            module_tutors_ref = self.db.collection('module_tutors')
-            query = module_tutors_ref.where('tutor_id', '==', str(tutor_id))
-            assignments = list(query.stream())  # Convert to list to check length
-            print(f"DEBUG: Found {len(assignments)} module assignments for tutor {tutor_id}")
+            logger.debug("Querying module_tutors collection for tutor %s", tutor_id)
+            assignments = self._query_module_tutors('tutor_id', tutor_id)
+            logger.debug("Found %s module assignments for tutor %s", len(assignments), tutor_id)
+            
+            # Resolve all assigned modules in one batch
+            refs = self._load_references(
+                [assignment.to_dict() for assignment in assignments],
+                {'module_code': 'modules'}
+            )
             
             modules = []
             for assignment in assignments:
                 try:
                     assignment_data = assignment.to_dict()
                     module_code = assignment_data.get('module_code')
-                    print(f"DEBUG: Processing assignment {assignment.id} for module_code: {module_code}")
+                    logger.debug("Processing assignment %s for module_code: %s", assignment.id, module_code)
                     
                     if not module_code:
-                        print(f"WARNING: Missing module_code in assignment {assignment.id}")
+                        logger.warning("Missing module_code in assignment %s", assignment.id)
                         continue
                     
                     # Get module details
-                    module = self.get_module(module_code)
+                    module = refs.get('modules', module_code)
                     if module:
                         # Get assignment timestamp
                         assigned_at = assignment_data.get('assigned_at')
@@ -694,43 +1134,49 @@ class FirebaseService:
                             'assigned_at': assigned_at
                         }
                         modules.append(module_info)
-                        print(f"DEBUG: Added module {module_info['module_name']} to results")
+                        logger.debug("Added module %s to results", module_info['module_name'])
                     else:
-                        print(f"WARNING: Could not find module with code {module_code}")
+                        logger.warning("Could not find module with code %s", module_code)
                         
-                except Exception as assignment_error:
-                    print(f"ERROR processing assignment {assignment.id}: {str(assignment_error)}")
-                    import traceback
-                    print(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error processing module assignment %s", assignment.id)
                     continue
             
             # Sort modules by assignment date
             modules.sort(key=lambda x: x.get('assigned_at', datetime.now()), reverse=True)
             
-            print(f"DEBUG: Returning {len(modules)} modules for tutor {tutor_id}")
+            logger.debug("Returning %s modules for tutor %s", len(modules), tutor_id)
             return modules
             
-        except Exception as e:
-            print(f"ERROR in get_tutor_modules: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error getting tutor modules")
             return []
 
-    def get_filtered_content(self, module_code=None, content_type=None, search_query=None, page=1, per_page=12):
+    # Largest page a caller can ask for from get_filtered_content
+    CONTENT_PAGE_MAX = 50
+    
+    @request_memoized
+    def get_filtered_content(self, module_code=None, content_type=None, search_query=None, cursor=None, per_page=12):
         """
-        Get learning content with filtering options
+        Get one page of learning content, newest first, with filtering options.
+        Pages are read with keyset pagination on (uploaded_at, document ID), so
+        each page costs about per_page reads however deep it is.
         
         Args:
             module_code (str, optional): Filter by module code
             content_type (str, optional): Filter by content type (document, video, etc.)
             search_query (str, optional): Search in title and description
-            page (int): Page number for pagination
-            per_page (int): Items per page
+            cursor (str, optional): Opaque cursor from a previous page's next_cursor/prev_cursor
+            per_page (int): Items per page (capped at CONTENT_PAGE_MAX)
             
         Returns:
-            tuple: (list of content items, total count)
+            dict: {'items': [...], 'next_cursor': str or None, 'prev_cursor': str or None,
+                   'total': approximate number of matching items, or None when searching}
         """
+        page = {'items': [], 'next_cursor': None, 'prev_cursor': None, 'total': None}
         try:
+            per_page = max(1, min(int(per_page), self.CONTENT_PAGE_MAX))
+            
             # Start with a base query
             query = self.db.collection('content')
             
@@ -741,48 +1187,341 @@ class FirebaseService:
             if content_type:
                 query = query.where('type', '==', content_type)
             
-            # Execute query
-            all_items = []
-            for doc in query.stream():
-                item_data = doc.to_dict()
-                
-                # Apply search filter manually (Firestore doesn't support text search directly)
-                if search_query and search_query.strip():
-                    title = item_data.get('title', '').lower()
-                    description = item_data.get('description', '').lower()
-                    if search_query.lower() not in title and search_query.lower() not in description:
-                        continue
-                
-                all_items.append({
-                    'id': doc.id,
-                    'title': item_data.get('title', 'Untitled Content'),
-                    'description': item_data.get('description', ''),
-                    'type': item_data.get('type', 'Document'),
-                    'module_code': item_data.get('module_code', ''),
-                    'uploaded_by': item_data.get('uploaded_by'),
-                    'uploaded_at': item_data.get('uploaded_at'),
-                    'download_url': item_data.get('download_url', '#')
+            needle = search_query.strip().lower() if search_query and search_query.strip() else None
+            if needle:
+                index = self._content_search()
+                if index is not None and index.build_match(needle):
+                    return self._search_content_page(index, needle, module_code, content_type, cursor, per_page)
+            
+            if needle is None:
+                page['total'] = self._approximate_count(
+                    query, ('content_count', module_code or '', content_type or ''))
+            
+            # Apply search filter manually (Firestore doesn't support text search directly)
+            def matches(item_data):
+                title = item_data.get('title', '').lower()
+                description = item_data.get('description', '').lower()
+                return needle in title or needle in description
+            
+            page.update(self._keyset_page(query, 'uploaded_at', cursor, per_page, self._content_item,
+                                          accept=matches if needle else None))
+            return page
+            
+        except Exception:
+            logger.exception("Error in get_filtered_content")
+            return page
+    
+    def _keyset_page(self, query, order_field, cursor, per_page, build_item, accept=None):
+        """
+        Read one page of a query, newest first, with keyset pagination on
+        (order_field, document ID)
+        
+        Args:
+            query: Filtered Firestore query (without ordering)
+            order_field (str): Field to order by, descending
+            cursor (str): Opaque cursor from a previous page, or None for the first page
+            per_page (int): Items per page
+            build_item (callable): build_item(doc_id, data) -> item for the page
+            accept (callable, optional): Python-side filter on document data; pages are
+                then filled by scanning forward in larger chunks
+            
+        Returns:
+            dict: {'items': [...], 'next_cursor': str or None, 'prev_cursor': str or None}
+        """
+        # A 'prev' cursor walks backwards from the first item of the page after it
+        position = decode_cursor(cursor)
+        backwards = bool(position and position.get('dir') == 'prev')
+        direction = firestore.Query.ASCENDING if backwards else firestore.Query.DESCENDING
+        query = query.order_by(order_field, direction=direction).order_by('__name__', direction=direction)
+        if position and position.get('id') and position.get('at') is not None:
+            query = query.start_after({order_field: position['at'], '__name__': position['id']})
+        
+        # Fetch one extra document to learn whether another page follows
+        chunk_size = per_page + 1 if accept is None else max(4 * per_page, 50)
+        rows = []
+        while len(rows) <= per_page:
+            docs = list(query.limit(chunk_size).stream())
+            for doc in docs:
+                data = doc.to_dict() or {}
+                if accept is not None and not accept(data):
+                    continue
+                rows.append((doc.id, data))
+                if len(rows) > per_page:
+                    break
+            if len(docs) < chunk_size:
+                break
+            query = query.start_after(docs[-1])
+        
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, position is not None
+        
+        page = {'items': [build_item(doc_id, data) for doc_id, data in rows], 'next_cursor': None, 'prev_cursor': None}
+        if rows and has_next:
+            page['next_cursor'] = encode_cursor({'at': rows[-1][1].get(order_field), 'id': rows[-1][0], 'dir': 'next'})
+        if rows and has_prev:
+            page['prev_cursor'] = encode_cursor({'at': rows[0][1].get(order_field), 'id': rows[0][0], 'dir': 'prev'})
+        return page
+    
+    def _approximate_count(self, query, cache_key):
+        """Count a query with an aggregation, cached briefly; None if the count fails"""
+        count = self._stats_cache.get(cache_key)
+        if count is TTLCache.MISS:
+            try:
+                count = self._count(query)
+            except Exception as e:
+                logger.warning("Failed to count %s: %s", cache_key[0], e)
+                return None
+            self._stats_cache.set(cache_key, count)
+        return count
+
+    def _search_content_page(self, index, search_query, module_code, content_type, cursor, per_page):
+        """One page of ranked full-text search results, in the get_filtered_content page format"""
+        position = decode_cursor(cursor) or {}
+        offset = position.get('offset', 0) if position.get('dir') == 'search' else 0
+        offset = max(0, int(offset))
+        
+        content_ids, total = index.search(search_query, module_code=module_code or None,
+                                          content_type=content_type or None, limit=per_page, offset=offset)
+        loader = self._load_references([{'id': content_id} for content_id in content_ids], {'id': 'content'})
+        
+        items = []
+        for content_id in content_ids:
+            item_data = loader.get('content', content_id)
+            if item_data is None:
+                # Deleted since it was indexed
+                continue
+            items.append(self._content_item(content_id, item_data))
+        
+        return {
+            'items': items,
+            'next_cursor': encode_cursor({'dir': 'search', 'offset': offset + per_page}) if offset + per_page < total else None,
+            'prev_cursor': encode_cursor({'dir': 'search', 'offset': max(0, offset - per_page)}) if offset > 0 else None,
+            'total': total
+        }
+    
+    def _content_search_index(self):
+        """The content full-text index, or None if none is configured or SQLite lacks FTS5"""
+        if not Config.CONTENT_SEARCH_INDEX_PATH:
+            return None
+        if FirebaseService._search_index is None:
+            FirebaseService._search_index = ContentSearchIndex(Config.CONTENT_SEARCH_INDEX_PATH)
+        index = FirebaseService._search_index
+        return index if index.available else None
+    
+    def _content_search(self):
+        """
+        The content full-text index if it is ready to answer searches, else None
+        (searches then scan Firestore). A missing index is never built here, inside
+        a request; see build_content_search_index.
+        """
+        try:
+            index = self._content_search_index()
+            if index is None or not index.is_built():
+                return None
+            return index
+        except Exception as e:
+            logger.warning("Content search index unavailable, falling back to scanning: %s", e)
+            return None
+    
+    def _content_search_items(self):
+        """(content_id, data, module_name) for every content item, as the search index stores them"""
+        module_names = {module['code']: module.get('module_name') or module.get('name') or ''
+                        for module in self.get_all_modules()}
+        query = self.db.collection('content').select(['title', 'description', 'module_code', 'type'])
+        for doc in query.stream():
+            data = doc.to_dict() or {}
+            yield doc.id, data, module_names.get(data.get('module_code'), '')
+    
+    def build_content_search_index(self):
+        """
+        Build the content full-text index if it is missing. Runs when a worker starts;
+        a file lock makes the other workers wait for one build instead of repeating it.
+        
+        Returns:
+            int or None: Number of content items indexed, or None if nothing was built
+        """
+        try:
+            index = self._content_search_index()
+            if index is None:
+                return None
+            count = index.build_if_missing(self._content_search_items)
+            if count is not None:
+                logger.info("Built the content search index with %s items", count)
+            return count
+        except Exception as e:
+            logger.error("Failed to build the content search index: %s", e)
+            return None
+    
+    def _module_display_name(self, module_code):
+        """Module name used for search and display, or '' if the module is unknown"""
+        module = self.get_module(module_code) if module_code else None
+        return (module or {}).get('module_name') or (module or {}).get('name') or ''
+    
+    def start_content_search_build(self):
+        """Build a missing content search index on a background thread (see build_content_search_index)"""
+        thread = threading.Thread(target=self.build_content_search_index, name='content-search-build', daemon=True)
+        thread.start()
+        return thread
+    
+    @invalidates_request_memo
+    def rebuild_content_search_index(self):
+        """
+        Rebuild the content full-text index from the content collection
+        
+        Returns:
+            int: Number of content items indexed
+        """
+        index = self._content_search_index()
+        if index is None:
+            raise RuntimeError("Content search index is not available (CONTENT_SEARCH_INDEX_PATH unset or no FTS5)")
+        
+        count = index.rebuild(self._content_search_items())
+        logger.debug("Indexed %s content items for search", count)
+        return count
+    
+    @invalidates_request_memo
+    def upload_content(self, content_data, module_code, title, description, tutor_id, file_type,
+                       file_name=None, content_type=None):
+        """
+        Add a learning content item for a module. Uploaded files are streamed into
+        the blob store, so identical files from different tutors share one copy.
+        
+        Args:
+            content_data: Readable file stream for file content, or the text itself for text content
+            module_code (str): The module code
+            title (str): Content title
+            description (str): Content description
+            tutor_id (str): ID of the uploading tutor
+            file_type (str): File extension, or 'text' for text content
+            file_name (str, optional): Original (secured) file name
+            content_type (str, optional): MIME type reported by the client
+            
+        Returns:
+            str: ID of the new content document
+        """
+        try:
+            content_ref = self.db.collection('content').document()
+            data = {
+                'title': title or 'Untitled Content',
+                'description': description or '',
+                'module_code': str(module_code),
+                'type': file_type,
+                'file_type': file_type,
+                'uploaded_by': str(tutor_id),
+                'uploaded_at': datetime.now(timezone.utc)
+            }
+            if file_type == 'text':
+                data['content_text'] = content_data
+            else:
+                blob = self._store_blob(content_data, content_type)
+                data.update({
+                    'blob_key': blob['key'],
+                    'sha256': blob['sha256'],
+                    'file_size': blob['size'],
+                    'file_name': file_name,
+                    'content_type': content_type or 'application/octet-stream'
                 })
+            content_ref.set(data)
+            self._stats_cache.clear()
             
-            # Calculate total items and apply pagination
-            total_items = len(all_items)
+            # The content is saved; a failed index update only leaves search stale until a reindex
+            try:
+                index = self._content_search_index()
+                if index is not None:
+                    index.upsert(content_ref.id, data, self._module_display_name(module_code))
+            except Exception as e:
+                logger.error("Failed to index content %s for search: %s", content_ref.id, e)
             
-            # Sort by upload date (newest first)
-            all_items.sort(key=lambda x: x.get('uploaded_at', datetime.min), reverse=True)
+            logger.debug("Uploaded content %s for module %s", content_ref.id, module_code)
+            return content_ref.id
             
-            # Apply pagination
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            paginated_items = all_items[start_idx:end_idx]
+        except Exception as e:
+            logger.error("Failed to upload content: %s", e)
+            raise
+    
+    @invalidates_request_memo
+    def delete_content(self, content_id):
+        """
+        Delete a learning content item (its file is removed once nothing else references it)
+        
+        Args:
+            content_id (str): The content ID
             
-            return paginated_items, total_items
+        Returns:
+            bool: True if the content existed and was deleted
+        """
+        try:
+            content_ref = self.db.collection('content').document(str(content_id))
+            content_doc = content_ref.get()
+            if not content_doc.exists:
+                logger.debug("Content %s not found", content_id)
+                return False
+            content_ref.delete()
+            self._stats_cache.clear()
+            
+            blob_key = (content_doc.to_dict() or {}).get('blob_key')
+            if blob_key:
+                self._release_blob(blob_key)
+            
+            try:
+                index = self._content_search_index()
+                if index is not None:
+                    index.delete(content_id)
+            except Exception as e:
+                logger.error("Failed to remove content %s from the search index: %s", content_id, e)
+            return True
             
         except Exception as e:
-            print(f"Error in get_filtered_content: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            return [], 0
-
+            logger.error("Failed to delete content %s: %s", content_id, e)
+            raise
+    
+    @request_memoized
+    def get_content(self, content_id):
+        """
+        Get a learning content item
+        
+        Args:
+            content_id (str): The content ID
+            
+        Returns:
+            dict: Content data with 'id', or None if not found
+        """
+        try:
+            content_doc = self.db.collection('content').document(str(content_id)).get()
+            if not content_doc.exists:
+                return None
+            content = content_doc.to_dict() or {}
+            content['id'] = content_doc.id
+            return content
+        except Exception as e:
+            logger.error("Error getting content %s: %s", content_id, e)
+            return None
+    
+    @invalidates_request_memo
+    def log_content_download(self, user_id, content_id):
+        """Record a content download for analytics"""
+        try:
+            batch = self.db.batch()
+            batch.set(self.db.collection('content_downloads').document(), {
+                'user_id': str(user_id),
+                'content_id': str(content_id),
+                'downloaded_at': firestore.SERVER_TIMESTAMP
+            })
+            batch.update(self.db.collection('content').document(str(content_id)), {
+                'download_count': firestore.Increment(1)
+            })
+            batch.commit()
+            return True
+        except Exception as e:
+            logger.error("Error logging content download: %s", e)
+            return False
+    
+    @request_memoized
     def get_recent_content(self, limit=5):
         """Get recent learning content uploads"""
         try:
@@ -805,20 +1544,27 @@ class FirebaseService:
             return recent_content
             
         except Exception as e:
-            print(f"Error getting recent content: {e}")
+            logger.error("Error getting recent content: %s", e)
             return []
 
+    @request_memoized
     def count_learning_materials(self):
         """Count the total number of learning materials available"""
         try:
-            # Query for all content documents
-            content_ref = self.db.collection('content')
-            return len(list(content_ref.stream()))
+            cached = self._stats_cache.get('learning_materials')
+            if cached is not TTLCache.MISS:
+                return cached
+            
+            # Count content documents server-side
+            count = self._count(self.db.collection('content'))
+            self._stats_cache.set('learning_materials', count)
+            return count
             
         except Exception as e:
-            print(f"Error counting learning materials: {e}")
+            logger.error("Error counting learning materials: %s", e)
             return 0
 
+    @request_memoized
     def get_student_total_hours(self, student_id):
         """Calculate the total tutoring hours for a student"""
         try:
@@ -843,9 +1589,10 @@ class FirebaseService:
             return round(total_hours, 1)
             
         except Exception as e:
-            print(f"Error calculating total hours: {e}")
+            logger.error("Error calculating total hours: %s", e)
             return 0
 
+    @request_memoized
     def get_system_statistics(self):
         """
         Get system statistics for the admin dashboard
@@ -854,50 +1601,40 @@ class FirebaseService:
             dict: System statistics
         """
         try:
+            cached = self._stats_cache.get('system_statistics')
+            if cached is not TTLCache.MISS:
+                return dict(cached)
+            
             # Count active students
             student_query = self.db.collection('users').where('role', '==', 'student').where('is_verified', '==', True)
-            student_count = len(list(student_query.stream()))
+            student_count = self._count(student_query)
             
             # Count active tutors
             tutor_query = self.db.collection('users').where('role', '==', 'tutor').where('is_verified', '==', True)
-            tutor_count = len(list(tutor_query.stream()))
+            tutor_count = self._count(tutor_query)
             
             # Count modules
             modules_query = self.db.collection('modules')
-            module_count = len(list(modules_query.stream()))
+            module_count = self._count(modules_query)
             
             # Count pending tutor applications
             pending_tutors_query = self.db.collection('tutor_applications').where('status', '==', 'pending')
-            pending_tutors_count = len(list(pending_tutors_query.stream()))
+            pending_tutors_count = self._count(pending_tutors_query)
             
             # Count pending student applications
             pending_students_query = self.db.collection('users').where('role', '==', 'student').where('is_verified', '==', False)
-            pending_students_count = len(list(pending_students_query.stream()))
+            pending_students_count = self._count(pending_students_query)
             
             # Count recent bookings (last 7 days)
             seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
             recent_bookings_query = self.db.collection('sessions').where('created_at', '>=', seven_days_ago)
-            recent_bookings_count = len(list(recent_bookings_query.stream()))
+            recent_bookings_count = self._count(recent_bookings_query)
             
-            # Calculate total session hours
+            # Sum total session hours (sessions store duration_hours when created)
             all_sessions_query = self.db.collection('sessions').where('status', '==', 'completed')
-            total_hours = 0
-            for session in all_sessions_query.stream():
-                data = session.to_dict()
-                # Extract hour from time slots like "14:00 - 15:00"
-                try:
-                    if 'time_slot' in data:
-                        start, end = data['time_slot'].split(' - ')
-                        start_hour = int(start.split(':')[0])
-                        end_hour = int(end.split(':')[0])
-                        session_duration = end_hour - start_hour
-                        if session_duration > 0:
-                            total_hours += session_duration
-                except Exception as e:
-                    print(f"Error calculating session hours: {str(e)}")
-                    continue
+            total_hours = round(self._sum(all_sessions_query, 'duration_hours'), 1)
             
-            return {
+            stats = {
                 'student_count': student_count,
                 'tutor_count': tutor_count,
                 'module_count': module_count,
@@ -906,9 +1643,11 @@ class FirebaseService:
                 'recent_bookings_count': recent_bookings_count,
                 'total_hours': total_hours
             }
+            self._stats_cache.set('system_statistics', stats)
+            return dict(stats)
             
         except Exception as e:
-            print(f"Error getting system statistics: {str(e)}")
+            logger.error("Error getting system statistics: %s", e)
             return {
                 'student_count': 0,
                 'tutor_count': 0,
@@ -919,7 +1658,51 @@ class FirebaseService:
                 'total_hours': 0
             }
 
+    @invalidates_request_memo
+    def backfill_session_durations(self, batch_size=400):
+        """
+        Store duration_hours on sessions created before it was recorded, so the
+        total-hours aggregation covers them. Older sessions that only carry a
+        "HH:MM - HH:MM" time_slot are measured from it; sessions with no usable
+        times are left without the field rather than counted as 0 hours.
+        
+        Returns:
+            int: Number of sessions updated
+        """
+        updated = 0
+        skipped = 0
+        batch = self.db.batch()
+        pending = 0
+        query = self.db.collection('sessions').select(['start_time', 'end_time', 'time_slot', 'duration_hours'])
+        for doc in query.stream():
+            data = doc.to_dict() or {}
+            if data.get('duration_hours') is not None:
+                continue
+            start_time, end_time = data.get('start_time'), data.get('end_time')
+            if not (start_time and end_time) and data.get('time_slot'):
+                start_time, _, end_time = data['time_slot'].partition(' - ')
+            duration = self._slot_duration_hours(start_time, end_time, default=None)
+            if duration is None:
+                skipped += 1
+                continue
+            batch.update(doc.reference, {'duration_hours': duration})
+            pending += 1
+            if pending >= batch_size:
+                batch.commit()
+                updated += pending
+                batch = self.db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+            updated += pending
+        
+        if skipped:
+            logger.warning("Skipped %s sessions with no usable start/end times", skipped)
+        logger.debug("Backfilled duration_hours on %s sessions", updated)
+        return updated
+
     # User management operations
+    @request_memoized
     def get_user_by_id(self, user_id):
         """Get user data by ID"""
         try:
@@ -927,16 +1710,93 @@ class FirebaseService:
             user_doc = self.db.collection('users').document(str(user_id)).get()
             
             if not user_doc.exists:
-                print(f"User {user_id} not found")
+                logger.debug("User %s not found", user_id)
+                return None
+                
+            user_data = user_doc.to_dict()
+            user_data['id'] = user_id  # Ensure ID is included in the data
+            return user_data
+            
+        except Exception as e:
+            logger.error("Error getting user %s: %s", user_id, e)
+            return None
+    
+    # User fields needed to build the logged-in user
+    SESSION_USER_FIELDS = ['name', 'email', 'role', 'is_verified', 'student_number', 'staff_number']
+    
+    def get_session_user(self, user_id):
+        """
+        Get the fields of the logged-in user, cached per worker for USER_CACHE_TTL.
+        While the session_revocations replica is running, a cached entry is
+        dropped as soon as the user's sessions are revoked in any worker.
+        
+        Args:
+            user_id (str): The user's ID
+            
+        Returns:
+            dict: User fields, or None if the user does not exist or the lookup failed
+        """
+        key = str(user_id)
+        version = self.session_version(key)
+        cached = self._user_cache.get(key)
+        if cached is not TTLCache.MISS:
+            cached_version, user_data = cached
+            if version is None or cached_version == version:
+                return dict(user_data) if user_data is not None else None
+        
+        try:
+            user_doc = self.db.collection('users').document(key).get(field_paths=self.SESSION_USER_FIELDS)
+            if not user_doc.exists:
+                self._user_cache.set(key, (version, None),
+                                     ttl=min(Config.USER_CACHE_TTL, Config.MODULE_CACHE_NEGATIVE_TTL))
                 return None
-                
-            user_data = user_doc.to_dict()
-            user_data['id'] = user_id  # Ensure ID is included in the data
-            return user_data
             
+            user_data = user_doc.to_dict() or {}
+            self._user_cache.set(key, (version, user_data))
+            return dict(user_data)
         except Exception as e:
-            print(f"Error getting user {user_id}: {str(e)}")
+            logger.error("Error loading session user %s: %s", user_id, e)
             return None
+    
+    def invalidate_user(self, user_id=None):
+        """Forget the cached logged-in user after their document changes (all users if no ID)"""
+        if user_id is None:
+            self._user_cache.clear()
+        else:
+            self._user_cache.delete(str(user_id))
+    
+    def session_version(self, user_id):
+        """
+        Revocation version of a user's sessions, from the live replica
+        
+        Returns:
+            int: The version (0 if never revoked), or None if the replica isn't running,
+                in which case session claims can't be trusted
+        """
+        replica = self._replica('session_revocations')
+        if replica is None:
+            return None
+        revocation = replica.get(str(user_id))
+        return (revocation.get('version') or 0) if revocation is not None else 0
+    
+    def revoke_user_sessions(self, user_id):
+        """
+        Make every worker drop the user's session claims and cached lookup, after
+        their role or status changes or their account is deleted
+        
+        Returns:
+            bool: Whether the revocation was recorded
+        """
+        self.invalidate_user(user_id)
+        try:
+            self.db.collection('session_revocations').document(str(user_id)).set({
+                'version': firestore.Increment(1),
+                'revoked_at': firestore.SERVER_TIMESTAMP
+            }, merge=True)
+            return True
+        except Exception as e:
+            logger.error("Error revoking sessions of user %s: %s", user_id, e)
+            return False
         
     def _get_demo_user(self, user_id):
         """Return demo user for fallback"""
@@ -947,9 +1807,44 @@ class FirebaseService:
             'role': 'student'
         }
         
+    def _notification_outbox(self):
+        """The process-wide notification outbox, created on first use"""
+        if FirebaseService._outbox is None:
+            FirebaseService._outbox = NotificationOutbox(
+                lambda: self.db,
+                max_size=Config.NOTIFICATION_OUTBOX_MAX_SIZE,
+                batch_size=Config.NOTIFICATION_OUTBOX_BATCH_SIZE,
+                flush_interval=Config.NOTIFICATION_OUTBOX_FLUSH_INTERVAL,
+                max_retries=Config.NOTIFICATION_OUTBOX_MAX_RETRIES,
+                sync=Config.NOTIFICATION_OUTBOX_SYNC
+            )
+        return FirebaseService._outbox
+    
+    def run_parallel(self, calls, defaults=None, timeout=None):
+        """
+        Run independent reads concurrently on the shared query pool
+        
+        Args:
+            calls (dict): Name -> zero-argument callable, e.g.
+                {'modules': self.get_all_modules,
+                 'bookings': lambda: self.get_student_bookings(student_id)}
+            defaults (dict): Name -> value to use if that call fails or misses its deadline
+            timeout (float or dict): Per-call deadline in seconds (defaults to QUERY_TIMEOUT)
+            
+        Returns:
+            dict: Name -> result
+        """
+        return self._query_pool.run(calls, defaults=defaults, timeout=timeout)
+    
+    def flush_notifications(self):
+        """Write any queued notifications now (e.g. before a worker shuts down)"""
+        if FirebaseService._outbox is not None:
+            FirebaseService._outbox.flush()
+    
     def _create_notification(self, user_id, title, message, type, reference_id=None):
         """
-        Create a notification for a user
+        Create a notification for a user. The notification is queued and written
+        in the background, so this does not wait on Firestore.
         
         Args:
             user_id (str): The user's ID
@@ -959,19 +1854,18 @@ class FirebaseService:
             reference_id (str, optional): Reference ID for the notification
         """
         try:
-            notification_ref = self.db.collection('notifications').document()
-            notification_ref.set({
+            self._notification_outbox().enqueue({
                 'user_id': user_id,
                 'title': title,
                 'message': message,
                 'type': type,
                 'reference_id': reference_id,
-                'created_at': firestore.SERVER_TIMESTAMP,
                 'is_read': False
             })
         except Exception as e:
-            print(f"Error creating notification: {e}")
+            logger.error("Error creating notification: %s", e)
 
+    @request_memoized
     def get_student_upcoming_sessions(self, student_id):
         """Get upcoming tutoring sessions for a student"""
         try:
@@ -984,7 +1878,7 @@ class FirebaseService:
             query = sessions_ref.where('student_id', '==', str(student_id)) \
                                .where('status', '==', 'Scheduled')
             
-            sessions = []
+            rows = []
             for doc in query.stream():
                 session_data = doc.to_dict()
                 session_date_str = session_data.get('date')
@@ -998,25 +1892,25 @@ class FirebaseService:
                 if not session_date:
                     continue
                     
+                rows.append((doc, session_data, session_date))
+            
+            # Resolve tutors and modules in one batch per collection
+            refs = self._load_references(
+                [session_data for _, session_data, _ in rows],
+                {'tutor_id': 'users', 'module_code': 'modules'}
+            )
+            
+            sessions = []
+            for doc, session_data, session_date in rows:
                 # Get tutor name
                 tutor_id = session_data.get('tutor_id')
-                tutor_name = "Unknown Tutor"
-                try:
-                    tutor = self.get_user_by_id(tutor_id)
-                    if tutor:
-                        tutor_name = tutor.get('name', 'Unknown Tutor')
-                except:
-                    pass  # Use default tutor name
+                tutor = refs.get('users', tutor_id, {})
+                tutor_name = tutor.get('name', 'Unknown Tutor')
                 
                 # Get module name
                 module_code = session_data.get('module_code')
-                module_name = f"Module {module_code}"
-                try:
-                    module = self.get_module(module_code)
-                    if module:
-                        module_name = module.get('name', module_name)
-                except:
-                    pass  # Use default module name
+                module = refs.get('modules', module_code, {})
+                module_name = module.get('name', f"Module {module_code}")
                 
                 sessions.append({
                     'id': doc.id,
@@ -1034,13 +1928,14 @@ class FirebaseService:
             return sorted(sessions, key=lambda s: (s['date'].strftime('%Y-%m-%d') if s['date'] else '', s['start_time']))
             
         except Exception as e:
-            print(f"Error getting upcoming sessions: {str(e)}")
+            logger.error("Error getting upcoming sessions: %s", e)
             return []
 
+    @request_memoized
     def get_student_bookings(self, student_id):
         """Get all bookings for a student regardless of status"""
         try:
-            print(f"Getting all bookings for student {student_id}")
+            logger.debug("Getting all bookings for student %s", student_id)
             # Query for all sessions for this student
             sessions_ref = self.db.collection('sessions')
             query = sessions_ref.where('student_id', '==', str(student_id))
@@ -1053,25 +1948,24 @@ class FirebaseService:
                 if not booking_data.get('id'):
                     booking_data['id'] = doc.id
                 
+                bookings.append(booking_data)
+            
+            # Resolve missing tutor and module names in one batch per collection
+            refs = self._load_references(
+                [b for b in bookings if not b.get('tutor_name') or not b.get('module_name')],
+                {'tutor_id': 'users', 'module_code': 'modules'}
+            )
+            
+            for booking_data in bookings:
                 # Get tutor name if not present
                 if not booking_data.get('tutor_name'):
-                    try:
-                        tutor = self.db.collection('users').document(booking_data.get('tutor_id', '')).get().to_dict() or {}
-                        booking_data['tutor_name'] = tutor.get('name', 'Unknown Tutor')
-                    except Exception as e:
-                        print(f"ERROR: Failed to get tutor data: {e}")
-                        booking_data['tutor_name'] = 'Unknown Tutor'
+                    tutor = refs.get('users', booking_data.get('tutor_id'), {})
+                    booking_data['tutor_name'] = tutor.get('name', 'Unknown Tutor')
                 
                 # Get module name if not present
                 if not booking_data.get('module_name') and booking_data.get('module_code'):
-                    try:
-                        module = self.db.collection('modules').document(booking_data.get('module_code', '')).get().to_dict() or {}
-                        booking_data['module_name'] = module.get('name', f"Module {booking_data.get('module_code')}")
-                    except Exception as e:
-                        print(f"ERROR: Failed to get module data: {e}")
-                        booking_data['module_name'] = f"Module {booking_data.get('module_code')}"
-                
-                bookings.append(booking_data)
+                    module = refs.get('modules', booking_data.get('module_code'), {})
+                    booking_data['module_name'] = module.get('name', f"Module {booking_data.get('module_code')}")
             
             # Sort bookings by date (most recent first) and then by status (pending first)
             def sort_key(booking):
@@ -1093,9 +1987,10 @@ class FirebaseService:
             return sorted(bookings, key=sort_key)
             
         except Exception as e:
-            print(f"Error getting student bookings: {str(e)}")
+            logger.error("Error getting student bookings: %s", e)
             return []
 
+    @request_memoized
     def get_student_past_sessions(self, student_id):
         """Get past tutoring sessions for a student"""
         try:
@@ -1108,7 +2003,7 @@ class FirebaseService:
             query = sessions_ref.where('student_id', '==', str(student_id)) \
                                .where('status', '==', 'Completed')
             
-            sessions = []
+            rows = []
             for doc in query.stream():
                 session_data = doc.to_dict()
                 session_date_str = session_data.get('date')
@@ -1122,25 +2017,25 @@ class FirebaseService:
                 if not session_date:
                     continue
                     
+                rows.append((doc, session_data, session_date))
+            
+            # Resolve tutors and modules in one batch per collection
+            refs = self._load_references(
+                [session_data for _, session_data, _ in rows],
+                {'tutor_id': 'users', 'module_code': 'modules'}
+            )
+            
+            sessions = []
+            for doc, session_data, session_date in rows:
                 # Get tutor name
                 tutor_id = session_data.get('tutor_id')
-                tutor_name = "Unknown Tutor"
-                try:
-                    tutor = self.get_user_by_id(tutor_id)
-                    if tutor:
-                        tutor_name = tutor.get('name', 'Unknown Tutor')
-                except:
-                    pass  # Use default tutor name
+                tutor = refs.get('users', tutor_id, {})
+                tutor_name = tutor.get('name', 'Unknown Tutor')
                 
                 # Get module name
                 module_code = session_data.get('module_code')
-                module_name = f"Module {module_code}"
-                try:
-                    module = self.get_module(module_code)
-                    if module:
-                        module_name = module.get('name', module_name)
-                except:
-                    pass  # Use default module name
+                module = refs.get('modules', module_code, {})
+                module_name = module.get('name', f"Module {module_code}")
                 
                 sessions.append({
                     'id': doc.id,
@@ -1159,9 +2054,10 @@ class FirebaseService:
             return sorted(sessions, key=lambda s: (s['date'].strftime('%Y-%m-%d') if s['date'] else '', s['start_time']), reverse=True)
             
         except Exception as e:
-            print(f"Error getting past sessions: {str(e)}")
+            logger.error("Error getting past sessions: %s", e)
             return []
         
+    @invalidates_request_memo
     def submit_feedback(self, session_id, student_id, tutor_id, rating, feedback, was_helpful, improvement=''):
         """Submit feedback for a tutoring session"""
         try:
@@ -1190,57 +2086,145 @@ class FirebaseService:
             
             return True
         except Exception as e:
-            print(f"Error submitting feedback: {str(e)}")
+            logger.error("Error submitting feedback: %s", e)
             return False
 
-    def encode_file_to_base64(self, file_path):
-        """Encode a file to base64 string"""
+    def blob_store(self):
+        """The configured blob store for uploaded files, created on first use"""
+        if FirebaseService._blob_store is None:
+            FirebaseService._blob_store = create_blob_store(Config.BLOB_STORE_BACKEND, Config.BLOB_STORE_PATH)
+        return FirebaseService._blob_store
+    
+    def _store_blob(self, stream, content_type=None):
+        """
+        Stream bytes into the blob store and count one more reference to the blob.
+        The count is raised before the file is put in place, both under the blob's
+        lock, so releasing the last other reference can't delete it in between.
+        """
+        store = self.blob_store()
+        staged = store.stage(stream)
+        blob = {'key': staged['key'], 'sha256': staged['sha256'], 'size': staged['size']}
+        counted = False
+        try:
+            with store.lock(blob['key']):
+                self.db.collection('blob_refs').document(blob['key']).set({
+                    'size': blob['size'],
+                    'content_type': content_type or 'application/octet-stream',
+                    'ref_count': firestore.Increment(1),
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                }, merge=True)
+                counted = True
+                store.commit(staged)
+        except Exception:
+            if counted:
+                self._release_blob(blob['key'])
+            raise
+        finally:
+            store.discard(staged)
+        return blob
+    
+    def _release_blob(self, blob_key):
+        """
+        Drop one reference to a blob, deleting the file when it was the last one.
+        The count and the file are changed under the blob's lock (see _store_blob).
+        """
+        store = self.blob_store()
+        ref = self.db.collection('blob_refs').document(blob_key)
+        
+        @firestore.transactional
+        def release(transaction):
+            snapshot = ref.get(transaction=transaction)
+            ref_count = (snapshot.to_dict() or {}).get('ref_count', 0) if snapshot.exists else 0
+            if ref_count > 1:
+                transaction.update(ref, {'ref_count': ref_count - 1, 'updated_at': firestore.SERVER_TIMESTAMP})
+                return False
+            transaction.delete(ref)
+            return True
+        
         try:
-            with open(file_path, 'rb') as file:
-                file_content = file.read()
-                return base64.b64encode(file_content).decode('utf-8')
+            with store.lock(blob_key):
+                if release(self.db.transaction()):
+                    store.delete(blob_key)
+                    logger.debug("Deleted unreferenced blob %s", blob_key[:12])
         except Exception as e:
-            print(f"Error encoding file to base64: {str(e)}")
-            return None
+            # A leaked blob only costs disk; never fail the caller over it
+            logger.warning("Failed to release blob %s: %s", blob_key[:12], e)
+    
+    @invalidates_request_memo
+    def store_document(self, user_id, doc_type, stream, file_name, content_type=None):
+        """
+        Store an uploaded document. The bytes are streamed into the blob store;
+        Firestore only keeps the metadata.
         
-    def store_document_reference(self, user_id, doc_type, file_content, file_name, file_size):
-        """Store a document reference in Firestore"""
+        Args:
+            user_id (str): Owner of the document
+            doc_type (str): Kind of document (e.g. 'cv', 'academic_record')
+            stream: File-like object to read the upload from
+            file_name (str): Original (secured) file name
+            content_type (str, optional): MIME type reported by the client
+            
+        Returns:
+            str: ID of the document metadata record, or None on failure
+        """
         try:
-            # Create document reference
-            doc_ref = self.db.collection('documents').document()
+            blob = self._store_blob(stream, content_type)
             
-            doc_data = {
+            doc_ref = self.db.collection('documents').document()
+            doc_ref.set({
                 'user_id': str(user_id),
                 'doc_type': doc_type,
-                'file_content': file_content,
+                'blob_key': blob['key'],
+                'sha256': blob['sha256'],
                 'file_name': file_name,
-                'file_size': file_size,
+                'file_size': blob['size'],
+                'content_type': content_type or 'application/octet-stream',
+                'storage': Config.BLOB_STORE_BACKEND,
                 'uploaded_at': firestore.SERVER_TIMESTAMP
-            }
-            
-            # Save the document
-            doc_ref.set(doc_data)
+            })
             
+            logger.debug("Stored %s for user %s as blob %s (%s bytes)", doc_type, user_id, blob['key'][:12], blob['size'])
             return doc_ref.id
         except Exception as e:
-            print(f"Error storing document reference: {str(e)}")
+            logger.error("Error storing document: %s", e)
+            return None
+    
+    def get_document_content(self, doc_id):
+        """
+        Get a stored document's metadata
+        
+        Args:
+            doc_id (str): The document ID
+            
+        Returns:
+            dict: Document metadata with 'id' (older documents also carry their
+                base64 'file_content'), or None if not found
+        """
+        try:
+            doc = self.db.collection('documents').document(str(doc_id)).get()
+            if not doc.exists:
+                return None
+            document = doc.to_dict() or {}
+            document['id'] = doc.id
+            return document
+        except Exception as e:
+            logger.error("Error getting document %s: %s", doc_id, e)
             return None
         
+    @invalidates_request_memo
     def cancel_session(self, session_id):
         """Cancel a booked session"""
         try:
-            # Update the session status
-            session_ref = self.db.collection('sessions').document(session_id)
-            session_ref.update({
-                'status': 'Cancelled',
+            # Update the session status and release its slot
+            session_data = self._set_session_status(session_id, 'Cancelled', {
                 'cancelled_at': firestore.SERVER_TIMESTAMP
             })
             
-            return True
+            return session_data is not None
         except Exception as e:
-            print(f"Error cancelling session: {str(e)}")
+            logger.error("Error cancelling session: %s", e)
             return False
 
+    @invalidates_request_memo
     def create_reservation(self, student_id, tutor_id, module_code, date, start_time, end_time, notes=''):
         """
         Create a temporary session reservation (first step of booking process)
@@ -1258,15 +2242,12 @@ class FirebaseService:
             str: Reservation ID if successful, None otherwise
         """
         try:
-            print(f"DEBUG: create_reservation called with:")
-            print(f"student_id: {student_id}, tutor_id: {tutor_id}")
-            print(f"module_code: {module_code}, date: {date}")
-            print(f"time: {start_time} - {end_time}")
-            print(f"notes: {notes[:50]}{'...' if len(notes) > 50 else ''}")
+            logger.debug("create_reservation called with: student_id=%s, tutor_id=%s, module_code=%s, date=%s, time=%s - %s",
+                         student_id, tutor_id, module_code, date, start_time, end_time)
             
             # Ensure we have a valid database connection
             if not self._ensure_db():
-                print("ERROR: No valid database connection available")
+                logger.error("No valid database connection available")
                 return None
                 
             # Convert parameters to strings
@@ -1280,14 +2261,14 @@ class FirebaseService:
                     date_obj = datetime.strptime(date, '%Y-%m-%d').date()
                     date_str = date
                 except ValueError as e:
-                    print(f"ERROR: Invalid date format: {e}")
+                    logger.error("Invalid date format: %s", e)
                     return None
             else:
                 try:
                     date_obj = date
                     date_str = date.strftime('%Y-%m-%d')
                 except Exception as e:
-                    print(f"ERROR: Invalid date object: {e}")
+                    logger.error("Invalid date object: %s", e)
                     return None
             
             # Validate times
@@ -1296,7 +2277,7 @@ class FirebaseService:
                 datetime.strptime(start_time, '%H:%M')
                 datetime.strptime(end_time, '%H:%M')
             except ValueError as e:
-                print(f"ERROR: Invalid time format: {e}")
+                logger.error("Invalid time format: %s", e)
                 return None
                 
             # Check if the slot is available
@@ -1305,10 +2286,10 @@ class FirebaseService:
                 time_slot = f"{start_time} - {end_time}"
                 
                 if time_slot not in available_slots:
-                    print(f"ERROR: Time slot {time_slot} is not available")
+                    logger.error("Time slot %s is not available", time_slot)
                     return None
             except Exception as e:
-                print(f"ERROR: Failed to verify slot availability: {e}")
+                logger.error("Failed to verify slot availability: %s", e)
                 return None
                 
             # Create a reservation document with expiration
@@ -1332,24 +2313,21 @@ class FirebaseService:
                     'notes': notes
                 }
                 
-                print(f"DEBUG: Creating reservation with data: {reservation_data}")
+                logger.debug("Creating reservation with data: %s", reservation_data)
                 reservation_ref.set(reservation_data)
-                print(f"DEBUG: Reservation created with ID: {reservation_ref.id}")
+                logger.debug("Reservation created with ID: %s", reservation_ref.id)
                 
                 return reservation_ref.id
                 
-            except Exception as db_error:
-                print(f"ERROR: Database operation failed: {db_error}")
-                import traceback
-                print(f"DEBUG: Traceback: {traceback.format_exc()}")
+            except Exception:
+                logger.exception("Database operation failed")
                 return None
                 
-        except Exception as e:
-            print(f"ERROR: Unexpected error in create_reservation: {e}")
-            import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Unexpected error in create_reservation")
             return None
     
+    @invalidates_request_memo
     def confirm_reservation(self, reservation_id):
         """
         Confirm a reservation and create the actual booking (second step of booking process)
@@ -1361,11 +2339,11 @@ class FirebaseService:
             str: Session ID if successful, None otherwise
         """
         try:
-            print(f"DEBUG: confirm_reservation called with ID: {reservation_id}")
+            logger.debug("confirm_reservation called with ID: %s", reservation_id)
             
             # Ensure we have a valid database connection
             if not self._ensure_db():
-                print("ERROR: No valid database connection available")
+                logger.error("No valid database connection available")
                 return None
                 
             # Get the reservation
@@ -1374,34 +2352,22 @@ class FirebaseService:
                 reservation = reservation_ref.get()
                 
                 if not reservation.exists:
-                    print(f"ERROR: Reservation {reservation_id} not found")
+                    logger.error("Reservation %s not found", reservation_id)
                     return None
                     
                 reservation_data = reservation.to_dict()
                 
                 # Check if the reservation has expired
                 expires_at = reservation_data.get('expires_at')
+                if expires_at and expires_at.tzinfo is not None:
+                    # Firestore hands timestamps back timezone-aware
+                    expires_at = expires_at.astimezone().replace(tzinfo=None)
                 if expires_at and expires_at < datetime.now():
-                    print(f"ERROR: Reservation {reservation_id} has expired")
+                    logger.error("Reservation %s has expired", reservation_id)
                     return None
                     
-                # Check if the slot is still available (might have been taken since reservation)
-                try:
-                    date_str = reservation_data.get('date')
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    tutor_id = reservation_data.get('tutor_id')
-                    
-                    available_slots = self.get_tutor_schedule(tutor_id, date_obj)
-                    time_slot = f"{reservation_data.get('start_time')} - {reservation_data.get('end_time')}"
-                    
-                    if time_slot not in available_slots:
-                        print(f"ERROR: Time slot {time_slot} is no longer available")
-                        return None
-                except Exception as slot_error:
-                    print(f"ERROR: Failed to verify slot availability: {slot_error}")
-                    # Continue anyway, as we already checked during reservation
-                
-                # Create the session from reservation data
+                # Create the session from reservation data; the slot is
+                # re-checked inside the booking transaction
                 session_ref = self.db.collection('sessions').document()
                 
                 session_data = {
@@ -1415,12 +2381,15 @@ class FirebaseService:
                     'created_at': firestore.SERVER_TIMESTAMP,
                     'location': 'Online',  # Default location
                     'has_feedback': False,
+                    'duration_hours': self._slot_duration_hours(reservation_data.get('start_time'), reservation_data.get('end_time')),
                     'reservation_id': reservation_id,
                     'notes': reservation_data.get('notes', '')
                 }
                 
-                print(f"DEBUG: Creating session with data: {session_data}")
-                session_ref.set(session_data)
+                logger.debug("Creating session with data: %s", session_data)
+                if not self._create_session(session_ref, session_data):
+                    logger.error("Time slot for reservation %s was booked by someone else", reservation_id)
+                    return None
                 
                 # Mark reservation as Confirmed
                 reservation_ref.update({
@@ -1429,79 +2398,99 @@ class FirebaseService:
                     'session_id': session_ref.id
                 })
                 
-                # Create notifications
-                try:
-                    # For tutor
-                    self._create_notification(
-                        user_id=session_data.get('tutor_id'),
-                        title="New Session Booking Request",
-                        message=f"A student has requested a tutoring session with you on {session_data.get('date')} at {session_data.get('start_time')}. Please confirm or reject this request.",
-                        type="booking",
-                        reference_id=session_ref.id
-                    )
-                    
-                    # For student
-                    self._create_notification(
-                        user_id=session_data.get('student_id'),
-                        title="Session Booking Submitted",
-                        message=f"Your tutoring session request has been submitted for {session_data.get('date')} at {session_data.get('start_time')}. Waiting for tutor confirmation.",
-                        type="booking",
-                        reference_id=session_ref.id
-                    )
-                except Exception as notif_error:
-                    print(f"WARNING: Failed to create notifications: {notif_error}")
-                    # Continue even if notifications fail
+                self._notify_session_requested(session_ref.id, session_data)
                 
-                print(f"DEBUG: Session created successfully with ID: {session_ref.id}")
+                logger.debug("Session created successfully with ID: %s", session_ref.id)
                 return session_ref.id
                 
-            except Exception as db_error:
-                print(f"ERROR: Database operation failed: {db_error}")
-                import traceback
-                print(f"DEBUG: Traceback: {traceback.format_exc()}")
+            except Exception:
+                logger.exception("Database operation failed")
                 return None
                 
-        except Exception as e:
-            print(f"ERROR: Unexpected error in confirm_reservation: {e}")
-            import traceback
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Unexpected error in confirm_reservation")
             return None
     
+    @invalidates_request_memo
+    def expire_reservations(self, page_size=400):
+        """
+        Mark every pending reservation past its expiry as Expired, one batched
+        write per page of results
+        
+        Args:
+            page_size (int): Reservations fetched and updated per batch (max 500)
+            
+        Returns:
+            dict: {'expired': number of reservations expired, 'duration_ms': time taken}
+        """
+        started = time.monotonic()
+        page_size = max(1, min(page_size, 500))
+        now = datetime.now()
+        expired = 0
+        
+        # Expired documents drop out of the query, so each page starts from the top
+        query = self.db.collection('reservations') \
+                    .where('status', '==', 'Pending') \
+                    .where('expires_at', '<', now) \
+                    .select(['status']) \
+                    .limit(page_size)
+        while True:
+            docs = list(query.stream())
+            if not docs:
+                break
+            batch = self.db.batch()
+            for doc in docs:
+                batch.update(doc.reference, {
+                    'status': 'Expired',
+                    'expired_at': firestore.SERVER_TIMESTAMP
+                })
+            batch.commit()
+            expired += len(docs)
+            if len(docs) < page_size:
+                break
+        
+        duration_ms = int((time.monotonic() - started) * 1000)
+        logger.debug("Expired %s reservations in %sms", expired, duration_ms)
+        return {'expired': expired, 'duration_ms': duration_ms}
+    
+    @invalidates_request_memo
     def cleanup_expired_reservations(self):
         """Clean up expired reservations to free up slots"""
         try:
             # Ensure we have a valid database connection
             if not self._ensure_db():
-                print("ERROR: Database connection is not valid")
+                logger.error("Database connection is not valid")
                 return False
-                
-            # Get all expired reservations
-            now = datetime.now()
-            expired_query = self.db.collection('reservations') \
-                                .where('status', '==', 'Pending') \
-                                .where('expires_at', '<', now)
             
-            count = 0
-            for reservation in expired_query.stream():
-                reservation_ref = self.db.collection('reservations').document(reservation.id)
-                reservation_ref.update({
-                    'status': 'Expired',
-                    'expired_at': firestore.SERVER_TIMESTAMP
-                })
-                count += 1
-                
-            print(f"DEBUG: Cleaned up {count} expired reservations")
+            self.expire_reservations()
             return True
             
         except Exception as e:
-            print(f"ERROR: Failed to clean up expired reservations: {e}")
+            logger.error("Failed to clean up expired reservations: %s", e)
             return False
+    
+    def start_reservation_sweeper(self, interval=None, page_size=None):
+        """Start expiring reservations in the background (one leader across workers)"""
+        if FirebaseService._sweeper is None:
+            FirebaseService._sweeper = ReservationSweeper(
+                self,
+                interval=interval or Config.RESERVATION_SWEEP_INTERVAL,
+                page_size=page_size or Config.RESERVATION_SWEEP_PAGE_SIZE
+            )
+        return FirebaseService._sweeper.start()
+    
+    def stop_reservation_sweeper(self):
+        """Stop the background reservation sweeper"""
+        if FirebaseService._sweeper is not None:
+            FirebaseService._sweeper.stop()
+            FirebaseService._sweeper = None
 
+    @invalidates_request_memo
     def seed_modules(self):
         """Seed predefined modules into the database"""
         try:
             if not self._ensure_db():
-                print("Database connection is not valid, cannot seed modules")
+                logger.error("Database connection is not valid, cannot seed modules")
                 return False
             
             # List of modules to seed
@@ -1525,21 +2514,23 @@ class FirebaseService:
                 module_ref = self.db.collection('modules').document(module["code"])
                 if not module_ref.get().exists:
                     module_ref.set(module)
-                    print(f"Seeded module: {module['code']} - {module['name']}")
+                    logger.info("Seeded module: %s - %s", module['code'], module['name'])
                 else:
-                    print(f"Module already exists: {module['code']} - {module['name']}")
-                
+                    logger.info("Module already exists: %s - %s", module['code'], module['name'])
+            
+            self._invalidate_module_cache()
             return True
             
         except Exception as e:
-            print(f"Error seeding modules: {str(e)}")
+            logger.error("Error seeding modules: %s", e)
             return False
 
+    @invalidates_request_memo
     def seed_tutors(self):
         """Seed demo tutors into the database"""
         try:
             if not self._ensure_db():
-                print("Database connection is not valid, cannot seed tutors")
+                logger.error("Database connection is not valid, cannot seed tutors")
                 return False
             
             # List of tutors to seed
@@ -1575,7 +2566,8 @@ class FirebaseService:
                 tutor_id = tutor["id"]
                 # Store tutor in users collection
                 self.db.collection('users').document(tutor_id).set(tutor)
-                print(f"Seeded tutor: {tutor['name']}")
+                self.invalidate_user(tutor_id)
+                logger.info("Seeded tutor: %s", tutor['name'])
                 
                 # Also register them as tutors for their modules
                 for module_code in tutor["modules"]:
@@ -1587,19 +2579,20 @@ class FirebaseService:
                         "email": tutor["email"],
                         "bio": tutor["bio"]
                     })
-                    print(f"Registered tutor {tutor['name']} for module {module_code}")
+                    logger.info("Registered tutor %s for module %s", tutor['name'], module_code)
             
             return True
             
         except Exception as e:
-            print(f"Error seeding tutors: {str(e)}")
+            logger.error("Error seeding tutors: %s", e)
             return False
 
+    @invalidates_request_memo
     def seed_tutor_availability(self):
         """Seed tutor availability for the next 14 days"""
         try:
             if not self._ensure_db():
-                print("Database connection is not valid, cannot seed tutor availability")
+                logger.error("Database connection is not valid, cannot seed tutor availability")
                 return False
             
             tutor_ids = ["tutor1", "tutor2", "tutor3"]
@@ -1650,19 +2643,20 @@ class FirebaseService:
                         "available_slots": available_slots,
                         "updated_at": datetime.now().isoformat()
                     })
-                    print(f"Seeded availability for tutor {tutor_id} on {date}: {len(available_slots)} slots")
+                    logger.info("Seeded availability for tutor %s on %s: %s slots", tutor_id, date, len(available_slots))
             
             return True
             
         except Exception as e:
-            print(f"Error seeding tutor availability: {str(e)}")
+            logger.error("Error seeding tutor availability: %s", e)
             return False
 
+    @invalidates_request_memo
     def seed_students(self):
         """Seed demo students into the database"""
         try:
             if not self._ensure_db():
-                print("Database connection is not valid, cannot seed students")
+                logger.error("Database connection is not valid, cannot seed students")
                 return False
             
             # List of students to seed
@@ -1694,19 +2688,21 @@ class FirebaseService:
             for student in students:
                 student_id = student["id"]
                 self.db.collection('users').document(student_id).set(student)
-                print(f"Seeded student: {student['name']}")
+                self.invalidate_user(student_id)
+                logger.info("Seeded student: %s", student['name'])
             
             return True
             
         except Exception as e:
-            print(f"Error seeding students: {str(e)}")
+            logger.error("Error seeding students: %s", e)
             return False
 
+    @invalidates_request_memo
     def seed_bookings(self):
         """Seed demo bookings for students and tutors"""
         try:
             if not self._ensure_db():
-                print("Database connection is not valid, cannot seed bookings")
+                logger.error("Database connection is not valid, cannot seed bookings")
                 return False
             
             # Define bookings to seed
@@ -1755,6 +2751,7 @@ class FirebaseService:
                 booking["session_id"] = booking_id  # For backward compatibility
                 booking["cancelled"] = False
                 booking["has_feedback"] = False
+                booking["duration_hours"] = self._slot_duration_hours(booking["start_time"], booking["end_time"])
                 
                 # Get student and tutor names for reference
                 try:
@@ -1772,15 +2769,19 @@ class FirebaseService:
                     booking["time_slot"] = f"{booking['start_time']} - {booking['end_time']}"
                     
                 except Exception as e:
-                    print(f"Error retrieving related data for booking: {e}")
+                    logger.error("Error retrieving related data for booking: %s", e)
                     booking["student_name"] = "Unknown Student"
                     booking["tutor_name"] = "Unknown Tutor"
                     booking["module_name"] = f"Module {booking['module_code']}"
                     booking["time_slot"] = f"{booking['start_time']} - {booking['end_time']}"
                 
-                # Store booking in database
-                self.db.collection('sessions').document(booking_id).set(booking)
-                print(f"Seeded booking: {booking_id} for {booking['student_name']} with {booking['tutor_name']}")
+                # Store the booking with its slot lock and occupancy bit, like a real booking
+                session_ref = self.db.collection('sessions').document(booking_id)
+                if not self._create_session(session_ref, booking):
+                    logger.info("Skipped seeding booking for %s on %s at %s: the slot is already booked",
+                                booking['tutor_id'], booking['date'], booking['start_time'])
+                    continue
+                logger.info("Seeded booking: %s for %s with %s", booking_id, booking['student_name'], booking['tutor_name'])
                 
                 # Remove the slot from tutor availability
                 try:
@@ -1792,16 +2793,18 @@ class FirebaseService:
                         if time_slot in availability["available_slots"]:
                             availability["available_slots"].remove(time_slot)
                             availability_ref.update({"available_slots": availability["available_slots"]})
-                            print(f"Removed booked slot {time_slot} from {booking['tutor_id']}'s availability on {booking['date']}")
+                            logger.info("Removed booked slot %s from %s's availability on %s",
+                                        time_slot, booking['tutor_id'], booking['date'])
                 except Exception as e:
-                    print(f"Error updating tutor availability: {e}")
+                    logger.error("Error updating tutor availability: %s", e)
             
             return True
             
         except Exception as e:
-            print(f"Error seeding bookings: {str(e)}")
+            logger.error("Error seeding bookings: %s", e)
             return False
 
+    @request_memoized
     def get_tutor_applications(self):
         """
         Get all pending tutor applications with user details
@@ -1814,17 +2817,21 @@ class FirebaseService:
             # Get all pending applications
             docs = self.db.collection('tutor_applications').where('status', '==', 'pending').stream()
             
+            rows = []
             for doc in docs:
                 app_data = doc.to_dict()
                 # Add the document ID to the data
                 app_data['id'] = doc.id
-                
+                rows.append(app_data)
+            
+            # Resolve applicants in one batch
+            refs = self._load_references(rows, {'user_id': 'users'})
+            
+            for app_data in rows:
                 # Get user details
                 if 'user_id' in app_data:
-                    user_ref = self.db.collection('users').document(app_data['user_id'])
-                    user = user_ref.get()
-                    if user.exists:
-                        user_data = user.to_dict()
+                    user_data = refs.get('users', app_data['user_id'])
+                    if user_data is not None:
                         app_data.update({
                             'name': user_data.get('name', 'Unknown'),
                             'email': user_data.get('email', 'No email'),
@@ -1832,7 +2839,7 @@ class FirebaseService:
                             'student_number': user_data.get('student_number', 'Not provided')
                         })
                     else:
-                        print(f"User not found for application {doc.id}")
+                        logger.warning("User not found for application %s", app_data['id'])
                         app_data.update({
                             'name': 'Unknown User',
                             'email': 'No email',
@@ -1849,32 +2856,31 @@ class FirebaseService:
             
             # Sort by creation date, newest first
             applications.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
-            print(f"Retrieved {len(applications)} tutor applications")
+            logger.debug("Retrieved %s tutor applications", len(applications))
             return applications
             
-        except Exception as e:
-            print(f"Error getting tutor applications: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error getting tutor applications")
             return []
 
+    @request_memoized
     def get_all_users(self):
         """Get all users with their roles and details"""
         try:
-            print("Starting to fetch users from Firebase...")
+            logger.debug("Starting to fetch users from Firebase...")
             users = []
             users_ref = self.db.collection('users')
             
             # Get all users
             docs = list(users_ref.stream())  # Convert to list to catch potential stream errors
-            print(f"Successfully connected to users collection. Found {len(docs)} documents.")
+            logger.debug("Successfully connected to users collection. Found %s documents.", len(docs))
             
             for doc in docs:
                 try:
-                    print(f"Processing user document: {doc.id}")
+                    logger.debug("Processing user document: %s", doc.id)
                     user_data = doc.to_dict()
                     if not user_data:
-                        print(f"Warning: Empty user data for document {doc.id}")
+                        logger.warning("Empty user data for document %s", doc.id)
                         continue
                         
                     # Add the document ID to the data
@@ -1908,13 +2914,11 @@ class FirebaseService:
                     # Format verification status
                     user_data['is_verified'] = 'Yes' if user_data['is_verified'] else 'No'
                     
-                    print(f"Successfully processed user: {user_data.get('email', 'No email')}")
+                    logger.debug("Successfully processed user: %s", user_data.get('email', 'No email'))
                     users.append(user_data)
                     
-                except Exception as e:
-                    print(f"Error processing user document {doc.id}: {str(e)}")
-                    import traceback
-                    print(traceback.format_exc())
+                except Exception:
+                    logger.exception("Error processing user document %s", doc.id)
                     continue
             
             # Sort users by creation date (newest first)
@@ -1924,15 +2928,101 @@ class FirebaseService:
                 reverse=True
             )
             
-            print(f"Successfully retrieved {len(users)} users from database")
+            logger.debug("Successfully retrieved %s users from database", len(users))
             return users
             
-        except Exception as e:
-            print(f"Error getting all users: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error getting all users")
             return []
 
+    # Columns shown in the admin user directory
+    USER_LIST_FIELDS = ['name', 'email', 'role', 'is_verified', 'student_number', 'staff_number', 'created_at']
+    USER_PAGE_MAX = 100
+    
+    @request_memoized
+    def get_users_page(self, role=None, verified=None, cursor=None, per_page=25):
+        """
+        Get one page of the user directory, newest accounts first
+        
+        Args:
+            role (str, optional): Only users with this role ('student', 'tutor', 'admin')
+            verified (bool, optional): Only verified (True) or unverified (False) users
+            cursor (str, optional): Opaque cursor from a previous page
+            per_page (int): Users per page (capped at USER_PAGE_MAX)
+            
+        Returns:
+            dict: {'items': [...], 'next_cursor': str or None, 'prev_cursor': str or None,
+                   'total': approximate number of matching users}
+        """
+        page = {'items': [], 'next_cursor': None, 'prev_cursor': None, 'total': None}
+        try:
+            per_page = max(1, min(int(per_page), self.USER_PAGE_MAX))
+            
+            query = self.db.collection('users')
+            if role:
+                query = query.where('role', '==', role.lower())
+            if verified is not None:
+                query = query.where('is_verified', '==', bool(verified))
+            
+            page['total'] = self._approximate_count(query, ('users_count', role or '', verified))
+            page.update(self._keyset_page(query.select(self.USER_LIST_FIELDS), 'created_at',
+                                          cursor, per_page, self._user_list_item))
+            return page
+            
+        except Exception:
+            logger.exception("Error getting users page")
+            return page
+    
+    def _user_list_item(self, user_id, user_data):
+        """Format a user document for the directory listing"""
+        created_at = user_data.get('created_at')
+        return {
+            'id': user_id,
+            'name': user_data.get('name', 'Unknown User'),
+            'email': user_data.get('email', 'No email'),
+            'role': (user_data.get('role') or 'student').capitalize(),
+            'is_verified': 'Yes' if user_data.get('is_verified') else 'No',
+            'student_number': user_data.get('student_number', 'N/A'),
+            'staff_number': user_data.get('staff_number', 'N/A'),
+            'created_at': created_at.strftime('%Y-%m-%d %H:%M:%S UTC') if hasattr(created_at, 'strftime') else 'Unknown'
+        }
+    
+    @invalidates_request_memo
+    def backfill_user_created_at(self, batch_size=400):
+        """
+        Give users without a created_at a timestamp so they appear in the
+        paginated directory (Firestore leaves documents missing the order field
+        out of ordered queries). Uses the Auth account's creation time when known.
+        
+        Returns:
+            int: Number of users updated
+        """
+        updated = 0
+        batch = self.db.batch()
+        pending = 0
+        for doc in self.db.collection('users').select(['created_at']).stream():
+            if isinstance((doc.to_dict() or {}).get('created_at'), datetime):
+                continue
+            created_at = datetime.now(timezone.utc)
+            try:
+                creation_ms = auth.get_user(doc.id).user_metadata.creation_timestamp
+                if creation_ms:
+                    created_at = datetime.fromtimestamp(creation_ms / 1000, tz=timezone.utc)
+            except Exception:
+                pass
+            batch.update(doc.reference, {'created_at': created_at})
+            pending += 1
+            updated += 1
+            if pending >= batch_size:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+        logger.debug("Backfilled created_at on %s users", updated)
+        return updated
+
+    @invalidates_request_memo
     def approve_tutor_application(self, application_id):
         """
         Approve a tutor application and update the user's role
@@ -1949,14 +3039,14 @@ class FirebaseService:
             app = app_ref.get()
             
             if not app.exists:
-                print(f"Application {application_id} not found")
+                logger.debug("Application %s not found", application_id)
                 return False
                 
             app_data = app.to_dict()
             user_id = app_data.get('user_id')
             
             if not user_id:
-                print("Application has no associated user ID")
+                logger.warning("Application has no associated user ID")
                 return False
             
             # Update application status
@@ -1975,6 +3065,8 @@ class FirebaseService:
                 'qualifications': app_data.get('qualifications', ''),
                 'experience': app_data.get('experience', '')
             })
+            self.revoke_user_sessions(user_id)
+            self._invalidate_eligibility_cache()
             
             # Create notification for the user
             self._create_notification(
@@ -1986,12 +3078,11 @@ class FirebaseService:
             
             return True
             
-        except Exception as e:
-            print(f"Error approving tutor application: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error approving tutor application")
             return False
             
+    @invalidates_request_memo
     def reject_tutor_application(self, application_id, reason=''):
         """
         Reject a tutor application
@@ -2009,14 +3100,14 @@ class FirebaseService:
             app = app_ref.get()
             
             if not app.exists:
-                print(f"Application {application_id} not found")
+                logger.debug("Application %s not found", application_id)
                 return False
                 
             app_data = app.to_dict()
             user_id = app_data.get('user_id')
             
             if not user_id:
-                print("Application has no associated user ID")
+                logger.warning("Application has no associated user ID")
                 return False
             
             # Update application status
@@ -2041,12 +3132,11 @@ class FirebaseService:
             
             return True
             
-        except Exception as e:
-            print(f"Error rejecting tutor application: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error rejecting tutor application")
             return False
 
+    @invalidates_request_memo
     def add_module(self, module_code, module_name, description):
         """
         Add a new module to the system
@@ -2062,13 +3152,13 @@ class FirebaseService:
         try:
             # Validate inputs
             if not all([module_code, module_name, description]):
-                print("Missing required fields")
+                logger.warning("Missing required fields")
                 return False
                 
             # Check if module already exists
             module_ref = self.db.collection('modules').document(str(module_code))
             if module_ref.get().exists:
-                print(f"Module {module_code} already exists")
+                logger.debug("Module %s already exists", module_code)
                 return False
                 
             # Create module document
@@ -2083,56 +3173,92 @@ class FirebaseService:
             
             # Save to Firestore
             module_ref.set(module_data)
-            print(f"Module {module_code} created successfully")
+            self._invalidate_module_cache()
+            logger.debug("Module %s created successfully", module_code)
             return True
             
-        except Exception as e:
-            print(f"Error adding module: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error adding module")
             return False
 
-    def get_available_tutors(self, exclude_module_code=None):
+    @invalidates_request_memo
+    def update_module(self, module_code, module_name, description):
         """
-        Get all available tutors that can be assigned to modules
+        Update a module's name and description
         
         Args:
-            exclude_module_code (str, optional): Module code to exclude tutors from (for reassignment)
+            module_code (str): Code of the module to update
+            module_name (str): New name of the module
+            description (str): New module description
             
         Returns:
-            list: List of available tutors with their details
+            bool: True if successful, False otherwise
         """
         try:
-            print(f"Getting available tutors (excluding module {exclude_module_code})")
+            module_ref = self.db.collection('modules').document(str(module_code))
+            if not module_ref.get().exists:
+                logger.debug("Module %s not found", module_code)
+                return False
             
-            # Get all users with tutor role
-            tutors = []
-            users_ref = self.db.collection('users')
-            tutor_docs = users_ref.where('role', '==', 'tutor').stream()
+            updates = {'updated_at': firestore.SERVER_TIMESTAMP}
+            if module_name:
+                updates['module_name'] = module_name
+            if description is not None:
+                updates['description'] = description
+            
+            module_ref.update(updates)
+            self._invalidate_module_cache()
+            logger.debug("Module %s updated successfully", module_code)
+            return True
+            
+        except Exception:
+            logger.exception("Error updating module")
+            return False
+
+    @invalidates_request_memo
+    def delete_module(self, module_code):
+        """
+        Delete a module from the system
+        
+        Args:
+            module_code (str): Code of the module to delete
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            module_ref = self.db.collection('modules').document(str(module_code))
+            if not module_ref.get().exists:
+                logger.debug("Module %s not found", module_code)
+                return False
+            
+            module_ref.delete()
+            self._invalidate_module_cache()
+            logger.debug("Module %s deleted successfully", module_code)
+            return True
             
-            for doc in tutor_docs:
+        except Exception:
+            logger.exception("Error deleting module")
+            return False
+
+    # Tutor fields needed by the assignment pages
+    TUTOR_LIST_FIELDS = ['name', 'email', 'staff_number', 'qualifications', 'experience', 'modules']
+    
+    def _tutor_directory(self):
+        """All tutors, projected to the assignment-page fields (cached briefly)"""
+        tutors = self._eligibility_cache.get(('tutors',))
+        if tutors is TTLCache.MISS:
+            query = self.db.collection('users').where('role', '==', 'tutor').select(self.TUTOR_LIST_FIELDS)
+            tutors = []
+            for doc in query.stream():
                 tutor_data = doc.to_dict()
-                tutor_id = doc.id
                 
                 # Skip if no data
                 if not tutor_data:
                     continue
                 
-                # If excluding a module, check if tutor is already assigned
-                if exclude_module_code:
-                    module_tutors_ref = self.db.collection('module_tutors')
-                    existing_assignment = module_tutors_ref.where('tutor_id', '==', tutor_id)\
-                                                         .where('module_code', '==', exclude_module_code)\
-                                                         .limit(1)\
-                                                         .stream()
-                    
-                    # Skip if already assigned to this module
-                    if len(list(existing_assignment)) > 0:
-                        continue
-                
-                # Add tutor to list with required fields
                 tutors.append({
-                    'id': tutor_id,
+                    'id': doc.id,
                     'name': tutor_data.get('name', 'Unknown Tutor'),
                     'email': tutor_data.get('email', ''),
                     'staff_number': tutor_data.get('staff_number', 'N/A'),
@@ -2140,16 +3266,114 @@ class FirebaseService:
                     'experience': tutor_data.get('experience', ''),
                     'modules': tutor_data.get('modules', [])
                 })
+            self._eligibility_cache.set(('tutors',), tutors)
+        return tutors
+    
+    def _module_tutor_ids(self, module_code):
+        """IDs of the tutors assigned to a module, from one module_tutors query (cached briefly)"""
+        key = ('module_tutor_ids', str(module_code))
+        tutor_ids = self._eligibility_cache.get(key)
+        if tutor_ids is TTLCache.MISS:
+            tutor_ids = frozenset(str(doc.get('tutor_id')) for doc in self._query_module_tutors('module_code', module_code))
+            self._eligibility_cache.set(key, tutor_ids)
+        return tutor_ids
+    
+    def _tutor_module_codes(self, tutor_id):
+        """Codes of the modules a tutor is assigned to, from one module_tutors query (cached briefly)"""
+        key = ('tutor_module_codes', str(tutor_id))
+        module_codes = self._eligibility_cache.get(key)
+        if module_codes is TTLCache.MISS:
+            module_codes = frozenset(str(doc.get('module_code')) for doc in self._query_module_tutors('tutor_id', tutor_id))
+            self._eligibility_cache.set(key, module_codes)
+        return module_codes
+    
+    @request_memoized
+    def get_module_tutor_counts(self):
+        """
+        Number of tutors assigned to every module, from a single pass over module_tutors
+        
+        Returns:
+            dict: Module code -> number of distinct assigned tutors (modules without
+            tutors are absent)
+        """
+        counts = self._eligibility_cache.get(('module_tutor_counts',))
+        if counts is not TTLCache.MISS:
+            return counts
+        
+        try:
+            replica = self._replica('module_tutors')
+            if replica is not None:
+                assignments = replica.documents()
+            else:
+                assignments = self.db.collection('module_tutors').select(['module_code', 'tutor_id']).stream()
             
-            print(f"Found {len(tutors)} available tutors")
-            return tutors
+            tutors_by_module = {}
+            for assignment in assignments:
+                module_code = assignment.get('module_code')
+                tutor_id = assignment.get('tutor_id')
+                if not module_code or not tutor_id:
+                    continue
+                tutors_by_module.setdefault(str(module_code), set()).add(str(tutor_id))
+            
+            counts = {code: len(tutor_ids) for code, tutor_ids in tutors_by_module.items()}
+            logger.debug("Counted tutors for %s modules", len(counts))
+            self._eligibility_cache.set(('module_tutor_counts',), counts)
+            return counts
+        except Exception as e:
+            logger.error("Failed to count module tutors: %s", e)
+            return {}
+    
+    def _invalidate_eligibility_cache(self):
+        """Forget cached tutor listings and assignments after they change"""
+        self._eligibility_cache.clear()
+    
+    @request_memoized
+    def get_available_tutors(self, exclude_module_code=None):
+        """
+        Get all available tutors that can be assigned to modules
+        
+        Args:
+            exclude_module_code (str, optional): Module code to exclude tutors from (for reassignment)
+            
+        Returns:
+            list: List of available tutors with their details
+        """
+        try:
+            logger.debug("Getting available tutors (excluding module %s)", exclude_module_code)
+            
+            tutors = self._tutor_directory()
+            
+            # Leave out tutors already assigned to the module
+            if exclude_module_code:
+                assigned = self._module_tutor_ids(exclude_module_code)
+                tutors = [tutor for tutor in tutors if tutor['id'] not in assigned]
+            
+            logger.debug("Found %s available tutors", len(tutors))
+            return copy.deepcopy(tutors)
+            
+        except Exception:
+            logger.exception("Error getting available tutors")
+            return []
+    
+    @request_memoized
+    def get_assignable_modules(self, tutor_id):
+        """
+        Get the modules a tutor is not yet assigned to
+        
+        Args:
+            tutor_id (str): The tutor's ID
             
+        Returns:
+            list: Modules (as returned by get_all_modules) the tutor can be assigned to
+        """
+        try:
+            assigned = self._tutor_module_codes(tutor_id)
+            return [module for module in self.get_all_modules() if module['id'] not in assigned]
         except Exception as e:
-            print(f"Error getting available tutors: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.error("Error getting assignable modules for tutor %s: %s", tutor_id, e)
             return []
 
+    @invalidates_request_memo
     def assign_tutor_to_module(self, tutor_id, module_code):
         """
         Assign a tutor to a module
@@ -2162,23 +3386,23 @@ class FirebaseService:
             bool: True if successful, False otherwise
         """
         try:
-            print(f"Assigning tutor {tutor_id} to module {module_code}")
+            logger.debug("Assigning tutor %s to module %s", tutor_id, module_code)
             
             # Validate inputs
             if not tutor_id or not module_code:
-                print("Missing required fields")
+                logger.warning("Missing required fields")
                 return False
             
             # Check if tutor exists and is actually a tutor
             tutor = self.get_user_by_id(tutor_id)
             if not tutor or tutor.get('role', '').lower() != 'tutor':
-                print(f"Invalid tutor ID or user is not a tutor: {tutor_id}")
+                logger.warning("Invalid tutor ID or user is not a tutor: %s", tutor_id)
                 return False
             
             # Check if module exists
             module = self.get_module(module_code)
             if not module:
-                print(f"Module not found: {module_code}")
+                logger.warning("Module not found: %s", module_code)
                 return False
             
             # Check if assignment already exists
@@ -2189,7 +3413,7 @@ class FirebaseService:
                                                  .stream()
             
             if len(list(existing_assignment)) > 0:
-                print(f"Tutor {tutor_id} is already assigned to module {module_code}")
+                logger.debug("Tutor %s is already assigned to module %s", tutor_id, module_code)
                 return False
             
             # Create the assignment
@@ -2204,6 +3428,7 @@ class FirebaseService:
             
             # Save to Firestore
             module_tutors_ref.document(assignment_id).set(assignment_data)
+            self._invalidate_eligibility_cache()
             
             # Create notification for the tutor
             self._create_notification(
@@ -2214,15 +3439,14 @@ class FirebaseService:
                 reference_id=assignment_id
             )
             
-            print(f"Successfully assigned tutor {tutor_id} to module {module_code}")
+            logger.info("Successfully assigned tutor %s to module %s", tutor_id, module_code)
             return True
             
-        except Exception as e:
-            print(f"Error assigning tutor to module: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error assigning tutor to module")
             return False
 
+    @invalidates_request_memo
     def unassign_tutor_from_module(self, assignment_id):
         """
         Remove a tutor's assignment from a module using the assignment ID
@@ -2234,11 +3458,11 @@ class FirebaseService:
             bool: True if successful, False otherwise
         """
         try:
-            print(f"Removing tutor assignment: {assignment_id}")
+            logger.debug("Removing tutor assignment: %s", assignment_id)
             
             # Validate input
             if not assignment_id:
-                print("Missing assignment ID")
+                logger.warning("Missing assignment ID")
                 return False
             
             # Get the assignment document
@@ -2246,7 +3470,7 @@ class FirebaseService:
             assignment = module_tutors_ref.get()
             
             if not assignment.exists:
-                print(f"No assignment found with ID: {assignment_id}")
+                logger.warning("No assignment found with ID: %s", assignment_id)
                 return False
                 
             # Get assignment data for notification
@@ -2256,6 +3480,7 @@ class FirebaseService:
             
             # Delete the assignment
             module_tutors_ref.delete()
+            self._invalidate_eligibility_cache()
             
             # Create notification for the tutor if we have the necessary data
             if module_code and tutor_id:
@@ -2270,15 +3495,14 @@ class FirebaseService:
                     reference_id=assignment_id
                 )
             
-            print(f"Successfully removed assignment {assignment_id}")
+            logger.info("Successfully removed assignment %s", assignment_id)
             return True
             
-        except Exception as e:
-            print(f"Error removing tutor assignment: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error removing tutor assignment")
             return False 
 
+    @request_memoized
     def get_session(self, session_id):
         """Get session details by ID"""
         try:
@@ -2295,9 +3519,10 @@ class FirebaseService:
             return session_data
             
         except Exception as e:
-            print(f"Error getting session: {str(e)}")
+            logger.error("Error getting session: %s", e)
             return None
 
+    @invalidates_request_memo
     def update_session_status(self, session_id, new_status):
         """Update the status of a session"""
         try:
@@ -2306,25 +3531,19 @@ class FirebaseService:
             
             # Check if the new status is valid
             if new_status.lower() not in valid_statuses:
-                print(f"Invalid status: {new_status}")
-                return False
-            
-            # Get the session document
-            session_ref = self.db.collection('sessions').document(session_id)
-            session_doc = session_ref.get()
-            
-            if not session_doc.exists:
-                print(f"Session {session_id} not found")
+                logger.warning("Invalid status: %s", new_status)
                 return False
             
-            # Update the status
-            session_ref.update({
-                'status': new_status.lower(),
+            # Update the status (and the tutor's slot occupancy)
+            session_data = self._set_session_status(session_id, new_status.lower(), {
                 'updated_at': firestore.SERVER_TIMESTAMP
             })
             
-            # Get the updated session data for notifications
-            session_data = session_doc.to_dict()
+            if session_data is None:
+                logger.debug("Session %s not found", session_id)
+                return False
+            
+            # Get the session data for notifications
             student_id = session_data.get('student_id')
             tutor_id = session_data.get('tutor_id')
             session_date = session_data.get('date')
@@ -2367,15 +3586,16 @@ class FirebaseService:
                     )
                     
             except Exception as notif_error:
-                print(f"WARNING: Failed to create notifications: {notif_error}")
+                logger.warning("Failed to create notifications: %s", notif_error)
                 # Continue even if notifications fail
             
             return True
             
         except Exception as e:
-            print(f"Error updating session status: {str(e)}")
+            logger.error("Error updating session status: %s", e)
             return False
 
+    @request_memoized
     def get_student_applications(self):
         """
         Get all pending student applications
@@ -2404,9 +3624,10 @@ class FirebaseService:
             return applications
             
         except Exception as e:
-            print(f"Error getting student applications: {str(e)}")
+            logger.error("Error getting student applications: %s", e)
             return []
 
+    @invalidates_request_memo
     def approve_student_application(self, student_id):
         """
         Approve a student application
@@ -2426,14 +3647,14 @@ class FirebaseService:
             student_doc = student_ref.get()
             
             if not student_doc.exists:
-                print(f"Student {student_id} not found")
+                logger.debug("Student %s not found", student_id)
                 return False
                 
             student_data = student_doc.to_dict()
             
             # Verify it's a student with pending status
             if student_data.get('role') != 'student' or student_data.get('is_verified', True):
-                print(f"Invalid student application: {student_data}")
+                logger.warning("Invalid student application: %s", student_data)
                 return False
                 
             # Update the student document
@@ -2442,6 +3663,7 @@ class FirebaseService:
                 'student_status': 'approved',
                 'approved_at': firestore.SERVER_TIMESTAMP,
             })
+            self.revoke_user_sessions(student_id)
             
             # Create a notification for the student
             student_email = student_data.get('email')
@@ -2454,15 +3676,16 @@ class FirebaseService:
                     reference_id=student_id
                 )
             except Exception as notif_error:
-                print(f"Error creating notification: {str(notif_error)}")
+                logger.error("Error creating notification: %s", notif_error)
                 
-            print(f"Approved student application for {student_email}")
+            logger.info("Approved student application for %s", student_email)
             return True
             
         except Exception as e:
-            print(f"Error approving student application: {str(e)}")
+            logger.error("Error approving student application: %s", e)
             return False
     
+    @invalidates_request_memo
     def reject_student_application(self, student_id, reason=''):
         """
         Reject a student application
@@ -2483,14 +3706,14 @@ class FirebaseService:
             student_doc = student_ref.get()
             
             if not student_doc.exists:
-                print(f"Student {student_id} not found")
+                logger.debug("Student %s not found", student_id)
                 return False
                 
             student_data = student_doc.to_dict()
             
             # Verify it's a student with pending status
             if student_data.get('role') != 'student' or student_data.get('is_verified', True):
-                print(f"Invalid student application: {student_data}")
+                logger.warning("Invalid student application: %s", student_data)
                 return False
                 
             # Update the student document
@@ -2499,6 +3722,7 @@ class FirebaseService:
                 'rejection_reason': reason,
                 'rejected_at': firestore.SERVER_TIMESTAMP,
             })
+            self.revoke_user_sessions(student_id)
             
             # Create a notification for the student
             student_email = student_data.get('email')
@@ -2515,11 +3739,11 @@ class FirebaseService:
                     reference_id=student_id
                 )
             except Exception as notif_error:
-                print(f"Error creating notification: {str(notif_error)}")
+                logger.error("Error creating notification: %s", notif_error)
                 
-            print(f"Rejected student application for {student_email}")
+            logger.info("Rejected student application for %s", student_email)
             return True
             
         except Exception as e:
-            print(f"Error rejecting student application: {str(e)}")
+            logger.error("Error rejecting student application: %s", e)
             return False
\ No newline at end of file
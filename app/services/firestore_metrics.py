@@ -0,0 +1,246 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+# Endpoint label for Firestore calls made outside any request (sweeper, outbox, startup)
+BACKGROUND = 'background'
+
+# WSGI environ key holding the request's summary; gunicorn logs it via %({firestore.summary}e)s
+SUMMARY_ENVIRON_KEY = 'firestore.summary'
+
+RPC_SECONDS = Histogram(
+    'firestore_rpc_duration_seconds',
+    'Firestore API call latency (streamed calls until the stream is consumed)',
+    ['endpoint', 'rpc'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+DOCUMENT_READS = Counter(
+    'firestore_document_reads',
+    'Documents read from Firestore (gets, query results, aggregations); approximates billed reads',
+    ['endpoint'])
+DOCUMENT_WRITES = Counter(
+    'firestore_document_writes',
+    'Document writes committed to Firestore',
+    ['endpoint'])
+QUERIES = Counter(
+    'firestore_queries',
+    'Firestore queries and aggregation queries run',
+    ['endpoint'])
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling a request in the app',
+    ['endpoint', 'method'])
+REQUEST_READS = Histogram(
+    'firestore_reads_per_request',
+    'Firestore document reads made by a single request',
+    ['endpoint'],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000))
+
+_current = contextvars.ContextVar('firestore_request_tally', default=None)
+
+
+class RequestTally:
+    """Firestore usage of one request (pool threads working for it add to it too)"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.reads = 0
+        self.writes = 0
+        self.queries = 0
+        self.rpcs = 0
+        self.rpc_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds, reads=0, writes=0, queries=0):
+        with self._lock:
+            self.rpcs += 1
+            self.rpc_seconds += seconds
+            self.reads += reads
+            self.writes += writes
+            self.queries += queries
+
+    def summary(self):
+        """One-line summary for the access log"""
+        return (f"reads={self.reads} writes={self.writes} queries={self.queries} "
+                f"rpcs={self.rpcs} rpc_ms={self.rpc_seconds * 1000:.1f}")
+
+
+def _record(tally, rpc, seconds, reads=0, writes=0, queries=0):
+    endpoint = tally.endpoint if tally is not None else BACKGROUND
+    RPC_SECONDS.labels(endpoint, rpc).observe(seconds)
+    if reads:
+        DOCUMENT_READS.labels(endpoint).inc(reads)
+    if writes:
+        DOCUMENT_WRITES.labels(endpoint).inc(writes)
+    if queries:
+        QUERIES.labels(endpoint).inc(queries)
+    if tally is not None:
+        tally.add(seconds, reads=reads, writes=writes, queries=queries)
+
+
+def _batch_get_reads(response):
+    # Found and missing documents are both billed as reads
+    return 1 if type(response).pb(response).WhichOneof('result') else 0
+
+
+def _query_reads(response):
+    return 1 if type(response).pb(response).HasField('document') else 0
+
+
+def _aggregation_reads(response):
+    return 0
+
+
+def _request_writes(args, kwargs):
+    request = kwargs.get('request', args[0] if args else None)
+    if request is None:
+        return 0
+    writes = request.get('writes') if isinstance(request, dict) else getattr(request, 'writes', None)
+    return len(writes or ())
+
+
+# Server-streaming calls: rpc -> (reads in one response, minimum reads billed, is a query)
+STREAMING_RPCS = {
+    'batch_get_documents': (_batch_get_reads, 0, False),
+    'run_query': (_query_reads, 1, True),
+    'run_aggregation_query': (_aggregation_reads, 1, True)
+}
+
+# Unary calls: rpc -> function counting the writes of a successful call
+UNARY_RPCS = {
+    'commit': _request_writes,
+    'batch_write': _request_writes,
+    'update_document': lambda args, kwargs: 1,
+    'delete_document': lambda args, kwargs: 1,
+    'get_document': None,
+    'begin_transaction': None,
+    'rollback': None,
+    'list_documents': None,
+    'list_collection_ids': None
+}
+
+
+def _instrument_stream(rpc, method, count_reads, min_reads, is_query):
+    def consume(responses, tally, started):
+        reads = 0
+        try:
+            for response in responses:
+                reads += count_reads(response)
+                yield response
+        finally:
+            _record(tally, rpc, time.perf_counter() - started,
+                    reads=max(reads, min_reads), queries=1 if is_query else 0)
+
+    @functools.wraps(method)
+    def call(*args, **kwargs):
+        tally = _current.get()
+        started = time.perf_counter()
+        try:
+            responses = method(*args, **kwargs)
+        except Exception:
+            _record(tally, rpc, time.perf_counter() - started)
+            raise
+        return consume(responses, tally, started)
+    return call
+
+
+def _instrument_unary(rpc, method, count_writes):
+    @functools.wraps(method)
+    def call(*args, **kwargs):
+        tally = _current.get()
+        started = time.perf_counter()
+        writes = 0
+        try:
+            result = method(*args, **kwargs)
+            if count_writes is not None:
+                writes = count_writes(args, kwargs)
+            return result
+        finally:
+            _record(tally, rpc, time.perf_counter() - started, reads=1 if rpc == 'get_document' else 0,
+                    writes=writes)
+    return call
+
+
+def instrument_client(client):
+    """
+    Count and time the Firestore RPCs made through a client.
+
+    The wrappers sit on the client's GAPIC layer, which every document get,
+    query, aggregation and commit of the high-level API goes through, so
+    nothing in FirebaseService has to change. Snapshot listeners (live
+    replicas) are not counted.
+
+    Args:
+        client (google.cloud.firestore.Client): Client to instrument (in place)
+
+    Returns:
+        google.cloud.firestore.Client: The same client
+    """
+    api = client._firestore_api
+    if getattr(api, '_metrics_instrumented', False):
+        return client
+    for rpc, (count_reads, min_reads, is_query) in STREAMING_RPCS.items():
+        setattr(api, rpc, _instrument_stream(rpc, getattr(api, rpc), count_reads, min_reads, is_query))
+    for rpc, count_writes in UNARY_RPCS.items():
+        setattr(api, rpc, _instrument_unary(rpc, getattr(api, rpc), count_writes))
+    api._metrics_instrumented = True
+    return client
+
+
+def bind_to_request(call):
+    """
+    Make call count its Firestore usage towards the current request when it
+    runs on another thread (QueryPool threads don't inherit it)
+    """
+    tally = _current.get()
+    if tally is None:
+        return call
+
+    @functools.wraps(call)
+    def bound(*args, **kwargs):
+        token = _current.set(tally)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return bound
+
+
+def init_app(app):
+    """Track each request's Firestore usage and publish it to the metrics and access log"""
+    from flask import request
+
+    @app.before_request
+    def start_request_tally():
+        _current.set(RequestTally(request.endpoint or 'unmatched'))
+
+    @app.teardown_request
+    def finish_request_tally(exc):
+        tally = _current.get()
+        if tally is None:
+            return
+        _current.set(None)
+        REQUEST_SECONDS.labels(tally.endpoint, request.method).observe(time.perf_counter() - tally.started)
+        REQUEST_READS.labels(tally.endpoint).observe(tally.reads)
+        request.environ[SUMMARY_ENVIRON_KEY] = tally.summary()
+
+
+def render_metrics():
+    """
+    The metrics in Prometheus text format, summed over all gunicorn workers
+    when PROMETHEUS_MULTIPROC_DIR is set (see gunicorn_config.py)
+
+    Returns:
+        tuple: (body bytes, content type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,175 @@
+import copy
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaDocument:
+    """Read-only document held by a replica (quacks like a Firestore DocumentSnapshot)"""
+
+    exists = True
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        return self._data.get(field)
+
+
+class CollectionReplica:
+    """
+    In-memory copy of a small Firestore collection maintained by a real-time
+    snapshot listener.
+
+    The replica is not `ready` until the listener has delivered its first
+    snapshot; callers should fall back to direct queries until then. If the
+    listener stops (the Firestore watch gives up after an error), the replica
+    stops being ready and reattaches the listener, at most once every
+    RESTART_INTERVAL seconds.
+    """
+
+    # Seconds between attempts to reattach a listener that has stopped
+    RESTART_INTERVAL = 30
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._watch = None
+        self._last_restart = None
+
+    @property
+    def ready(self):
+        watch = self._watch
+        if watch is not None and not getattr(watch, 'is_active', True):
+            self._restart()
+        return self._ready.is_set()
+
+    def start(self):
+        """Attach the snapshot listener to the source"""
+        if self._watch is None:
+            logger.debug("Starting live replica for %s", self.name)
+            self._watch = self.source.on_snapshot(self._on_snapshot)
+        return self
+
+    def stop(self):
+        """Detach the listener; the replica stops answering until restarted"""
+        self._ready.clear()
+        if self._watch is not None:
+            try:
+                self._watch.unsubscribe()
+            except Exception as e:
+                logger.warning("Failed to stop live replica for %s: %s", self.name, e)
+            self._watch = None
+
+    def _restart(self):
+        """Stop answering from a replica whose listener has stopped, and reattach it"""
+        with self._restart_lock:
+            watch = self._watch
+            if watch is None or getattr(watch, 'is_active', True):
+                return
+            # Reads fall back to Firestore until the new listener delivers a full snapshot
+            self._ready.clear()
+            now = time.monotonic()
+            if self._last_restart is not None and now - self._last_restart < self.RESTART_INTERVAL:
+                return
+            self._last_restart = now
+
+            logger.warning("Live replica listener for %s stopped, restarting it", self.name)
+            try:
+                watch.unsubscribe()
+            except Exception:
+                pass
+            try:
+                self._watch = self.source.on_snapshot(self._on_snapshot)
+            except Exception as e:
+                logger.error("Failed to restart live replica for %s: %s", self.name, e)
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the first snapshot has arrived (or the timeout passes)"""
+        return self._ready.wait(timeout)
+
+    def _on_snapshot(self, docs, changes, read_time):
+        # Every snapshot carries the full result set, so rebuild rather than patch
+        documents = {}
+        for doc in docs:
+            data = doc.to_dict()
+            if data is not None:
+                documents[doc.id] = ReplicaDocument(doc.id, data)
+        with self._lock:
+            self._documents = documents
+        if not self._ready.is_set():
+            logger.debug("Live replica for %s is ready with %s documents", self.name, len(documents))
+            self._ready.set()
+
+    def documents(self):
+        """All documents in the replica"""
+        with self._lock:
+            return list(self._documents.values())
+
+    def get(self, doc_id):
+        """A single document, or None if it does not exist"""
+        with self._lock:
+            return self._documents.get(str(doc_id))
+
+    def where(self, field, value):
+        """Documents whose `field` equals `value`"""
+        return [doc for doc in self.documents() if doc.get(field) == value]
+
+
+class FakeListenerSource:
+    """
+    Stand-in for a Firestore collection reference, for tests and local runs.
+
+    Documents pushed with set()/delete() are delivered to the listener
+    synchronously, the same way a snapshot callback would be. fail() stops
+    every listener, like a Firestore watch that gives up after an error.
+    """
+
+    def __init__(self, documents=None):
+        self._documents = dict(documents or {})
+        self._callbacks = []
+
+    def on_snapshot(self, callback):
+        self._callbacks.append(callback)
+        self._notify()
+        return _FakeWatch(self, callback)
+
+    def set(self, doc_id, data):
+        self._documents[doc_id] = dict(data)
+        self._notify()
+
+    def delete(self, doc_id):
+        self._documents.pop(doc_id, None)
+        self._notify()
+
+    def fail(self):
+        self._callbacks.clear()
+
+    def _notify(self):
+        docs = [ReplicaDocument(doc_id, data) for doc_id, data in self._documents.items()]
+        for callback in list(self._callbacks):
+            callback(docs, [], None)
+
+
+class _FakeWatch:
+    def __init__(self, source, callback):
+        self._source = source
+        self._callback = callback
+
+    @property
+    def is_active(self):
+        return self._callback in self._source._callbacks
+
+    def unsubscribe(self):
+        if self._callback in self._source._callbacks:
+            self._source._callbacks.remove(self._callback)
@@ -0,0 +1,143 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from app.utils.lazy_import import lazy_import
+
+logger = logging.getLogger(__name__)
+
+firestore = lazy_import('firebase_admin.firestore')
+
+
+class NotificationOutbox:
+    """
+    In-process outbox for notification documents.
+
+    Requests enqueue notifications and return straight away; a background
+    worker writes them to Firestore in batched commits, retrying failed
+    batches with exponential backoff. Whatever is still queued when the
+    process exits is flushed by an atexit hook.
+
+    In synchronous mode (used by tests and one-off scripts) every
+    notification is written before enqueue() returns.
+    """
+
+    # Firestore accepts at most 500 writes per batch
+    MAX_BATCH_SIZE = 500
+
+    def __init__(self, get_db, collection='notifications', max_size=1000, batch_size=100,
+                 flush_interval=1.0, max_retries=5, retry_backoff=0.5, sync=False):
+        self._get_db = get_db
+        self.collection = collection
+        self.batch_size = max(1, min(batch_size, self.MAX_BATCH_SIZE))
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.sync = sync
+        self._queue = queue.Queue(maxsize=max_size)
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._worker = None
+        self._exit_hook_registered = False
+
+    def enqueue(self, notification):
+        """Queue a notification document for writing"""
+        if self.sync:
+            self._write_with_retry([notification])
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(notification)
+        except queue.Full:
+            # Never drop a notification: write it on the caller's thread instead
+            logger.warning("Notification outbox is full, writing notification synchronously")
+            self._write_with_retry([notification])
+
+    def pending(self):
+        """Number of notifications waiting to be written"""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Write everything queued so far on the calling thread"""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            self._write_batch(batch)
+        # Wait for batches the worker has taken off the queue but not written yet
+        self._queue.join()
+
+    def close(self):
+        """Stop the worker and flush whatever is left"""
+        self._stopping.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            worker.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name='notification-outbox', daemon=True)
+            self._worker.start()
+            if not self._exit_hook_registered:
+                atexit.register(self.close)
+                self._exit_hook_registered = True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write_batch([first] + self._drain(self.batch_size - 1))
+
+    def _drain(self, limit):
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _write_batch(self, batch):
+        """Write notifications taken off the queue and mark them done, even if they are dropped"""
+        try:
+            self._write_with_retry(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_with_retry(self, notifications):
+        for attempt in range(self.max_retries + 1):
+            try:
+                # Held for the commit only, never across a backoff sleep
+                with self._write_lock:
+                    self._write(notifications)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error("Dropping %s notifications after %s attempts: %s", len(notifications), attempt + 1, e)
+                    return False
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning("Failed to write notifications (%s), retrying in %.1fs", e, delay)
+                time.sleep(delay)
+
+    def _write(self, notifications):
+        db = self._get_db()
+        batch = db.batch()
+        for notification in notifications:
+            batch.set(db.collection(self.collection).document(), {
+                **notification,
+                'created_at': firestore.SERVER_TIMESTAMP
+            })
+        batch.commit()
@@ -0,0 +1,82 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from app.services.firestore_metrics import bind_to_request
+
+logger = logging.getLogger(__name__)
+
+
+class QueryPool:
+    """
+    Bounded thread pool for running independent backend reads side by side.
+
+    Page handlers that need several unrelated reads submit them together and
+    wait for the slowest one instead of the sum of all of them. Each call has
+    a deadline; a call that misses it (or raises) yields its default value so
+    one slow query degrades a section of the page rather than the request.
+
+    Calls run on pool threads without the Flask request context, so they must
+    get everything they need (user IDs etc.) as arguments.
+    """
+
+    def __init__(self, max_workers=8, timeout=5.0):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # A forked worker inherits the parent's executor object but not its threads
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='query-pool')
+                    self._pid = os.getpid()
+        return self._executor
+
+    def run(self, calls, defaults=None, timeout=None):
+        """
+        Run independent calls concurrently
+
+        Args:
+            calls (dict): Name -> zero-argument callable
+            defaults (dict): Name -> value returned when that call fails or times out
+                (None if not given)
+            timeout (float or dict): Seconds each call may take, either one value for
+                all calls or a name -> seconds dict (falls back to the pool timeout)
+
+        Returns:
+            dict: Name -> result
+        """
+        defaults = defaults or {}
+        started = time.monotonic()
+        executor = self._get_executor()
+        futures = {name: executor.submit(bind_to_request(call)) for name, call in calls.items()}
+
+        results = {}
+        for name, future in futures.items():
+            limit = timeout.get(name, self.timeout) if isinstance(timeout, dict) else (timeout or self.timeout)
+            remaining = max(0.0, started + limit - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                logger.warning("Parallel query '%s' timed out after %ss", name, limit)
+                results[name] = defaults.get(name)
+            except Exception as e:
+                logger.error("Parallel query '%s' failed: %s", name, e)
+                results[name] = defaults.get(name)
+        return results
+
+    def shutdown(self):
+        """Stop the pool threads (pending calls are cancelled)"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
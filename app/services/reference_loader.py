@@ -0,0 +1,66 @@
+class ReferenceLoader:
+    """
+    Collects document references from a result set and resolves them with one
+    batched multi-document fetch per collection instead of one read per row.
+
+    Usage:
+        loader = ReferenceLoader(db)
+        loader.add_many(bookings, 'student_id', 'users')
+        loader.add_many(bookings, 'module_code', 'modules')
+        loader.load()
+        student = loader.get('users', booking['student_id'])
+    """
+
+    # Number of references sent in a single get_all call
+    BATCH_SIZE = 100
+
+    def __init__(self, db):
+        self.db = db
+        self._pending = {}
+        self._loaded = {}
+
+    def add(self, collection, doc_id):
+        """Queue a single document for loading (duplicates and empty IDs are ignored)"""
+        if not doc_id:
+            return
+        doc_id = str(doc_id)
+        if doc_id in self._loaded.get(collection, {}):
+            return
+        self._pending.setdefault(collection, set()).add(doc_id)
+
+    def add_many(self, records, field, collection):
+        """Queue the documents referenced by `field` in each record"""
+        for record in records:
+            self.add(collection, record.get(field))
+
+    def prime(self, collection, doc_id, data):
+        """Seed the loader with a document that is already known, skipping its fetch"""
+        self._loaded.setdefault(collection, {})[str(doc_id)] = data
+        self._pending.get(collection, set()).discard(str(doc_id))
+
+    def load(self):
+        """Fetch every pending reference, one batched request per collection and chunk"""
+        for collection, doc_ids in self._pending.items():
+            loaded = self._loaded.setdefault(collection, {})
+            doc_ids = sorted(doc_ids)
+            for start in range(0, len(doc_ids), self.BATCH_SIZE):
+                chunk = doc_ids[start:start + self.BATCH_SIZE]
+                refs = [self.db.collection(collection).document(doc_id) for doc_id in chunk]
+                for snapshot in self.db.get_all(refs):
+                    loaded[snapshot.id] = snapshot.to_dict() if snapshot.exists else None
+                # Remember misses so they are not requested again
+                for doc_id in chunk:
+                    loaded.setdefault(doc_id, None)
+        self._pending = {}
+        return self
+
+    def loaded(self, collection):
+        """Return {doc_id: data} for every document loaded from a collection (None for misses)"""
+        return dict(self._loaded.get(collection, {}))
+
+    def get(self, collection, doc_id, default=None):
+        """Return the loaded document data, or `default` if it does not exist"""
+        if not doc_id:
+            return default
+        data = self._loaded.get(collection, {}).get(str(doc_id))
+        return data if data is not None else default
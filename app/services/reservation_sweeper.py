@@ -0,0 +1,91 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.utils.lazy_import import lazy_import
+
+logger = logging.getLogger(__name__)
+
+firestore = lazy_import('firebase_admin.firestore')
+
+LEASE_COLLECTION = 'scheduler_leases'
+
+
+class ReservationSweeper:
+    """
+    Background thread that expires stale reservations on an interval.
+
+    Every gunicorn worker may start a sweeper, but each run first takes a
+    lease document in Firestore; only the worker holding an unexpired lease
+    sweeps, so there is a single active sweeper across the deployment. The
+    lease outlives the interval, so a crashed leader is replaced after at
+    most one missed run.
+    """
+
+    LEASE_NAME = 'reservation_sweeper'
+
+    def __init__(self, service, interval=300, page_size=400, lease_seconds=None):
+        self.service = service
+        self.interval = interval
+        self.page_size = page_size
+        self.lease_seconds = lease_seconds or interval * 2
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sweeper thread (no-op if it is already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='reservation-sweeper', daemon=True)
+        self._thread.start()
+        logger.debug("Reservation sweeper started every %ss as %s", self.interval, self.holder_id)
+        return self
+
+    def stop(self):
+        """Stop the sweeper thread"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self):
+        """Sweep once if this process holds the lease; returns the sweep report or None"""
+        try:
+            if not self.acquire_lease():
+                return None
+            report = self.service.expire_reservations(page_size=self.page_size)
+            if report:
+                logger.info("Reservation sweep expired %s reservations in %sms",
+                            report.get('expired'), report.get('duration_ms'))
+            return report
+        except Exception as e:
+            logger.error("Reservation sweep failed: %s", e)
+            return None
+
+    def acquire_lease(self):
+        """Take or renew the sweeper lease; returns True if this process is the leader"""
+        db = self.service.db
+        lease_ref = db.collection(LEASE_COLLECTION).document(self.LEASE_NAME)
+
+        @firestore.transactional
+        def claim(transaction):
+            now = datetime.now(timezone.utc)
+            snapshot = lease_ref.get(transaction=transaction)
+            lease = (snapshot.to_dict() or {}) if snapshot.exists else {}
+            expires_at = lease.get('expires_at')
+            if lease.get('holder') not in (None, self.holder_id) and expires_at and expires_at > now:
+                return False
+            transaction.set(lease_ref, {
+                'holder': self.holder_id,
+                'expires_at': now + timedelta(seconds=self.lease_seconds),
+                'renewed_at': now
+            })
+            return True
+
+        return claim(db.transaction())
@@ -0,0 +1,68 @@
+"""
+Per-tutor, per-day slot occupancy index.
+
+Each `tutor_occupancy/{tutor_id}_{date}` document holds a `slots_mask`
+integer in which bit i is set when TIME_SLOTS[i] is taken by an active
+session, so a tutor's availability for a day is a single document read.
+
+Each active session also owns a `slot_locks/{tutor_id}_{date}_{HHMM}`
+document. Bookings claim it inside the same transaction that writes the
+session, so two students can never end up holding the same slot.
+"""
+
+OCCUPANCY_COLLECTION = 'tutor_occupancy'
+LOCK_COLLECTION = 'slot_locks'
+
+# Bookable slots, in bit order
+TIME_SLOTS = [
+    "09:00 - 10:00",
+    "10:00 - 11:00",
+    "11:00 - 12:00",
+    "12:00 - 13:00",
+    "13:00 - 14:00",
+    "14:00 - 15:00",
+    "15:00 - 16:00"
+]
+
+# Session statuses that hold on to their slot (compared lowercase)
+OCCUPYING_STATUSES = {'pending', 'confirmed', 'scheduled', 'completed'}
+
+
+def occupancy_doc_id(tutor_id, date_str):
+    """Document ID of the occupancy entry for a tutor on a date (YYYY-MM-DD)"""
+    return f"{tutor_id}_{date_str}"
+
+
+def slot_lock_id(tutor_id, date_str, start_time):
+    """Document ID of the lock for a tutor's slot starting at start_time (HH:MM)"""
+    return f"{tutor_id}_{date_str}_{str(start_time).replace(':', '')}"
+
+
+def occupies_slot(status):
+    """Whether a session with this status keeps its slot booked"""
+    return (status or '').lower() in OCCUPYING_STATUSES
+
+
+def slot_bit(start_time, end_time):
+    """Bit for a slot given its start/end times, or 0 for a non-standard slot"""
+    try:
+        return 1 << TIME_SLOTS.index(f"{start_time} - {end_time}")
+    except ValueError:
+        return 0
+
+
+def session_bit(session_data):
+    """Bit a session occupies, or 0 if it doesn't hold a standard slot"""
+    if not occupies_slot(session_data.get('status')):
+        return 0
+    return slot_bit(session_data.get('start_time'), session_data.get('end_time'))
+
+
+def available_slots(slots_mask):
+    """Time slots that are free in an occupancy mask"""
+    return [slot for i, slot in enumerate(TIME_SLOTS) if not slots_mask & (1 << i)]
+
+
+def booked_slots(slots_mask):
+    """Time slots that are taken in an occupancy mask"""
+    return [slot for i, slot in enumerate(TIME_SLOTS) if slots_mask & (1 << i)]
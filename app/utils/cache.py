@@ -0,0 +1,107 @@
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, has_request_context
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry and LRU eviction.
+
+    A cached value of None is a valid entry, which lets callers cache negative
+    lookups. Use `TTLCache.MISS` to tell a miss apart from a cached None.
+    """
+
+    MISS = object()
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or TTLCache.MISS if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self.MISS
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return self.MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key for ttl seconds (defaults to the cache TTL)"""
+        if ttl is None:
+            ttl = self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def request_memoized(func):
+    """
+    Memoize a read method for the rest of the current request.
+
+    Results are kept on `flask.g`, keyed on the method and its arguments, and
+    handed out as copies so callers can modify them freely. Outside a request,
+    or with unhashable arguments, the method is simply called.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not has_request_context():
+            return func(self, *args, **kwargs)
+        try:
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return func(self, *args, **kwargs)
+
+        memo = g.setdefault('_request_memo', {})
+        if key in memo:
+            return copy.deepcopy(memo[key])
+        result = func(self, *args, **kwargs)
+        memo[key] = copy.deepcopy(result)
+        return result
+    return wrapper
+
+
+def invalidates_request_memo(func):
+    """Mark a write method: anything memoized in this request is forgotten once it runs"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            clear_request_memo()
+    return wrapper
+
+
+def clear_request_memo():
+    """Forget every result memoized in the current request"""
+    if has_request_context():
+        g.pop('_request_memo', None)
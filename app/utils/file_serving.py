@@ -0,0 +1,63 @@
+from urllib.parse import quote
+
+from flask import Response, current_app, send_file
+
+
+def serve_blob(blob_store, key, mimetype=None, download_name=None, as_attachment=False,
+               etag=None, max_age=3600):
+    """
+    Build the response for a file held in a blob store.
+
+    With BLOB_ACCEL_REDIRECT_PREFIX configured, the response only carries an
+    X-Accel-Redirect header and the front proxy (nginx) streams the file
+    itself, so no worker is tied up for the transfer. Otherwise the file is
+    sent from disk by path: Werkzeug answers Range and conditional
+    (If-None-Match / If-Modified-Since) requests, and the WSGI file wrapper
+    lets gunicorn use sendfile() instead of copying through Python.
+
+    Args:
+        blob_store: The blob store holding the file
+        key (str): Blob key (its SHA-256)
+        mimetype (str, optional): Content type to send
+        download_name (str, optional): File name offered to the browser
+        as_attachment (bool): Ask the browser to download rather than display
+        etag (str, optional): ETag value; defaults to the blob key
+        max_age (int): Cache-Control max-age in seconds
+
+    Returns:
+        flask.Response
+    """
+    mimetype = mimetype or 'application/octet-stream'
+    etag = etag or key
+
+    accel_prefix = current_app.config.get('BLOB_ACCEL_REDIRECT_PREFIX')
+    relative_path = blob_store.relative_path(key) if accel_prefix else None
+    if relative_path:
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + relative_path
+        disposition = 'attachment' if as_attachment else 'inline'
+        if download_name:
+            disposition += f"; filename*=UTF-8''{quote(download_name)}"
+        response.headers['Content-Disposition'] = disposition
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.max_age = max_age
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        return response
+
+    path = blob_store.local_path(key)
+    response = send_file(
+        path if path else blob_store.open(key),
+        mimetype=mimetype,
+        download_name=download_name,
+        as_attachment=as_attachment,
+        conditional=True,
+        etag=etag,
+        max_age=max_age
+    )
+    # Downloads sit behind login, so keep them out of shared caches
+    response.cache_control.public = False
+    response.cache_control.private = True
+    # Never let the browser second-guess the content type of an uploaded file
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
@@ -0,0 +1,38 @@
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Return a module that is only loaded when one of its attributes is first used.
+
+    Heavy client libraries (the Firestore SDK pulls in gRPC and protobuf) can be
+    imported this way at the top of a module without slowing down app start-up;
+    the cost moves to the first request that actually talks to the backend.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # Make `package.name` resolve like a regular submodule import would
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def load_now(*names):
+    """Force lazily imported modules to load (e.g. in a preloading parent process)"""
+    for name in names:
+        # Any attribute access runs a lazily loaded module's code
+        dir(importlib.import_module(name))
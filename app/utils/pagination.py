@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(values):
+    """
+    Turn the sort-key values of a boundary document into an opaque,
+    URL-safe page cursor. Datetimes survive the round trip.
+    """
+    payload = {}
+    for key, value in values.items():
+        if isinstance(value, datetime):
+            payload[key] = {'$dt': value.isoformat()}
+        else:
+            payload[key] = value
+    raw = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor; returns None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw.decode('utf-8'))
+        if not isinstance(payload, dict):
+            return None
+        values = {}
+        for key, value in payload.items():
+            if isinstance(value, dict) and '$dt' in value:
+                value = datetime.fromisoformat(value['$dt'])
+            values[key] = value
+        return values
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
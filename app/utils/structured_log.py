@@ -0,0 +1,148 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+# Everything the app logs goes through loggers below this one (module loggers
+# are named after their module; Flask's app.logger is this logger itself)
+APP_LOGGER = 'app'
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s'
+
+_handler = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, process, thread, extras"""
+
+    # Attributes every LogRecord has; anything else was passed via `extra=`
+    RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in self.RESERVED)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Let through a fraction of DEBUG records; INFO and above always pass"""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class BackgroundLogHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a background thread that formats and writes them.
+
+    The logging call only interpolates the message and puts the record on a
+    bounded queue; formatting (tracebacks included) and the stream write
+    happen on the listener thread. When the queue is full records are
+    dropped and counted rather than blocking the request.
+
+    Like the other background workers, the listener thread is started on
+    first use in each process, so a forked gunicorn worker gets its own.
+    """
+
+    def __init__(self, target, max_size=10000):
+        super().__init__(queue.Queue(maxsize=max_size))
+        self.target = target
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child inherits the queue (and possibly its held lock) but not the thread
+            self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self._listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Interpolate now, while the arguments still hold the values being logged;
+        # exc_info is left for the listener thread to format
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Stop the listener after it has written everything queued (logging.shutdown calls this at exit)"""
+        with self._start_lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._pid = None
+        if self.dropped:
+            self.target.handle(logging.makeLogRecord({
+                'name': APP_LOGGER, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': 'Dropped %s log records because the log queue was full', 'args': (self.dropped,)
+            }))
+            self.dropped = 0
+        super().close()
+
+
+def configure_logging(config):
+    """
+    Route the app's log records through a BackgroundLogHandler writing to stdout
+
+    Args:
+        config (dict): The app's config (LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE,
+            LOG_QUEUE_SIZE)
+
+    Returns:
+        BackgroundLogHandler: The handler (one per process tree; later calls only
+            update the level)
+    """
+    global _handler
+    logger = logging.getLogger(APP_LOGGER)
+    with _configure_lock:
+        if _handler is None:
+            stream = logging.StreamHandler(sys.stdout)
+            if config.get('LOG_FORMAT', 'json') == 'json':
+                stream.setFormatter(JsonFormatter())
+            else:
+                stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+            _handler = BackgroundLogHandler(stream, max_size=config.get('LOG_QUEUE_SIZE', 10000))
+            _handler.addFilter(DebugSampler(config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)))
+            logger.addHandler(_handler)
+            logger.propagate = False
+
+    logger.setLevel(config.get('LOG_LEVEL', 'INFO'))
+    return _handler
@@ -16,6 +16,85 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'ppt', 'pptx', 'txt', 'zip', 'rar', 'jpg', 'jpeg', 'png'}
     
+    # Module catalog cache (seconds / entries); modules change a few times a semester
+    MODULE_CACHE_TTL = int(os.environ.get('MODULE_CACHE_TTL', 300))
+    MODULE_CACHE_NEGATIVE_TTL = int(os.environ.get('MODULE_CACHE_NEGATIVE_TTL', 60))
+    MODULE_CACHE_MAX_ENTRIES = int(os.environ.get('MODULE_CACHE_MAX_ENTRIES', 1024))
+    
+    # Admin dashboard statistics cache (seconds)
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 60))
+    
+    # Tutor/module assignment eligibility cache for the admin assignment pages (seconds)
+    ELIGIBILITY_CACHE_TTL = int(os.environ.get('ELIGIBILITY_CACHE_TTL', 30))
+    
+    # Logged-in user lookups cached per worker (seconds / entries). Changes made through
+    # FirebaseService invalidate the entry in that worker; other workers see them within the TTL,
+    # or as soon as the user's sessions are revoked while LIVE_REPLICA_ENABLED is on.
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 4096))
+    
+    # Carry the user's name, role and verification in the signed session cookie so most
+    # requests need no user lookup at all; claims are re-read after SESSION_CLAIMS_MAX_AGE seconds.
+    # Every request checks them against the user's revocation version in the session_revocations
+    # replica, so this needs LIVE_REPLICA_ENABLED; without it claims are never trusted.
+    SESSION_USER_CLAIMS = os.environ.get('SESSION_USER_CLAIMS', 'False').lower() == 'true'
+    SESSION_CLAIMS_MAX_AGE = int(os.environ.get('SESSION_CLAIMS_MAX_AGE', 300))
+    
+    # Application logging: level, 'json' or 'text' lines on stdout, the fraction of DEBUG
+    # records kept, and how many records may wait for the background writer before new ones are dropped
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json').lower()
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    
+    # Serve modules/module_tutors from listener-backed in-memory replicas
+    LIVE_REPLICA_ENABLED = os.environ.get('LIVE_REPLICA_ENABLED', 'False').lower() == 'true'
+    
+    # Notification outbox: notifications are written by a background worker in batches.
+    # Set NOTIFICATION_OUTBOX_SYNC=true (e.g. in tests) to write them inline instead.
+    NOTIFICATION_OUTBOX_SYNC = os.environ.get('NOTIFICATION_OUTBOX_SYNC', 'False').lower() == 'true'
+    NOTIFICATION_OUTBOX_MAX_SIZE = int(os.environ.get('NOTIFICATION_OUTBOX_MAX_SIZE', 1000))
+    NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.environ.get('NOTIFICATION_OUTBOX_BATCH_SIZE', 100))
+    NOTIFICATION_OUTBOX_FLUSH_INTERVAL = float(os.environ.get('NOTIFICATION_OUTBOX_FLUSH_INTERVAL', 1.0))
+    NOTIFICATION_OUTBOX_MAX_RETRIES = int(os.environ.get('NOTIFICATION_OUTBOX_MAX_RETRIES', 5))
+    
+    # Expire stale reservations from a background thread (one leader across workers)
+    RESERVATION_SWEEPER_ENABLED = os.environ.get('RESERVATION_SWEEPER_ENABLED', 'False').lower() == 'true'
+    RESERVATION_SWEEP_INTERVAL = int(os.environ.get('RESERVATION_SWEEP_INTERVAL', 300))
+    RESERVATION_SWEEP_PAGE_SIZE = int(os.environ.get('RESERVATION_SWEEP_PAGE_SIZE', 400))
+    
+    # Storage for uploaded files (tutor application documents, learning content); only metadata
+    # goes to Firestore. The local backend's directory must survive restarts and deploys, so in
+    # production (FLASK_ENV=production) BLOB_STORE_PATH has to be set explicitly, e.g. to a
+    # persistent disk mount; the app refuses to start otherwise.
+    BLOB_STORE_BACKEND = os.environ.get('BLOB_STORE_BACKEND', 'local')
+    BLOB_STORE_PATH = os.environ.get('BLOB_STORE_PATH') or (
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'blobs')
+        if os.environ.get('FLASK_ENV', 'development') != 'production' else None)
+    
+    # SQLite full-text index for learning content search. It defaults to the directory holding
+    # the blob store (the persistent disk in production) so it survives deploys; a missing index
+    # is built from Firestore when a worker starts (see start_background_services).
+    CONTENT_SEARCH_INDEX_PATH = os.environ.get('CONTENT_SEARCH_INDEX_PATH') or (
+        os.path.join(os.path.dirname(BLOB_STORE_PATH.rstrip('/\\')), 'content_search.db')
+        if BLOB_STORE_PATH else None)
+    
+    # Internal nginx location mapped to BLOB_STORE_PATH (e.g. '/_blobs/'). When set, file
+    # downloads are handed to the proxy with X-Accel-Redirect instead of streamed by the app.
+    BLOB_ACCEL_REDIRECT_PREFIX = os.environ.get('BLOB_ACCEL_REDIRECT_PREFIX', '')
+    
+    # Thread pool for independent dashboard reads run side by side (threads per worker
+    # process) and the seconds each read may take before its section falls back to empty
+    QUERY_POOL_WORKERS = int(os.environ.get('QUERY_POOL_WORKERS', 8))
+    QUERY_TIMEOUT = float(os.environ.get('QUERY_TIMEOUT', 5.0))
+    
+    # Bearer token required to scrape /metrics (the endpoint answers 404 while it is unset)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Start background threads (live replica, reservation sweeper) from gunicorn's post_fork
+    # hook instead of create_app, because a preloading master must not own any threads
+    DEFER_BACKGROUND_SERVICES = os.environ.get('DEFER_BACKGROUND_SERVICES', 'False').lower() == 'true'
+    
     # Debug mode - disable in production
     DEBUG = os.environ.get('FLASK_ENV', 'development') != 'production'
     
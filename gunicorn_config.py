@@ -1,4 +1,8 @@
+import gc
 import multiprocessing
+import os
+import shutil
+import tempfile
 
 # Gunicorn configuration for production deployment
 
@@ -20,13 +24,71 @@ loglevel = "info"
 accesslog = "-"  # Log to stdout
 errorlog = "-"   # Log errors to stdout
 
+# Standard combined format plus the request's time and Firestore usage (set by app.services.firestore_metrics)
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(M)sms firestore[%({firestore.summary}e)s]'
+
+# Prometheus metrics of all workers are kept in files here and summed on each /metrics scrape
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'tutor-booking-metrics'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
 # Worker options
+# Flask async views would still hold a worker thread for the whole request, so
+# independent Firestore reads are overlapped with FirebaseService.run_parallel instead
 worker_class = "sync"
 
+# Import the app once in the master and fork workers from it, so code, compiled
+# templates and other read-only state are shared copy-on-write. Firestore clients
+# (gRPC channels) and background threads are created in each worker after the fork.
+preload_app = True
+os.environ.setdefault('DEFER_BACKGROUND_SERVICES', 'true')
+
+# Send file downloads with sendfile() (zero-copy) via the WSGI file wrapper
+sendfile = True
+
 # Make sure server is accessible from anywhere
 forwarded_allow_ips = "*"
 
 # Access control
 limit_request_line = 0
 limit_request_fields = 100
-limit_request_field_size = 8190 
\ No newline at end of file
+limit_request_field_size = 8190 
+
+
+def on_starting(server):
+    """Runs in the master on startup: drop the metric files of a previous run"""
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    """Runs in the master after the app is preloaded, just before the first fork"""
+    if not server.cfg.preload_app:
+        return
+
+    from app import preload
+    from app.services.firebase_client import client_created
+
+    preload(server.app.wsgi())
+    if client_created():
+        server.log.warning("Firestore client was created in the gunicorn master; "
+                           "workers will open their own, the master's is wasted")
+
+    # Move everything allocated so far out of the collector's reach: otherwise the
+    # first collection in each worker touches every object and un-shares its page
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after it is forked"""
+    from app import start_background_services
+
+    start_background_services(server.app.wsgi().config)
+
+
+def child_exit(server, worker):
+    """Runs in the master when a worker exits: fold its live metrics into the totals"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
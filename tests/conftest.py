@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import firebase_service, notification_outbox  # noqa: E402
+from app.services.firebase_service import FirebaseService  # noqa: E402
+from app.services.notification_outbox import NotificationOutbox  # noqa: E402
+from fake_firestore import FakeFirestore, firestore_module  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """An empty in-memory Firestore, used in place of the real client"""
+    db = FakeFirestore()
+    monkeypatch.setattr(firebase_service, 'get_db', lambda: db)
+    monkeypatch.setattr(firebase_service, 'firestore', firestore_module)
+    monkeypatch.setattr(notification_outbox, 'firestore', firestore_module)
+    return db
+
+
+@pytest.fixture
+def service(db, monkeypatch):
+    """A FirebaseService backed by `db`, writing notifications synchronously"""
+    monkeypatch.setattr(FirebaseService, '_instance', None)
+    monkeypatch.setattr(FirebaseService, '_initialized', True)
+    monkeypatch.setattr(FirebaseService, '_outbox', NotificationOutbox(lambda: db, sync=True))
+    return FirebaseService()
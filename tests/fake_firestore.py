@@ -0,0 +1,303 @@
+"""
+In-memory stand-in for the parts of the Firestore client FirebaseService uses
+in the tests: document get/set/update/delete, auto IDs, get_all, queries
+(where/order_by/start_after/limit/count), batches and optimistic transactions.
+
+Transactions buffer their writes and check at commit that nothing they read
+has changed since; a conflicting commit raises Aborted and `transactional`
+re-runs the function, like the real client does on contention.
+"""
+import copy
+import itertools
+import threading
+import types
+
+
+class Aborted(Exception):
+    """A transaction's reads went stale before it committed"""
+
+
+class _Sentinel:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+# Stored as-is, so tests can check a field was set to the server time
+SERVER_TIMESTAMP = _Sentinel('SERVER_TIMESTAMP')
+
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+
+def _merge(existing, data):
+    merged = dict(existing or {})
+    for field, value in copy.deepcopy(data).items():
+        if isinstance(value, Increment):
+            value = (merged.get(field) or 0) + value.value
+        merged[field] = value
+    return merged
+
+
+def transactional(func, max_attempts=5):
+    def run(transaction, *args, **kwargs):
+        for attempt in range(max_attempts):
+            transaction.begin()
+            result = func(transaction, *args, **kwargs)
+            try:
+                transaction.commit()
+                return result
+            except Aborted:
+                if attempt == max_attempts - 1:
+                    raise
+    return run
+
+
+# Replacement for the `firestore` module attribute of the modules under test
+firestore_module = types.SimpleNamespace(
+    transactional=transactional,
+    SERVER_TIMESTAMP=SERVER_TIMESTAMP,
+    Increment=Increment,
+    Query=types.SimpleNamespace(ASCENDING='ASCENDING', DESCENDING='DESCENDING')
+)
+
+OPERATORS = {
+    '==': lambda value, target: value == target,
+    '!=': lambda value, target: value != target,
+    '<': lambda value, target: value is not None and value < target,
+    '<=': lambda value, target: value is not None and value <= target,
+    '>': lambda value, target: value is not None and value > target,
+    '>=': lambda value, target: value is not None and value >= target,
+    'in': lambda value, target: value in target,
+    'array_contains': lambda value, target: target in (value or [])
+}
+
+
+class DocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class DocumentReference:
+    def __init__(self, db, collection, doc_id):
+        self._db = db
+        self.collection = collection
+        self.id = doc_id
+
+    @property
+    def key(self):
+        return (self.collection, self.id)
+
+    def get(self, field_paths=None, transaction=None):
+        # Projections return whole documents here
+        if transaction is not None:
+            return transaction.read(self)
+        return DocumentSnapshot(self, self._db.read(self.key)[0])
+
+    def set(self, data, merge=False):
+        self._db.apply([('set', self.key, data, merge)])
+
+    def update(self, data):
+        self._db.apply([('update', self.key, data, False)])
+
+    def delete(self):
+        self._db.apply([('delete', self.key, None, False)])
+
+
+class Query:
+    def __init__(self, db, name, filters=(), orders=(), start_after_values=None, limit_to=None):
+        self._db = db
+        self.name = name
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._start_after = start_after_values
+        self._limit = limit_to
+
+    def _copy(self, **changes):
+        state = {'filters': self._filters, 'orders': self._orders,
+                 'start_after_values': self._start_after, 'limit_to': self._limit}
+        state.update(changes)
+        return Query(self._db, self.name, **state)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self._filters + ((field, OPERATORS[op], value),))
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._copy(orders=self._orders + ((field, direction == 'DESCENDING'),))
+
+    def start_after(self, position):
+        """Continue after a document snapshot or a {field: value} dict of the order fields"""
+        if isinstance(position, DocumentSnapshot):
+            values = [position.id if field == '__name__' else position.get(field) for field, _ in self._orders]
+        else:
+            values = [position.get(field) for field, _ in self._orders]
+        return self._copy(start_after_values=values)
+
+    def limit(self, count):
+        return self._copy(limit_to=count)
+
+    def select(self, field_paths):
+        # Projections return whole documents here
+        return self
+
+    def count(self, alias=None):
+        return _AggregationQuery(self, alias, len)
+
+    def sum(self, field, alias=None):
+        def total(snapshots):
+            values = [snapshot.get(field) for snapshot in snapshots]
+            return sum(value for value in values if isinstance(value, (int, float)))
+        return _AggregationQuery(self, alias, total)
+
+    @staticmethod
+    def _value(doc_id, data, field):
+        return doc_id if field == '__name__' else data.get(field)
+
+    def _is_after_start(self, doc_id, data):
+        for (field, descending), start in zip(self._orders, self._start_after):
+            value = self._value(doc_id, data, field)
+            if value != start:
+                return value < start if descending else value > start
+        return False
+
+    def stream(self, transaction=None):
+        rows = [(doc_id, data) for doc_id, data in self._db.data(self.name).items()
+                if all(matches(data.get(field), value) for field, matches, value in self._filters)]
+        for field, descending in reversed(self._orders):
+            rows.sort(key=lambda row: self._value(row[0], row[1], field), reverse=descending)
+        if self._start_after is not None:
+            rows = [row for row in rows if self._is_after_start(*row)]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        for doc_id, data in rows:
+            yield DocumentSnapshot(DocumentReference(self._db, self.name, doc_id), data)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+
+class _AggregationQuery:
+    def __init__(self, query, alias, aggregate):
+        self._query = query
+        self._alias = alias
+        self._aggregate = aggregate
+
+    def get(self):
+        return [[types.SimpleNamespace(alias=self._alias, value=self._aggregate(self._query.get()))]]
+
+
+class CollectionReference(Query):
+    def __init__(self, db, name):
+        super().__init__(db, name)
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            doc_id = f"auto{next(self._db.ids)}"
+        return DocumentReference(self._db, self.name, str(doc_id))
+
+
+class WriteBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(('set', reference.key, data, merge))
+
+    def update(self, reference, data):
+        self._writes.append(('update', reference.key, data, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference.key, None, False))
+
+    def commit(self):
+        self._db.apply(self._writes)
+        self._db.batch_sizes.append(len(self._writes))
+        self._writes = []
+
+
+class Transaction(WriteBatch):
+    def __init__(self, db):
+        super().__init__(db)
+        self._read_versions = {}
+
+    def begin(self):
+        self._writes = []
+        self._read_versions = {}
+
+    def read(self, reference):
+        data, version = self._db.read(reference.key)
+        self._read_versions.setdefault(reference.key, version)
+        return DocumentSnapshot(reference, data)
+
+    def commit(self):
+        self._db.before_commit()
+        self._db.apply(self._writes, self._read_versions)
+        self._writes = []
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.documents = {}
+        self.ids = itertools.count(1)
+        self.batch_sizes = []  # Writes in each committed batch (not transactions)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def before_commit(self):
+        """Called by every transaction just before it commits (tests override it)"""
+
+    def collection(self, name):
+        return CollectionReference(self, name)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self):
+        return Transaction(self)
+
+    def get_all(self, references, transaction=None):
+        for reference in references:
+            yield reference.get(transaction=transaction)
+
+    def data(self, collection):
+        """{doc_id: data} of every document in a collection"""
+        with self._lock:
+            return {doc_id: copy.deepcopy(data) for (name, doc_id), data in self.documents.items()
+                    if name == collection}
+
+    def read(self, key):
+        with self._lock:
+            return copy.deepcopy(self.documents.get(key)), self._versions.get(key, 0)
+
+    def apply(self, writes, read_versions=None):
+        with self._lock:
+            for key, version in (read_versions or {}).items():
+                if self._versions.get(key, 0) != version:
+                    raise Aborted(f"{key} changed during the transaction")
+            for op, key, data, merge in writes:
+                if op == 'update' and key not in self.documents:
+                    raise KeyError(f"No document to update: {key}")
+                if op == 'delete':
+                    self.documents.pop(key, None)
+                elif op == 'update' or merge:
+                    self.documents[key] = _merge(self.documents.get(key), data)
+                else:
+                    self.documents[key] = _merge(None, data)
+                self._versions[key] = self._versions.get(key, 0) + 1
@@ -0,0 +1,79 @@
+import io
+import os
+import threading
+
+import pytest
+
+from app.services.blob_store import LocalBlobStore
+from app.services.firebase_service import FirebaseService
+
+DATA = b'%PDF-1.4 lecture notes'
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path))
+    monkeypatch.setattr(FirebaseService, '_blob_store', store)
+    return store
+
+
+def ref_count(db, key):
+    return db.data('blob_refs').get(key, {}).get('ref_count', 0)
+
+
+def test_identical_uploads_share_one_counted_blob(service, db, store):
+    first = service._store_blob(io.BytesIO(DATA), 'application/pdf')
+    second = service._store_blob(io.BytesIO(DATA), 'application/pdf')
+
+    assert first == second
+    assert ref_count(db, first['key']) == 2
+    with store.open(first['key']) as stored:
+        assert stored.read() == DATA
+
+    service._release_blob(first['key'])
+    assert store.exists(first['key'])
+    service._release_blob(first['key'])
+    assert not store.exists(first['key'])
+    assert first['key'] not in db.data('blob_refs')
+
+
+def test_deleting_content_releases_its_blob(service, db, store):
+    first = service.upload_content(io.BytesIO(DATA), 'CS101', 'Notes', '', 'tutor1', 'pdf', 'notes.pdf')
+    second = service.upload_content(io.BytesIO(DATA), 'CS102', 'Notes', '', 'tutor2', 'pdf', 'notes.pdf')
+    key = db.data('content')[first]['blob_key']
+
+    assert service.delete_content(first)
+    assert store.exists(key)
+    assert service.delete_content(second)
+    assert not store.exists(key)
+
+
+def test_reupload_racing_the_last_release_keeps_the_file(service, db, store, monkeypatch):
+    key = service._store_blob(io.BytesIO(DATA))['key']
+    delete = store.delete
+    uploader = threading.Thread(target=lambda: service._store_blob(io.BytesIO(DATA)))
+
+    def delete_while_reuploading(blob_key):
+        # The last reference is gone; the same bytes are uploaded again right now
+        uploader.start()
+        uploader.join(0.2)
+        return delete(blob_key)
+
+    monkeypatch.setattr(store, 'delete', delete_while_reuploading)
+    service._release_blob(key)
+    uploader.join(5)
+
+    assert ref_count(db, key) == 1
+    assert store.exists(key)
+
+
+def test_failed_commit_gives_the_reference_back(service, db, store, monkeypatch):
+    def full_disk(staged):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(store, 'commit', full_disk)
+    with pytest.raises(OSError):
+        service._store_blob(io.BytesIO(DATA))
+
+    assert db.data('blob_refs') == {}
+    assert os.listdir(os.path.join(store.root, 'tmp')) == []
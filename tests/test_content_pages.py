@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.firebase_service import FirebaseService
+from app.utils.cache import TTLCache
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def content(service, db, monkeypatch):
+    """Content c00..c09, c09 newest; c04 and c05 share an upload time; odd ones are videos"""
+    monkeypatch.setattr(FirebaseService, '_stats_cache', TTLCache(60))
+    for number in range(10):
+        uploaded_at = START + timedelta(hours=min(number, 4) if number == 5 else number)
+        db.collection('content').document(f"c{number:02d}").set({
+            'title': f"Item {number}", 'description': '', 'module_code': 'CS101',
+            'type': 'video' if number % 2 else 'pdf', 'uploaded_at': uploaded_at})
+
+
+def ids(page):
+    return [item['id'] for item in page['items']]
+
+
+def walk(service, **filters):
+    """Follow next_cursor from the first page to the last, returning every page"""
+    pages = [service.get_filtered_content(per_page=3, **filters)]
+    while pages[-1]['next_cursor']:
+        pages.append(service.get_filtered_content(per_page=3, cursor=pages[-1]['next_cursor'], **filters))
+    return pages
+
+
+def test_next_cursors_visit_every_item_once_newest_first(service, content):
+    pages = walk(service)
+    assert [ids(page) for page in pages] == [
+        ['c09', 'c08', 'c07'], ['c06', 'c05', 'c04'], ['c03', 'c02', 'c01'], ['c00']]
+    assert pages[0]['prev_cursor'] is None
+    assert all(page['prev_cursor'] for page in pages[1:])
+    assert pages[0]['total'] == 10
+
+
+def test_prev_cursor_returns_to_the_previous_page(service, content):
+    pages = walk(service)
+    for previous, page in zip(pages, pages[1:]):
+        back = service.get_filtered_content(per_page=3, cursor=page['prev_cursor'])
+        assert ids(back) == ids(previous)
+        assert bool(back['prev_cursor']) == (previous is not pages[0])
+        assert back['next_cursor']
+
+
+def test_pages_of_a_filtered_query(service, content):
+    pages = walk(service, content_type='video')
+    assert [ids(page) for page in pages] == [['c09', 'c07', 'c05'], ['c03', 'c01']]
+    assert pages[0]['total'] == 5
+
+    back = service.get_filtered_content(per_page=3, content_type='video', cursor=pages[1]['prev_cursor'])
+    assert ids(back) == ['c09', 'c07', 'c05']
+
+
+def test_python_side_search_fills_whole_pages(service, content, db):
+    for number in (1, 4, 8):
+        db.collection('content').document(f"c{number:02d}").update({'description': 'Sorting algorithms'})
+
+    pages = walk(service, search_query='sorting')
+    assert [ids(page) for page in pages] == [['c08', 'c04', 'c01']]
+    assert pages[0]['total'] is None
+
+
+def test_malformed_cursor_reads_the_first_page(service, content):
+    assert ids(service.get_filtered_content(per_page=3, cursor='not-a-cursor')) == ['c09', 'c08', 'c07']
@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+from app.services.content_search import ContentSearchIndex
+from app.services.firebase_service import FirebaseService
+from app.utils.cache import TTLCache
+from config import Config
+
+ITEMS = [
+    ('c1', {'title': 'Linked lists', 'description': 'Pointers and nodes', 'module_code': 'CS102', 'type': 'pdf'}, 'Data Structures'),
+    ('c2', {'title': 'Recursion', 'description': 'Linked structures and trees', 'module_code': 'CS102', 'type': 'text'}, 'Data Structures'),
+    ('c3', {'title': 'Loops', 'description': 'For and while', 'module_code': 'CS101', 'type': 'pdf'}, 'Programming')
+]
+
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'content_search.db')
+    monkeypatch.setattr(Config, 'CONTENT_SEARCH_INDEX_PATH', path)
+    monkeypatch.setattr(FirebaseService, '_search_index', None)
+    return path
+
+
+def test_only_one_process_builds_a_missing_index(index_path):
+    builds = []
+    started = threading.Barrier(2, timeout=5)
+
+    def load_items():
+        builds.append(threading.current_thread().name)
+        return ITEMS
+
+    def build():
+        # Separate instances, like separate worker processes sharing the file
+        index = ContentSearchIndex(index_path)
+        started.wait()
+        index.build_if_missing(load_items)
+
+    threads = [threading.Thread(target=build) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert ContentSearchIndex(index_path).search('linked') == (['c1', 'c2'], 2)
+
+
+def test_searches_never_build_the_index(service, db, index_path):
+    db.collection('content').document('c1').set(ITEMS[0][1])
+
+    assert service._content_search() is None
+    assert not ContentSearchIndex(index_path).is_built()
+    page = service.get_filtered_content(search_query='linked')
+    assert [item['id'] for item in page['items']] == ['c1']
+
+    assert service.build_content_search_index() == 1
+    assert service._content_search() is not None
+    assert service.build_content_search_index() is None
+
+
+def test_index_errors_do_not_fail_uploads(service, db, index_path, monkeypatch):
+    service.build_content_search_index()
+
+    def broken(*args):
+        raise OSError('disk I/O error')
+
+    monkeypatch.setattr(ContentSearchIndex, 'upsert', broken)
+    monkeypatch.setattr(ContentSearchIndex, 'delete', broken)
+
+    content_id = service.upload_content('Notes', 'CS101', 'Loops', '', 'tutor1', 'text')
+    assert content_id in db.data('content')
+    assert service.delete_content(content_id)
+    assert db.data('content') == {}
+
+
+def test_ranked_prefix_matches_with_filters(index_path):
+    index = ContentSearchIndex(index_path)
+    index.build_if_missing(lambda: ITEMS)
+
+    # Title hits rank above description hits; every word matches as a prefix
+    assert index.search('link') == (['c1', 'c2'], 2)
+    assert index.search('linked tree') == (['c2'], 1)
+    # Module names are searchable too
+    assert index.search('programming') == (['c3'], 1)
+
+    assert index.search('linked', content_type='text') == (['c2'], 1)
+    assert index.search('linked', module_code='CS101') == ([], 0)
+    assert index.search('linked', limit=1, offset=1) == (['c2'], 2)
+    assert index.search('  !! ') == ([], 0)
+
+    index.upsert('c3', dict(ITEMS[2][1], title='Linked loops'), 'Programming')
+    index.delete('c1')
+    assert index.search('linked') == (['c3', 'c2'], 2)
+
+
+def test_search_pages_follow_the_ranking(service, db, index_path, monkeypatch):
+    monkeypatch.setattr(FirebaseService, '_module_cache', TTLCache(60))
+    db.collection('modules').document('CS102').set({'name': 'Data Structures'})
+    for number in range(5):
+        db.collection('content').document(f"t{number}").set({
+            'title': 'Trees' if number < 2 else 'Graphs', 'description': 'Trees and graphs',
+            'module_code': 'CS102', 'type': 'pdf'})
+    db.collection('content').document('v0').set({
+        'title': 'Trees', 'description': '', 'module_code': 'CS102', 'type': 'video'})
+    service.build_content_search_index()
+
+    first = service.get_filtered_content(search_query='trees', per_page=4)
+    assert set(item['id'] for item in first['items'][:3]) == {'t0', 't1', 'v0'}
+    assert first['total'] == 6
+    assert first['prev_cursor'] is None
+
+    second = service.get_filtered_content(search_query='trees', per_page=4, cursor=first['next_cursor'])
+    assert len(second['items']) == 2
+    assert second['next_cursor'] is None
+    assert {item['id'] for item in first['items'] + second['items']} == {'t0', 't1', 't2', 't3', 't4', 'v0'}
+
+    back = service.get_filtered_content(search_query='trees', per_page=4, cursor=second['prev_cursor'])
+    assert [item['id'] for item in back['items']] == [item['id'] for item in first['items']]
+
+    videos = service.get_filtered_content(search_query='trees', content_type='video')
+    assert [item['id'] for item in videos['items']] == ['v0']
+
+    # Deleted from Firestore but not yet from the index: left out of the page
+    db.collection('content').document('v0').delete()
+    assert service.get_filtered_content(search_query='trees', content_type='video')['items'] == []
@@ -0,0 +1,27 @@
+import io
+
+import pytest
+from flask import Flask
+
+from app.services.blob_store import LocalBlobStore
+from app.utils.file_serving import serve_blob
+
+
+@pytest.fixture
+def blob(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    return store, store.put(io.BytesIO(b'<svg onload="alert(1)"></svg>'))['key']
+
+
+@pytest.mark.parametrize('accel_prefix', [None, '/protected-blobs'])
+def test_served_blobs_are_never_sniffed(blob, accel_prefix):
+    store, key = blob
+    app = Flask(__name__)
+    app.config['BLOB_ACCEL_REDIRECT_PREFIX'] = accel_prefix
+
+    with app.test_request_context():
+        response = serve_blob(store, key, mimetype='application/pdf', download_name='cv.pdf')
+
+    assert response.mimetype == 'application/pdf'
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+    response.close()
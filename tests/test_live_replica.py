@@ -0,0 +1,99 @@
+import types
+
+from app.services import live_replica
+from app.services.firebase_service import FirebaseService
+from app.services.live_replica import CollectionReplica, FakeListenerSource
+from app.utils.cache import TTLCache
+
+
+def test_replica_follows_added_modified_and_removed_documents():
+    source = FakeListenerSource({'CS101': {'name': 'Programming'}})
+    replica = CollectionReplica('modules', source)
+    assert not replica.ready
+
+    replica.start()
+    assert replica.ready
+    assert replica.get('CS101').to_dict() == {'name': 'Programming'}
+
+    source.set('CS102', {'name': 'Data Structures'})
+    assert sorted(doc.id for doc in replica.documents()) == ['CS101', 'CS102']
+
+    source.set('CS101', {'name': 'Programming I'})
+    assert replica.get('CS101').get('name') == 'Programming I'
+
+    source.delete('CS102')
+    assert replica.get('CS102') is None
+    assert [doc.id for doc in replica.documents()] == ['CS101']
+
+
+def test_replica_documents_are_copies():
+    source = FakeListenerSource({'CS101': {'name': 'Programming'}})
+    replica = CollectionReplica('modules', source).start()
+
+    replica.get('CS101').to_dict()['name'] = 'Changed'
+    assert replica.get('CS101').get('name') == 'Programming'
+
+
+def test_stopped_replica_ignores_further_changes():
+    source = FakeListenerSource({'CS101': {'name': 'Programming'}})
+    replica = CollectionReplica('modules', source).start()
+
+    replica.stop()
+    assert not replica.ready
+    source.delete('CS101')
+    assert replica.get('CS101') is not None
+
+
+def test_service_reads_module_tutors_from_the_replica(service, monkeypatch):
+    monkeypatch.setattr(FirebaseService, '_replicas', {})
+    module_tutors = FakeListenerSource({
+        'a': {'module_code': 'CS101', 'tutor_id': 'tutor1'},
+        'b': {'module_code': 'CS102', 'tutor_id': 'tutor1'},
+        'c': {'module_code': 'CS101', 'tutor_id': 'tutor2'}
+    })
+    service.start_live_replica({'module_tutors': module_tutors})
+
+    assignments = service._query_module_tutors('module_code', 'CS101')
+    assert sorted(doc.get('tutor_id') for doc in assignments) == ['tutor1', 'tutor2']
+
+    module_tutors.delete('c')
+    assignments = service._query_module_tutors('module_code', 'CS101')
+    assert [doc.get('tutor_id') for doc in assignments] == ['tutor1']
+
+    service.stop_live_replica()
+    assert service._replica('module_tutors') is None
+
+
+def test_replica_reattaches_a_stopped_listener():
+    source = FakeListenerSource({'CS101': {'name': 'Programming'}})
+    replica = CollectionReplica('modules', source).start()
+
+    source.fail()
+    source.set('CS101', {'name': 'Programming I'})
+    assert replica.get('CS101').get('name') == 'Programming'
+
+    assert replica.ready
+    assert replica.get('CS101').get('name') == 'Programming I'
+
+
+def test_service_falls_back_to_firestore_while_the_listener_is_down(service, db, monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(live_replica, 'time', types.SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(FirebaseService, '_replicas', {})
+    monkeypatch.setattr(FirebaseService, '_module_cache', TTLCache(0))
+    modules = FakeListenerSource({'CS101': {'name': 'Programming'}})
+    service.start_live_replica({'modules': modules})
+    db.collection('modules').document('CS101').set({'name': 'Programming I'})
+
+    # First failure: reattached straight away
+    modules.fail()
+    assert service.get_module('CS101')['name'] == 'Programming'
+
+    # Failing again within RESTART_INTERVAL: the replica is skipped until the next attempt
+    modules.fail()
+    assert service._replica('modules') is None
+    assert service.get_module('CS101')['name'] == 'Programming I'
+
+    clock.now += CollectionReplica.RESTART_INTERVAL
+    assert service._replica('modules') is not None
+    service.stop_live_replica()
@@ -0,0 +1,26 @@
+import pytest
+from flask import Flask
+
+from app.main import main_bp
+
+
+def client(token):
+    app = Flask(__name__)
+    app.config['METRICS_TOKEN'] = token
+    app.register_blueprint(main_bp)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('token', [None, ''])
+def test_metrics_are_hidden_without_a_token(token):
+    assert client(token).get('/metrics').status_code == 404
+
+
+def test_metrics_require_the_token():
+    metrics = client('s3cret')
+    assert metrics.get('/metrics').status_code == 403
+    assert metrics.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+
+    response = metrics.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert b'firestore_rpc_duration_seconds' in response.data
@@ -0,0 +1,74 @@
+import types
+
+import pytest
+
+from app.services.firebase_service import FirebaseService
+from app.utils import cache
+from app.utils.cache import TTLCache
+
+TTL = 300
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls the time TTLCache sees; advance it by adding to `clock.now`"""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache, 'time', types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def module_cache(monkeypatch, clock):
+    module_cache = TTLCache(TTL)
+    monkeypatch.setattr(FirebaseService, '_module_cache', module_cache)
+    return module_cache
+
+
+def rename_module(db, name):
+    db.collection('modules').document('CS101').set({'name': name})
+
+
+def test_get_module_reads_once_within_the_ttl(service, db, module_cache, clock):
+    rename_module(db, 'Programming')
+    assert service.get_module('CS101')['name'] == 'Programming'
+
+    rename_module(db, 'Programming I')
+    clock.now += TTL - 1
+    assert service.get_module('CS101')['name'] == 'Programming'
+
+    clock.now += 1
+    assert service.get_module('CS101')['name'] == 'Programming I'
+
+
+def test_loading_references_does_not_extend_cached_modules(service, db, module_cache, clock):
+    rename_module(db, 'Programming')
+    service.get_module('CS101')
+    rename_module(db, 'Programming I')
+
+    # A read served from the cache must not push back its expiry
+    clock.now += TTL - 100
+    refs = service._load_references([{'module_code': 'CS101'}], {'module_code': 'modules'})
+    assert refs.get('modules', 'CS101')['name'] == 'Programming'
+
+    clock.now += 100
+    assert service.get_module('CS101')['name'] == 'Programming I'
+
+
+def test_modules_loaded_as_references_are_cached(service, db, module_cache):
+    rename_module(db, 'Programming')
+    refs = service._load_references([{'module_code': 'CS101'}], {'module_code': 'modules'})
+    assert refs.get('modules', 'CS101')['name'] == 'Programming'
+
+    rename_module(db, 'Programming I')
+    assert service.get_module('CS101')['name'] == 'Programming'
+
+
+def test_modules_from_the_catalog_expire_with_it(service, db, module_cache, clock):
+    rename_module(db, 'Programming')
+    service.get_all_modules()
+    clock.now += TTL - 1
+    assert service.get_module('CS101')['code'] == 'CS101'
+
+    rename_module(db, 'Programming I')
+    clock.now += 1
+    assert service.get_module('CS101')['name'] == 'Programming I'
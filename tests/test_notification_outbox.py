@@ -0,0 +1,134 @@
+import threading
+
+from app.services import notification_outbox
+from app.services.notification_outbox import NotificationOutbox
+from fake_firestore import SERVER_TIMESTAMP
+
+
+def notification(number):
+    return {'user_id': f"user{number}", 'title': f"Title {number}", 'message': 'Hello', 'type': 'booking'}
+
+
+def test_sync_mode_writes_before_enqueue_returns(db):
+    outbox = NotificationOutbox(lambda: db, sync=True)
+
+    outbox.enqueue(notification(1))
+    written = list(db.data('notifications').values())
+    assert len(written) == 1
+    assert written[0]['user_id'] == 'user1'
+    assert written[0]['created_at'] is SERVER_TIMESTAMP
+    assert outbox.pending() == 0
+
+
+def test_flush_writes_queued_notifications_in_batches(db, monkeypatch):
+    outbox = NotificationOutbox(lambda: db, batch_size=2)
+    # Keep everything queued until flush() instead of starting the worker
+    monkeypatch.setattr(outbox, '_ensure_worker', lambda: None)
+
+    for number in range(5):
+        outbox.enqueue(notification(number))
+    assert outbox.pending() == 5
+    assert db.data('notifications') == {}
+
+    outbox.flush()
+    assert outbox.pending() == 0
+    assert db.batch_sizes == [2, 2, 1]
+    assert sorted(n['user_id'] for n in db.data('notifications').values()) == [f"user{n}" for n in range(5)]
+
+
+def test_worker_writes_everything_by_close(db):
+    outbox = NotificationOutbox(lambda: db, batch_size=3, flush_interval=0.01)
+
+    for number in range(7):
+        outbox.enqueue(notification(number))
+    outbox.close()
+
+    assert len(db.data('notifications')) == 7
+    assert sum(db.batch_sizes) == 7
+    assert max(db.batch_sizes) <= 3
+
+
+def test_failed_batch_is_retried(db, monkeypatch):
+    outbox = NotificationOutbox(lambda: db, sync=True, retry_backoff=0)
+    write = outbox._write
+    failures = [RuntimeError('unavailable')]
+
+    def flaky_write(notifications):
+        if failures:
+            raise failures.pop()
+        write(notifications)
+
+    monkeypatch.setattr(outbox, '_write', flaky_write)
+    outbox.enqueue(notification(1))
+    assert len(db.data('notifications')) == 1
+
+
+def test_booking_notifies_tutor_and_student(service, db):
+    result = service.book_session('student1', 'tutor1', 'CS101', '2999-01-04', '09:00', '10:00')
+    assert result['success']
+
+    notified = {n['user_id']: n for n in db.data('notifications').values()}
+    assert set(notified) == {'tutor1', 'student1'}
+    assert all(n['reference_id'] == result['booking_id'] for n in notified.values())
+
+
+def test_retry_backoff_does_not_hold_the_write_lock(db, monkeypatch):
+    outbox = NotificationOutbox(lambda: db, sync=True, max_retries=2)
+    write = outbox._write
+    failures = [RuntimeError('unavailable'), RuntimeError('unavailable')]
+    locked_while_sleeping = []
+
+    def flaky_write(notifications):
+        if failures:
+            raise failures.pop()
+        write(notifications)
+
+    monkeypatch.setattr(outbox, '_write', flaky_write)
+    monkeypatch.setattr(notification_outbox.time, 'sleep',
+                        lambda delay: locked_while_sleeping.append(outbox._write_lock.locked()))
+    outbox.enqueue(notification(1))
+
+    assert locked_while_sleeping == [False, False]
+    assert len(db.data('notifications')) == 1
+
+
+def test_flush_waits_for_the_batch_the_worker_is_writing(db, monkeypatch):
+    outbox = NotificationOutbox(lambda: db, flush_interval=0.01)
+    write = outbox._write
+    writing = threading.Event()
+    release = threading.Event()
+
+    def slow_write(notifications):
+        writing.set()
+        release.wait(5)
+        write(notifications)
+
+    monkeypatch.setattr(outbox, '_write', slow_write)
+    outbox.enqueue(notification(1))
+    assert writing.wait(5)
+    assert outbox.pending() == 0
+
+    flusher = threading.Thread(target=outbox.flush)
+    flusher.start()
+    flusher.join(0.1)
+    assert flusher.is_alive()
+
+    release.set()
+    flusher.join(5)
+    assert not flusher.is_alive()
+    assert len(db.data('notifications')) == 1
+    outbox.close()
+
+
+def test_exit_hook_is_registered_once(db, monkeypatch):
+    registered = []
+    monkeypatch.setattr(notification_outbox.atexit, 'register', registered.append)
+    outbox = NotificationOutbox(lambda: db, flush_interval=0.01)
+
+    outbox.enqueue(notification(1))
+    outbox.close()
+    outbox.enqueue(notification(2))
+    outbox.close()
+
+    assert registered == [outbox.close]
+    assert len(db.data('notifications')) == 2
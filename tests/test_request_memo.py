@@ -0,0 +1,99 @@
+import pytest
+from flask import Flask
+
+from app.utils.cache import invalidates_request_memo, request_memoized
+
+USER_ID = 'student1'
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+@pytest.fixture
+def reads(db, monkeypatch):
+    """Document keys read from the fake Firestore, in order"""
+    reads = []
+    read = db.read
+
+    def counting_read(key):
+        reads.append(key)
+        return read(key)
+
+    monkeypatch.setattr(db, 'read', counting_read)
+    return reads
+
+
+class Catalog:
+    def __init__(self):
+        self.calls = []
+
+    @request_memoized
+    def lookup(self, code, detail=False):
+        self.calls.append((code, detail))
+        return {'code': code, 'tags': []}
+
+    @request_memoized
+    def lookup_many(self, codes):
+        self.calls.append(tuple(codes))
+        return list(codes)
+
+    @invalidates_request_memo
+    def rename(self):
+        pass
+
+
+def test_results_are_memoized_per_arguments_within_a_request(app):
+    catalog = Catalog()
+    with app.test_request_context():
+        catalog.lookup('CS101')
+        catalog.lookup('CS101')
+        catalog.lookup('CS101', detail=True)
+        catalog.lookup('CS102')
+    assert catalog.calls == [('CS101', False), ('CS101', True), ('CS102', False)]
+
+    # A new request starts with an empty memo
+    with app.test_request_context():
+        catalog.lookup('CS101')
+    assert len(catalog.calls) == 4
+
+
+def test_callers_get_copies(app):
+    catalog = Catalog()
+    with app.test_request_context():
+        catalog.lookup('CS101')['tags'].append('changed')
+        assert catalog.lookup('CS101') == {'code': 'CS101', 'tags': []}
+
+
+def test_writes_clear_the_memo(app):
+    catalog = Catalog()
+    with app.test_request_context():
+        catalog.lookup('CS101')
+        catalog.rename()
+        catalog.lookup('CS101')
+    assert len(catalog.calls) == 2
+
+
+def test_unmemoizable_calls_run_every_time(app):
+    catalog = Catalog()
+    # Outside a request
+    catalog.lookup('CS101')
+    catalog.lookup('CS101')
+    # Unhashable arguments
+    with app.test_request_context():
+        catalog.lookup_many(['CS101'])
+        catalog.lookup_many(['CS101'])
+    assert len(catalog.calls) == 4
+
+
+def test_service_reads_a_user_once_per_request(app, service, db, reads):
+    db.collection('users').document(USER_ID).set({'name': 'Student', 'role': 'student', 'is_verified': False})
+    with app.test_request_context():
+        assert service.get_user_by_id(USER_ID)['name'] == 'Student'
+        assert service.get_user_by_id(USER_ID)['name'] == 'Student'
+        assert reads == [('users', USER_ID)]
+
+        # approve_student_application writes the user, so the next lookup reads it again
+        assert service.approve_student_application(USER_ID)
+        assert service.get_user_by_id(USER_ID)['is_verified'] is True
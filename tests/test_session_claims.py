@@ -0,0 +1,91 @@
+import pytest
+from flask import Flask, session
+
+from app import load_user
+from app.services.firebase_service import FirebaseService
+from app.services.live_replica import FakeListenerSource
+from app.utils.cache import TTLCache
+
+USER_ID = 'student1'
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='test', SESSION_USER_CLAIMS=True, SESSION_CLAIMS_MAX_AGE=300)
+    return app
+
+
+@pytest.fixture
+def revocations(service, monkeypatch):
+    """The session_revocations replica; deliver() plays the listener catching up with Firestore"""
+    monkeypatch.setattr(FirebaseService, '_replicas', {})
+    monkeypatch.setattr(FirebaseService, '_user_cache', TTLCache(60))
+    source = FakeListenerSource()
+    service.start_live_replica({'session_revocations': source})
+    yield source
+    service.stop_live_replica()
+
+
+def deliver(db, revocations):
+    for user_id, revocation in db.data('session_revocations').items():
+        revocations.set(user_id, revocation)
+
+
+def add_student(db, **fields):
+    db.collection('users').document(USER_ID).set(dict(
+        {'name': 'Student', 'email': 'student@example.com', 'role': 'student', 'is_verified': False}, **fields))
+
+
+def test_claims_skip_the_lookup_until_the_user_is_revoked(app, service, db, revocations):
+    add_student(db, is_verified=True)
+    with app.test_request_context():
+        assert load_user(USER_ID).role == 'student'
+        assert session['user_claims']['session_version'] == 0
+
+        # Changed behind the app's back: claims (and the cached lookup) still answer
+        db.collection('users').document(USER_ID).update({'role': 'tutor'})
+        assert load_user(USER_ID).role == 'student'
+
+        service.revoke_user_sessions(USER_ID)
+        deliver(db, revocations)
+        assert load_user(USER_ID).role == 'tutor'
+        assert session['user_claims']['session_version'] == 1
+
+
+def test_admin_approval_revokes_claims_in_other_workers(app, service, db, revocations, monkeypatch):
+    add_student(db)
+    with app.test_request_context():
+        assert not load_user(USER_ID).is_verified
+
+        # The approval runs in another worker, whose invalidate_user can't reach this one
+        monkeypatch.setattr(service, 'invalidate_user', lambda user_id=None: None)
+        assert service.approve_student_application(USER_ID)
+        assert not load_user(USER_ID).is_verified
+
+        deliver(db, revocations)
+        assert load_user(USER_ID).is_verified
+
+
+def test_deleted_user_is_signed_out_once_revoked(app, service, db, revocations):
+    add_student(db, is_verified=True)
+    with app.test_request_context():
+        assert load_user(USER_ID) is not None
+
+        db.collection('users').document(USER_ID).delete()
+        service.revoke_user_sessions(USER_ID)
+        deliver(db, revocations)
+        assert load_user(USER_ID) is None
+        assert 'user_claims' not in session
+
+
+def test_claims_are_not_used_without_the_replica(app, service, db, monkeypatch):
+    monkeypatch.setattr(FirebaseService, '_replicas', {})
+    monkeypatch.setattr(FirebaseService, '_user_cache', TTLCache(0))
+    add_student(db, is_verified=True)
+    with app.test_request_context():
+        assert load_user(USER_ID).role == 'student'
+        assert 'user_claims' not in session
+
+        db.collection('users').document(USER_ID).update({'role': 'tutor'})
+        assert load_user(USER_ID).role == 'tutor'
@@ -0,0 +1,39 @@
+from app.services.firebase_service import FirebaseService
+from app.utils.cache import TTLCache
+
+
+def add_session(db, session_id, **fields):
+    db.collection('sessions').document(session_id).set(dict(status='completed', **fields))
+
+
+def test_backfill_measures_start_end_times_and_time_slots(service, db):
+    add_session(db, 'timed', start_time='10:00', end_time='11:30')
+    add_session(db, 'slotted', time_slot='14:00 - 14:45')
+    add_session(db, 'recorded', start_time='09:00', end_time='10:00', duration_hours=2)
+
+    assert service.backfill_session_durations() == 2
+    sessions = db.data('sessions')
+    assert sessions['timed']['duration_hours'] == 1.5
+    assert sessions['slotted']['duration_hours'] == 0.75
+    assert sessions['recorded']['duration_hours'] == 2
+
+
+def test_backfill_skips_sessions_without_times(service, db):
+    add_session(db, 'untimed')
+    add_session(db, 'garbled', start_time='soon', end_time='later')
+
+    assert service.backfill_session_durations() == 0
+    assert all('duration_hours' not in session for session in db.data('sessions').values())
+
+    # Running again still leaves them for a later fix rather than recording 0 hours
+    assert service.backfill_session_durations() == 0
+
+
+def test_statistics_sum_backfilled_durations(service, db, monkeypatch):
+    monkeypatch.setattr(FirebaseService, '_stats_cache', TTLCache(60))
+    add_session(db, 'timed', start_time='10:00', end_time='11:20')
+    add_session(db, 'slotted', time_slot='14:00 - 15:00')
+    add_session(db, 'untimed')
+    service.backfill_session_durations()
+
+    assert service.get_system_statistics()['total_hours'] == 2.3
@@ -0,0 +1,89 @@
+import threading
+from datetime import date, timedelta
+
+from app.services import slot_occupancy
+
+TUTOR_ID = 'tutor1'
+DAY = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+SLOT_BIT = slot_occupancy.slot_bit('10:00', '11:00')
+
+
+def book(service, student_id):
+    return service.book_session(student_id, TUTOR_ID, 'CS101', DAY, '10:00', '11:00')
+
+
+def slots_mask(db):
+    entry = db.data(slot_occupancy.OCCUPANCY_COLLECTION).get(slot_occupancy.occupancy_doc_id(TUTOR_ID, DAY))
+    return (entry or {}).get('slots_mask', 0)
+
+
+def test_concurrent_bookings_of_one_slot(service, db):
+    # Hold both transactions at commit until each has read the free slot
+    both_read = threading.Barrier(2, timeout=5)
+    waited = []
+    waited_lock = threading.Lock()
+
+    def before_commit():
+        with waited_lock:
+            first_commit = threading.current_thread() not in waited
+            waited.append(threading.current_thread())
+        if first_commit:
+            both_read.wait()
+
+    db.before_commit = before_commit
+
+    results = {}
+    threads = [threading.Thread(target=lambda s=student: results.__setitem__(s, book(service, s)))
+               for student in ('student1', 'student2')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    booked = [result for result in results.values() if result['success']]
+    rejected = [result for result in results.values() if not result['success']]
+    assert len(booked) == 1
+    assert len(rejected) == 1 and rejected[0].get('conflict')
+
+    booking_id = booked[0]['booking_id']
+    assert list(db.data('sessions')) == [booking_id]
+    locks = db.data(slot_occupancy.LOCK_COLLECTION)
+    assert [lock['session_id'] for lock in locks.values()] == [booking_id]
+    assert slots_mask(db) == SLOT_BIT
+
+
+def test_cancel_releases_the_slot(service, db):
+    booking_id = book(service, 'student1')['booking_id']
+    assert book(service, 'student2').get('conflict')
+
+    assert service.cancel_session(booking_id)
+    assert db.data('sessions')[booking_id]['status'] == 'Cancelled'
+    assert db.data(slot_occupancy.LOCK_COLLECTION) == {}
+    assert slots_mask(db) & SLOT_BIT == 0
+
+    rebooked = book(service, 'student2')
+    assert rebooked['success']
+    locks = db.data(slot_occupancy.LOCK_COLLECTION)
+    assert [lock['session_id'] for lock in locks.values()] == [rebooked['booking_id']]
+    assert slots_mask(db) == SLOT_BIT
+
+
+def test_seeded_bookings_hold_their_slots(service, db):
+    assert service.seed_bookings()
+    sessions = db.data('sessions')
+    assert len(sessions) == 3
+
+    locks = db.data(slot_occupancy.LOCK_COLLECTION)
+    assert sorted(lock['session_id'] for lock in locks.values()) == sorted(sessions)
+    for session in sessions.values():
+        entry = db.data(slot_occupancy.OCCUPANCY_COLLECTION)[
+            slot_occupancy.occupancy_doc_id(session['tutor_id'], session['date'])]
+        assert entry['slots_mask'] & slot_occupancy.session_bit(session)
+
+        retry = service.book_session('student9', session['tutor_id'], session['module_code'], session['date'],
+                                     session['start_time'], session['end_time'])
+        assert retry.get('conflict')
+
+    # Seeding again finds every slot taken
+    assert service.seed_bookings()
+    assert len(db.data('sessions')) == 3